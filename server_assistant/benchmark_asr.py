@@ -0,0 +1,197 @@
+"""
+Сравнение движков распознавания речи по скорости и точности.
+
+Для каждого движка считаются коэффициент реального времени (RTF - время
+распознавания, деленное на длительность аудио) и доля ошибок по словам (WER)
+на наборе записей. Набор - каталог с аудиофайлами и эталонными расшифровками
+рядом: clip01.ogg + clip01.txt, clip02.wav + clip02.txt и т.д.
+
+С параметром --batch-sizes дополнительно замеряется пропускная способность
+пакетного распознавания (записей в секунду) при разных размерах пачки.
+
+Пример запуска:
+    python benchmark_asr.py --clips temp/asr_clips whisper:base faster-whisper:base:int8 faster-whisper:small:int8
+    python benchmark_asr.py --clips temp/asr_clips --batch-sizes 1,2,4,8 whisper:base
+"""
+import argparse
+import glob
+import os
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from src.audio_processing.speech_recognition import WHISPER_SAMPLE_RATE, create_asr_model, decode_audio
+from src.utils.text_normalization import tokenize
+
+_AUDIO_EXTENSIONS = ('.ogg', '.oga', '.opus', '.wav', '.flac')
+
+
+def word_edit_distance(reference: List[str], hypothesis: List[str]) -> int:
+    """
+    Расстояние Левенштейна между последовательностями слов.
+
+    :param reference: Эталонные слова
+    :type reference: List[str]
+    :param hypothesis: Распознанные слова
+    :type hypothesis: List[str]
+    :return: Минимальное число замен, вставок и удалений
+    :rtype: int
+    """
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hypothesis, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word)
+            ))
+        previous = current
+    return previous[-1]
+
+
+def word_error_rate(references: List[str], hypotheses: List[str]) -> float:
+    """
+    WER по набору записей: суммарное число ошибок, деленное на число эталонных слов.
+    Тексты сравниваются после нормализации (регистр, "ё", пунктуация).
+
+    :param references: Эталонные расшифровки
+    :type references: List[str]
+    :param hypotheses: Распознанные тексты
+    :type hypotheses: List[str]
+    :return: Доля ошибок по словам
+    :rtype: float
+    """
+    errors = 0
+    words = 0
+    for reference, hypothesis in zip(references, hypotheses):
+        reference_words = tokenize(reference)
+        errors += word_edit_distance(reference_words, tokenize(hypothesis))
+        words += len(reference_words)
+    return errors / words if words else 0.0
+
+
+def load_clips(clips_dir: str) -> List[Tuple[str, np.ndarray, str]]:
+    """
+    Загружает записи, для которых есть эталонная расшифровка.
+
+    :param clips_dir: Каталог с записями
+    :type clips_dir: str
+    :return: Список (имя, сигнал 16 кГц, эталонный текст)
+    :rtype: List[Tuple[str, np.ndarray, str]]
+    """
+    clips = []
+    for path in sorted(glob.glob(os.path.join(clips_dir, '*'))):
+        base, extension = os.path.splitext(path)
+        if extension.lower() not in _AUDIO_EXTENSIONS or not os.path.exists(base + '.txt'):
+            continue
+        with open(base + '.txt', 'r', encoding='utf-8') as file:
+            reference = file.read().strip()
+        clips.append((os.path.basename(path), decode_audio(path), reference))
+    return clips
+
+
+def _create_model(spec: str, language: str):
+    backend, model_name, *rest = spec.split(':')
+    options = {'compute_type': rest[0]} if rest else {}
+    return create_asr_model(backend, language, model_name, **options)
+
+
+def benchmark_backend(spec: str, clips: List[Tuple[str, np.ndarray, str]], language: str = 'ru') -> Dict[str, float]:
+    """
+    Замеряет один движок.
+
+    :param spec: Движок в виде backend:model[:compute_type]
+    :type spec: str
+    :param clips: Записи из load_clips
+    :param language: Язык распознавания
+    :type language: str
+    :return: RTF, WER и время загрузки модели
+    :rtype: dict
+    """
+    started = time.perf_counter()
+    model = _create_model(spec, language)
+    load_time = time.perf_counter() - started
+
+    # Прогрев: первые вызовы включают инициализацию, не относящуюся к распознаванию
+    model.transcribe(clips[0][1])
+
+    hypotheses = []
+    processing_time = 0.0
+    for _, audio, _ in clips:
+        started = time.perf_counter()
+        hypotheses.append(model.transcribe(audio))
+        processing_time += time.perf_counter() - started
+
+    audio_time = sum(len(audio) for _, audio, _ in clips) / WHISPER_SAMPLE_RATE
+    return {
+        'rtf': processing_time / audio_time,
+        'wer': word_error_rate([reference for _, _, reference in clips], hypotheses),
+        'load_time': load_time,
+    }
+
+
+def benchmark_batching(spec: str, clips: List[Tuple[str, np.ndarray, str]], batch_sizes: List[int], language: str = 'ru') -> Dict[int, float]:
+    """
+    Замеряет пропускную способность пакетного распознавания.
+
+    Записи обрезаются до окна модели (30 с) и распознаются пачками заданного размера.
+
+    :param spec: Движок в виде backend:model[:compute_type]
+    :type spec: str
+    :param clips: Записи из load_clips
+    :param batch_sizes: Размеры пачки
+    :type batch_sizes: List[int]
+    :param language: Язык распознавания
+    :type language: str
+    :return: Размер пачки -> записей в секунду
+    :rtype: dict
+    """
+    model = _create_model(spec, language)
+    window = 30 * WHISPER_SAMPLE_RATE
+    audios = [audio[:window] for _, audio, _ in clips]
+    # Прогрев
+    model.transcribe_batch(audios[:1])
+
+    throughput = {}
+    for batch_size in batch_sizes:
+        # Для каждой пачки берется не меньше batch_size записей, при необходимости по кругу
+        count = max(len(audios), batch_size)
+        items = [audios[index % len(audios)] for index in range(count)]
+        started = time.perf_counter()
+        for start in range(0, count, batch_size):
+            model.transcribe_batch(items[start:start + batch_size])
+        throughput[batch_size] = count / (time.perf_counter() - started)
+    return throughput
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Сравнение движков распознавания речи')
+    parser.add_argument('backends', nargs='+', help='Движки вида backend:model[:compute_type]')
+    parser.add_argument('--clips', required=True, help='Каталог с записями и расшифровками .txt')
+    parser.add_argument('--language', default='ru', help='Язык распознавания')
+    parser.add_argument('--batch-sizes', default='', help='Размеры пачки через запятую для замера пакетного распознавания')
+    args = parser.parse_args()
+
+    clips = load_clips(args.clips)
+    if not clips:
+        parser.error(f"В каталоге {args.clips} нет записей с расшифровками")
+    audio_time = sum(len(audio) for _, audio, _ in clips) / WHISPER_SAMPLE_RATE
+    print(f"Записей: {len(clips)}, длительность: {audio_time:.1f} с")
+
+    print(f"{'Движок':<32}{'RTF':>8}{'WER':>8}{'Загрузка, с':>14}")
+    for spec in args.backends:
+        result = benchmark_backend(spec, clips, args.language)
+        print(f"{spec:<32}{result['rtf']:>8.3f}{result['wer']:>8.1%}{result['load_time']:>14.1f}")
+
+    if args.batch_sizes:
+        batch_sizes = [int(size) for size in args.batch_sizes.split(',')]
+        print(f"\n{'Движок':<32}{'Пачка':>8}{'Записей/с':>12}")
+        for spec in args.backends:
+            for batch_size, clips_per_second in benchmark_batching(spec, clips, batch_sizes, args.language).items():
+                print(f"{spec:<32}{batch_size:>8}{clips_per_second:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
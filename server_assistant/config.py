@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Dict
 from dotenv import load_dotenv
 from os import getenv
 
@@ -41,15 +42,151 @@ class GoogleCalendar:
     timezone: str = 'Europe/Moscow'
 
 
+@dataclass
+class GuidePool:
+    max_size: int = 256
+    idle_ttl: int = 3600
+
+
+@dataclass
+class Router:
+    intent_model_path: str = 'models/intent_classifier.joblib'
+    intent_threshold: float = 0.75
+    decisions_log: str = 'temp/router_decisions.jsonl'
+    output_llm_fallback: bool = False
+
+
+@dataclass
+class DialogContext:
+    max_tokens: int = 8000
+    # Бюджеты токенов истории по типам задач (task_type процессора)
+    budgets: Dict[str, int] = field(default_factory=dict)
+    # Фоновое сжатие старой истории в сводку. Сводка покрывает все, что не входит
+    # в самый маленький бюджет, иначе сети с малым бюджетом не видят середину истории
+    summary_keep_tokens: int = 1500
+    summary_min_tokens: int = 2000
+    # Старая история сжимается порциями не больше summary_max_batch_tokens, чтобы запрос помещался в контекст модели
+    summary_max_batch_tokens: int = 8000
+
+
+def _parse_budgets(value: str | None) -> Dict[str, int]:
+    """
+    Разбирает бюджеты вида "ROUTER=1500,SMALL_TALK=3000".
+    """
+    budgets = {
+        'ROUTER': 1500,
+        'SMALL_TALK': 3000,
+        'REMINDER': 1500,
+        'TODO': 2000,
+    }
+    for item in (value or '').split(','):
+        if '=' in item:
+            name, tokens = item.split('=', 1)
+            budgets[name.strip().upper()] = int(tokens)
+    return budgets
+
+
+def _summary_keep_tokens(value: str | None, max_tokens: int, budgets: Dict[str, int]) -> int:
+    """
+    Сколько последних токенов истории не сжимать: не больше самого маленького бюджета контекста.
+    """
+    smallest = min([max_tokens, *budgets.values()])
+    return min(int(value), smallest) if value else smallest
+
+
+@dataclass
+class DialogStore:
+    max_chats: int = 1024
+    idle_ttl: int = 3600
+    flush_interval: float = 2.0
+
+
+@dataclass
+class Storage:
+    # json - файлы в base_dir, sqlite - одна база sqlite_path
+    backend: str = 'json'
+    base_dir: str = 'temp'
+    sqlite_path: str = 'temp/assistant.db'
+    preferences_file: str = 'user_preferences.json'
+
+
+@dataclass
+class MemoryIndex:
+    # Модель sentence-transformers; пустая строка - хеширование символьных n-грамм
+    embedding_model: str = ''
+    top_k: int = 5
+    # Заметка выбирается без LLM, если близость не ниже порога и отрыв от следующей не меньше margin
+    direct_threshold: float = 0.6
+    direct_margin: float = 0.25
+
+
+@dataclass
+class SendQueue:
+    # Ограничения Telegram: около 30 сообщений в секунду на бота и 1 в секунду в чат
+    global_rate: float = 30
+    chat_rate: float = 1
+    chat_burst: float = 3
+    max_retries: int = 5
+    metrics_interval: float = 60
+
+
+@dataclass
+class SpeechRecognition:
+    # whisper - PyTorch float32, faster-whisper - CTranslate2 с квантованием compute_type
+    backend: str = 'whisper'
+    model: str = 'base'
+    compute_type: str = 'int8'
+    language: str = 'ru'
+    # Детектор речи перед распознаванием (energy, silero или none) и длина фрагмента для модели
+    vad: str = 'energy'
+    max_chunk_seconds: float = 30
+    # Длинные записи распознаются по фрагментам, маршрутизация начинается с первого
+    streaming: bool = True
+    # Фрагменты одновременных сообщений распознаются пачкой до max_batch_size, ожидание пачки - до max_batch_wait_ms
+    max_batch_size: int = 8
+    max_batch_wait_ms: float = 30
+    # Сколько фрагментов одного сообщения может одновременно ждать в пачках
+    stream_in_flight: int = 2
+    # Процессы с загруженной моделью (0 - по числу ядер) и длина очереди заданий
+    workers: int = 2
+    queue_size: int = 8
+
+
+@dataclass
+class TextToSpeech:
+    language: str = 'ru'
+    # Процессы синтеза, потоки torch на процесс (0 - ядра поровну) и длина очереди заданий
+    workers: int = 1
+    threads: int = 0
+    queue_size: int = 4
+    # Длинный ответ синтезируется и отправляется фрагментами из целых предложений
+    max_chunk_chars: int = 400
+    # Сколько фрагментов одного ответа одновременно стоит в очереди синтеза
+    stream_in_flight: int = 2
+    # Битрейт голосового ответа OGG/Opus, бит/с
+    bitrate: int = 32000
+
+
 @dataclass
 class Config:
     telegram: Telegram
     neural_networks: NeuralNetworks
     google_calendar: GoogleCalendar
+    guide_pool: GuidePool
+    router: Router
+    dialog_context: DialogContext
+    dialog_store: DialogStore
+    storage: Storage
+    memory_index: MemoryIndex
+    send_queue: SendQueue
+    speech_recognition: SpeechRecognition
+    text_to_speech: TextToSpeech
 
 
 def get_config():
     load_dotenv()
+    context_max_tokens = int(getenv('DIALOG_CONTEXT_MAX_TOKENS', 8000))
+    context_budgets = _parse_budgets(getenv('DIALOG_CONTEXT_BUDGETS'))
 
     return Config(
         telegram=Telegram(
@@ -73,5 +210,71 @@ def get_config():
             credentials_path=getenv('GOOGLE_CALENDAR_CREDENTIALS_PATH', 'credentials.json'),
             token_path=getenv('GOOGLE_CALENDAR_TOKEN_PATH', 'token.pickle'),
             timezone=getenv('GOOGLE_CALENDAR_TIMEZONE', 'Europe/Moscow')
+        ),
+        guide_pool=GuidePool(
+            max_size=int(getenv('GUIDE_POOL_MAX_SIZE', 256)),
+            idle_ttl=int(getenv('GUIDE_POOL_IDLE_TTL', 3600))
+        ),
+        router=Router(
+            intent_model_path=getenv('ROUTER_INTENT_MODEL_PATH', 'models/intent_classifier.joblib'),
+            intent_threshold=float(getenv('ROUTER_INTENT_THRESHOLD', 0.75)),
+            decisions_log=getenv('ROUTER_DECISIONS_LOG', 'temp/router_decisions.jsonl'),
+            output_llm_fallback=getenv('ROUTER_OUTPUT_LLM_FALLBACK', 'false').lower() == 'true'
+        ),
+        dialog_context=DialogContext(
+            max_tokens=context_max_tokens,
+            budgets=context_budgets,
+            summary_keep_tokens=_summary_keep_tokens(
+                getenv('DIALOG_SUMMARY_KEEP_TOKENS'), context_max_tokens, context_budgets
+            ),
+            summary_min_tokens=int(getenv('DIALOG_SUMMARY_MIN_TOKENS', 2000)),
+            summary_max_batch_tokens=int(getenv('DIALOG_SUMMARY_MAX_BATCH_TOKENS', 8000))
+        ),
+        dialog_store=DialogStore(
+            max_chats=int(getenv('DIALOG_STORE_MAX_CHATS', 1024)),
+            idle_ttl=int(getenv('DIALOG_STORE_IDLE_TTL', 3600)),
+            flush_interval=float(getenv('DIALOG_STORE_FLUSH_INTERVAL', 2.0))
+        ),
+        storage=Storage(
+            backend=getenv('STORAGE_BACKEND', 'json').lower(),
+            base_dir=getenv('STORAGE_BASE_DIR', 'temp'),
+            sqlite_path=getenv('STORAGE_SQLITE_PATH', 'temp/assistant.db'),
+            preferences_file=getenv('STORAGE_PREFERENCES_FILE', 'user_preferences.json')
+        ),
+        memory_index=MemoryIndex(
+            embedding_model=getenv('MEMORY_EMBEDDING_MODEL', ''),
+            top_k=int(getenv('MEMORY_TOP_K', 5)),
+            direct_threshold=float(getenv('MEMORY_DIRECT_THRESHOLD', 0.6)),
+            direct_margin=float(getenv('MEMORY_DIRECT_MARGIN', 0.25))
+        ),
+        send_queue=SendQueue(
+            global_rate=float(getenv('SEND_QUEUE_GLOBAL_RATE', 30)),
+            chat_rate=float(getenv('SEND_QUEUE_CHAT_RATE', 1)),
+            chat_burst=float(getenv('SEND_QUEUE_CHAT_BURST', 3)),
+            max_retries=int(getenv('SEND_QUEUE_MAX_RETRIES', 5)),
+            metrics_interval=float(getenv('SEND_QUEUE_METRICS_INTERVAL', 60))
+        ),
+        speech_recognition=SpeechRecognition(
+            backend=getenv('WHISPER_BACKEND', 'whisper').lower(),
+            model=getenv('WHISPER_MODEL', 'base'),
+            compute_type=getenv('WHISPER_COMPUTE_TYPE', 'int8'),
+            language=getenv('WHISPER_LANGUAGE', 'ru'),
+            vad=getenv('WHISPER_VAD', 'energy').lower(),
+            max_chunk_seconds=float(getenv('WHISPER_MAX_CHUNK_SECONDS', 30)),
+            streaming=getenv('WHISPER_STREAMING', 'true').lower() == 'true',
+            max_batch_size=int(getenv('WHISPER_MAX_BATCH_SIZE', 8)),
+            max_batch_wait_ms=float(getenv('WHISPER_MAX_BATCH_WAIT_MS', 30)),
+            stream_in_flight=int(getenv('WHISPER_STREAM_IN_FLIGHT', 2)),
+            workers=int(getenv('WHISPER_WORKERS', 2)),
+            queue_size=int(getenv('WHISPER_QUEUE_SIZE', 8))
+        ),
+        text_to_speech=TextToSpeech(
+            language=getenv('TTS_LANGUAGE', 'ru'),
+            workers=int(getenv('TTS_WORKERS', 1)),
+            threads=int(getenv('TTS_THREADS', 0)),
+            queue_size=int(getenv('TTS_QUEUE_SIZE', 4)),
+            max_chunk_chars=int(getenv('TTS_MAX_CHUNK_CHARS', 400)),
+            stream_in_flight=int(getenv('TTS_STREAM_IN_FLIGHT', 2)),
+            bitrate=int(getenv('TTS_BITRATE', 32000))
         )
     )
@@ -0,0 +1,90 @@
+"""
+Перенос состояния бота из JSON файлов в базу SQLite.
+
+Переносятся контексты диалогов (снимок и журнал), заметки, напоминания
+и настройки пользователей. Исходные файлы не изменяются.
+
+Пример запуска:
+    python migrate_json_to_sqlite.py --source temp --database temp/assistant.db
+"""
+import argparse
+import glob
+import os
+import re
+
+from config import get_config
+from src.neural_networks.dialog_manager import DialogManager
+from src.storage import JsonStorage, SQLiteStorage
+from src.telegram_bot.reminder_store import ensure_unique_ids
+
+_CONTEXT_FILE_RE = re.compile(r'dialogue_context(?:_(-?\d+))?\.jsonl?$')
+_MEMORY_FILE_RE = re.compile(r'memories_(-?\d+)\.json$')
+
+
+def migrate_dialogs(source: JsonStorage, target: SQLiteStorage) -> int:
+    migrated = 0
+    chat_ids = set()
+    # Контекст может состоять только из журнала, если снимок еще не создавался
+    for path in glob.glob(os.path.join(source.base_dir, 'dialogue_context*.json*')):
+        match = _CONTEXT_FILE_RE.search(os.path.basename(path))
+        if match:
+            chat_ids.add(int(match.group(1)) if match.group(1) else None)
+
+    for chat_id in sorted(chat_ids, key=lambda value: (value is not None, value or 0)):
+        path = source.dialog_context_file(chat_id)
+
+        # DialogManager воспроизводит журнал поверх снимка
+        manager = DialogManager(context_file=path)
+        state = {'messages': manager.context['messages']}
+        if manager.context.get('summary'):
+            state['summary'] = manager.context['summary']
+        target.dialog_journal(chat_id).compact(state)
+        migrated += 1
+    return migrated
+
+
+def migrate_memories(source: JsonStorage, target: SQLiteStorage) -> int:
+    migrated = 0
+    for path in sorted(glob.glob(os.path.join(source.base_dir, 'memories_*.json'))):
+        match = _MEMORY_FILE_RE.search(os.path.basename(path))
+        if not match:
+            continue
+        chat_id = int(match.group(1))
+        target.save_memories(chat_id, source.load_memories(chat_id))
+        migrated += 1
+    return migrated
+
+
+def migrate_preferences(source: JsonStorage, target: SQLiteStorage) -> int:
+    preferences = source.load_preferences()
+    for chat_id, chat_preferences in preferences.items():
+        target.save_chat_preferences(chat_id, chat_preferences, preferences)
+    return len(preferences)
+
+
+def main():
+    storage_config = get_config().storage
+
+    parser = argparse.ArgumentParser(description="Перенос состояния бота из JSON файлов в SQLite")
+    parser.add_argument('--source', default=storage_config.base_dir, help="Директория JSON файлов состояния")
+    parser.add_argument('--preferences', default=storage_config.preferences_file, help="Файл настроек пользователей")
+    parser.add_argument('--database', default=storage_config.sqlite_path, help="Путь к базе SQLite")
+    args = parser.parse_args()
+
+    source = JsonStorage(args.source, args.preferences)
+    target = SQLiteStorage(args.database)
+    try:
+        print(f"Диалогов: {migrate_dialogs(source, target)}")
+        print(f"Файлов заметок: {migrate_memories(source, target)}")
+        reminders = source.load_reminders()
+        ensure_unique_ids(reminders)
+        target.save_reminders(reminders)
+        print(f"Напоминаний: {len(reminders)}")
+        print(f"Настроек чатов: {migrate_preferences(source, target)}")
+    finally:
+        target.close()
+    print(f"База данных готова: {args.database}. Для использования задайте STORAGE_BACKEND=sqlite")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+from abc import ABC, abstractmethod
+import logging
+from typing import List
+
+import numpy as np
+
+
+class ASRModel(ABC):
+    """
+    Абстрактный базовый класс для движков распознавания речи.
+    """
+
+    def __init__(self, language: str = 'ru'):
+        """
+        Инициализация базового класса движка распознавания.
+
+        :param language: Язык распознавания
+        :type language: str
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.language = language
+
+    @abstractmethod
+    def transcribe(self, audio: np.ndarray) -> str:
+        """
+        Распознавание речи из сигнала.
+
+        :param audio: Моно сигнал float32 с частотой 16 кГц
+        :type audio: np.ndarray
+        :return: Распознанный текст
+        :rtype: str
+        """
+        pass
+
+    def transcribe_batch(self, audios: List[np.ndarray]) -> List[str]:
+        """
+        Распознавание нескольких фрагментов за один вызов.
+        По умолчанию фрагменты распознаются по очереди; движки с пакетным
+        выводом переопределяют метод.
+
+        :param audios: Фрагменты не длиннее окна модели
+        :type audios: List[np.ndarray]
+        :return: Тексты в том же порядке
+        :rtype: List[str]
+        """
+        return [self.transcribe(audio) for audio in audios]
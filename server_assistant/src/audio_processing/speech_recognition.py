@@ -1,9 +1,24 @@
+import io
 import logging
 import os
+from typing import List, Union
 
-import librosa
 import numpy as np
 import soundfile as sf
+import soxr
+
+from src.audio_processing.base.asr_model import ASRModel
+from src.audio_processing.vad import create_vad, group_segments
+
+logger = logging.getLogger(__name__)
+
+# Частота дискретизации, с которой работает Whisper
+WHISPER_SAMPLE_RATE = 16000
+
+# Пороги повторного распознавания с повышением температуры (значения по умолчанию whisper.transcribe)
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
 
 
 def find_ffmpeg_path():
@@ -39,159 +54,295 @@ def find_ffmpeg_path():
 # Глобальная переменная для пути FFmpeg
 FFMPEG_PATH = find_ffmpeg_path()
 
+
+def decode_audio(audio: Union[str, bytes]) -> np.ndarray:
+    """
+    Декодирует аудио (OGG/Opus, WAV и другие форматы libsndfile) в память:
+    моно float32 с частотой 16 кГц, без промежуточных файлов.
+
+    :param audio: Путь к аудиофайлу или его содержимое
+    :type audio: str | bytes
+    :return: Отсчеты сигнала для Whisper
+    :rtype: np.ndarray
+    """
+    source = io.BytesIO(audio) if isinstance(audio, (bytes, bytearray)) else audio
+    data, samplerate = sf.read(source, dtype='float32')
+
+    # Преобразование в моно, если стерео
+    if data.ndim > 1:
+        data = data.mean(axis=1)
+
+    # Принудительная частота дискретизации 16 кГц
+    if samplerate != WHISPER_SAMPLE_RATE:
+        data = soxr.resample(data, samplerate, WHISPER_SAMPLE_RATE)
+
+    return np.ascontiguousarray(data, dtype=np.float32)
+
+
+def split_speech(audio: np.ndarray, vad, max_chunk_samples: int) -> List[np.ndarray]:
+    """
+    Готовит сигнал к распознаванию: выделяет речь детектором, нормализует
+    по пику речи и собирает фрагменты не длиннее окна модели.
+
+    Тишина по краям и в длинных паузах не передается модели: время ее работы
+    растет с длиной аудио.
+
+    :param audio: Моно сигнал float32 с частотой 16 кГц (изменяется на месте)
+    :type audio: np.ndarray
+    :param vad: Детектор речи (см. src.audio_processing.vad)
+    :param max_chunk_samples: Максимальная длина фрагмента в отсчетах
+    :type max_chunk_samples: int
+    :return: Фрагменты по порядку; пустой список, если речи нет
+    :rtype: List[np.ndarray]
+    """
+    speech = vad.detect(audio)
+    logger.info(
+        f"Речь: {speech.speech_samples / WHISPER_SAMPLE_RATE:.1f} с, "
+        f"отброшено тишины: {speech.dropped_seconds:.1f} с"
+    )
+    if speech.is_silent:
+        logger.info("Речь не обнаружена, распознавание пропущено")
+        return []
+
+    # Нормализация к диапазону [-1, 1] по пику речи
+    peak = max(float(np.max(np.abs(audio[start:end]))) for start, end in speech.segments)
+    if peak > 0:
+        audio /= peak
+
+    return [
+        np.concatenate([audio[start:end] for start, end in chunk])
+        for chunk in group_segments(speech.segments, max_chunk_samples)
+    ]
+
+
+class WhisperASR(ASRModel):
+    """
+    Распознавание моделью openai-whisper (PyTorch, float32 на CPU).
+    """
+
+    def __init__(self, language: str = 'ru', model_name: str = 'base'):
+        """
+        :param language: Язык распознавания
+        :type language: str
+        :param model_name: Название модели Whisper
+        :type model_name: str
+        """
+        super().__init__(language)
+        import whisper
+        whisper.audio.ffmpeg_path = FFMPEG_PATH  # Явно устанавливаем путь
+        self.model = whisper.load_model(model_name)
+
+    def transcribe(self, audio: np.ndarray) -> str:
+        result = self.model.transcribe(
+            audio,
+            language=self.language,
+            fp16=False      # Отключаем float16 для совместимости
+        )
+        return result['text'].strip()
+
+    def transcribe_batch(self, audios: List[np.ndarray]) -> List[str]:
+        """
+        Пакетное распознавание: лог-мел спектрограммы фрагментов, дополненных
+        до окна модели (30 с), проходят энкодер и декодер одной пачкой.
+
+        Пачка декодируется жадно (температура 0). Фрагменты, на которых жадный
+        проход сорвался (зацикливание или низкая уверенность, пороги как в
+        whisper.transcribe), распознаются повторно по одному с повышением температуры.
+
+        :param audios: Фрагменты не длиннее 30 секунд
+        :type audios: List[np.ndarray]
+        :return: Тексты в том же порядке
+        :rtype: List[str]
+        """
+        import torch
+        import whisper
+        mels = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), n_mels=self.model.dims.n_mels)
+            for audio in audios
+        ]).to(self.model.device)
+        options = whisper.DecodingOptions(language=self.language, fp16=False, without_timestamps=True)
+        results = whisper.decode(self.model, mels, options)
+        texts = []
+        for audio, result in zip(audios, results):
+            if result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob < LOGPROB_THRESHOLD:
+                # Как и whisper.transcribe, фрагмент без речи пропускаем
+                texts.append('')
+            elif result.compression_ratio > COMPRESSION_RATIO_THRESHOLD or result.avg_logprob < LOGPROB_THRESHOLD:
+                texts.append(self.transcribe(audio))
+            else:
+                texts.append(result.text.strip())
+        return texts
+
+
+class FasterWhisperASR(ASRModel):
+    """
+    Распознавание через faster-whisper (CTranslate2) с квантованными весами.
+
+    На CPU int8 заметно быстрее float32 PyTorch, что позволяет взять модель
+    крупнее при той же задержке.
+    """
+
+    def __init__(self, language: str = 'ru', model_name: str = 'base', compute_type: str = 'int8', beam_size: int = 5):
+        """
+        :param language: Язык распознавания
+        :type language: str
+        :param model_name: Название модели Whisper или путь к сконвертированной модели CTranslate2
+        :type model_name: str
+        :param compute_type: Тип вычислений CTranslate2 (int8, int8_float32, float32)
+        :type compute_type: str
+        :param beam_size: Ширина лучевого поиска
+        :type beam_size: int
+        """
+        super().__init__(language)
+        from faster_whisper import WhisperModel
+        self.model = WhisperModel(model_name, device='cpu', compute_type=compute_type)
+        self.beam_size = beam_size
+
+    def transcribe(self, audio: np.ndarray) -> str:
+        segments, _ = self.model.transcribe(audio, language=self.language, beam_size=self.beam_size)
+        return ''.join(segment.text for segment in segments).strip()
+
+
+# Движки распознавания, выбираемые в настройках (WHISPER_BACKEND)
+ASR_BACKENDS = {
+    'whisper': WhisperASR,
+    'faster-whisper': FasterWhisperASR,
+}
+
+
+def create_asr_model(backend: str = 'whisper', language: str = 'ru', model_name: str = 'base', **kwargs) -> ASRModel:
+    """
+    Создает движок распознавания по имени.
+
+    :param backend: Имя движка из ASR_BACKENDS
+    :type backend: str
+    :param language: Язык распознавания
+    :type language: str
+    :param model_name: Название модели
+    :type model_name: str
+    :param kwargs: Дополнительные параметры движка (например, compute_type для faster-whisper)
+    :return: Движок распознавания
+    :rtype: ASRModel
+    :raises ValueError: Если движок неизвестен
+    """
+    if backend not in ASR_BACKENDS:
+        raise ValueError(f"Неизвестный движок распознавания: {backend}")
+    return ASR_BACKENDS[backend](language=language, model_name=model_name, **kwargs)
+
+
 class AudioTranscriber:
     """
-    Класс для распознавания речи с использованием модели Whisper.
-    
-    Поддерживает конвертацию различных аудиоформатов в WAV и их транскрибацию.
-    Требует установленного FFmpeg для обработки аудио.
+    Класс для распознавания речи.
+
+    Декодирует аудио (в том числе OGG/Opus голосовых сообщений) прямо в память
+    и передает сигнал выбранному движку (Whisper или faster-whisper) без временных файлов.
     """
 
-    def __init__(self, language: str = 'ru'):
+    def __init__(
+        self,
+        language: str = 'ru',
+        model_name: str = 'base',
+        backend: str = 'whisper',
+        compute_type: str = 'int8',
+        vad: str = 'energy',
+        max_chunk_seconds: float = 30
+    ):
+        """
+        :param language: Язык распознавания
+        :type language: str
+        :param model_name: Название модели Whisper
+        :type model_name: str
+        :param backend: Движок распознавания из ASR_BACKENDS
+        :type backend: str
+        :param compute_type: Тип вычислений для faster-whisper
+        :type compute_type: str
+        :param vad: Детектор речи (energy, silero или none)
+        :type vad: str
+        :param max_chunk_seconds: Максимальная длина фрагмента, передаваемого модели за раз
+        :type max_chunk_seconds: float
+        """
         self.logger = logging.getLogger(__name__)
+        self.language = language
+        self.vad = create_vad(vad, WHISPER_SAMPLE_RATE)
+        self.max_chunk_samples = int(max_chunk_seconds * WHISPER_SAMPLE_RATE)
         
         # Логируем путь к FFmpeg
         self.logger.info(f"Путь к FFmpeg: {FFMPEG_PATH}")
         
         try:
-            # Используем базовую модель для экономии ресурсов
-            import whisper
-            whisper.audio.ffmpeg_path = FFMPEG_PATH  # Явно устанавливаем путь
-            self.model = whisper.load_model("base")
-            self.language = language
+            # Квантование настраивается только у faster-whisper
+            options = {'compute_type': compute_type} if backend == 'faster-whisper' else {}
+            self.model = create_asr_model(backend, language, model_name, **options)
+            self.logger.info(f"Загружена модель распознавания: {backend}/{model_name}")
         except Exception as e:
-            self.logger.error(f"Ошибка загрузки модели Whisper: {e}")
+            self.logger.error(f"Ошибка загрузки модели распознавания: {e}")
             raise
 
-    def _convert_audio(self, input_path: str, output_path: str = None) -> str:
+    def transcribe_chunk(self, chunk: np.ndarray) -> str:
         """
-        Конвертация аудио в формат WAV для обработки Whisper.
-        Включает нормализацию, приведение к моно и ресемплинг до 16кГц.
-
-        :param input_path: Путь к исходному аудиофайлу
-        :type input_path: str
-        :param output_path: Опциональный путь для сохранения WAV файла
-        :type output_path: str | None
-        :return: Путь к конвертированному WAV файлу или исходному файлу при ошибке
+        Распознает один подготовленный фрагмент (см. split_speech).
+
+        :param chunk: Нормализованный сигнал 16 кГц не длиннее окна модели
+        :type chunk: np.ndarray
+        :return: Распознанный текст
         :rtype: str
         """
-        # Расширенная диагностика входного файла
-        self.logger.info(f"Начало конвертации файла: {input_path}")
-        
-        # Проверка существования входного файла
-        if not os.path.exists(input_path):
-            self.logger.error(f"Входной файл не существует: {input_path}")
-            return input_path
-        
-        # Проверка размера входного файла
-        input_file_size = os.path.getsize(input_path)
-        self.logger.info(f"Размер входного файла: {input_file_size} байт")
-        
-        if input_file_size == 0:
-            self.logger.error("Входной файл пустой")
-            return input_path
-        
-        # Генерация пути для выходного файла .wav
-        if not output_path:
-            base_dir = os.path.dirname(input_path)
-            filename = os.path.splitext(os.path.basename(input_path))[0]
-            output_path = os.path.join(base_dir, f'{filename}.wav')
-        
-        try:
-            # Чтение исходного аудио
-            data, samplerate = sf.read(input_path)
-            
-            # Логирование параметров аудио
-            self.logger.info(f"Частота дискретизации: {samplerate} Гц")
-            self.logger.info(f"Количество каналов: {data.ndim}")
-            
-            # Преобразование в моно, если стерео
-            if data.ndim > 1:
-                data = data.mean(axis=1)
-            
-            # Принудительная частота дискретизации 16 кГц
-            if samplerate != 16000:
-                self.logger.info(f"Пересемплирование с {samplerate} до 16000 Гц")
-                data = librosa.resample(data, orig_sr=samplerate, target_sr=16000)
-                samplerate = 16000
-            
-            # Запись в .wav
-            sf.write(output_path, data, samplerate)
-            
-            # Проверка результата
-            output_file_size = os.path.getsize(output_path)
-            self.logger.info(f"Размер выходного файла: {output_file_size} байт")
-            
-            if output_file_size == 0:
-                self.logger.error("Выходной файл пустой")
-                return input_path
-            
-            return output_path
-        
-        except Exception as e:
-            self.logger.error(f"Критическая ошибка конвертации: {e}", exc_info=True)
-            return input_path
+        return self.model.transcribe(chunk)
+
+    def transcribe_chunks(self, chunks: List[np.ndarray]) -> List[str]:
+        """
+        Распознает пачку подготовленных фрагментов за один проход модели.
+
+        :param chunks: Фрагменты (в том числе из разных сообщений)
+        :type chunks: List[np.ndarray]
+        :return: Тексты в том же порядке
+        :rtype: List[str]
+        """
+        return self.model.transcribe_batch(chunks)
 
-    def transcribe_audio(self, audio_path: str) -> str:
+    def transcribe_audio(self, audio: Union[str, bytes]) -> str:
         """
-        Распознавание речи из аудиофайла с использованием Whisper.
+        Распознавание речи из аудио выбранным движком.
 
-        :param audio_path: Путь к аудиофайлу для распознавания
-        :type audio_path: str
+        :param audio: Путь к аудиофайлу или содержимое файла (например, голосовое сообщение, скачанное в память)
+        :type audio: str | bytes
         :return: Распознанный текст или пустая строка при ошибке
         :rtype: str
         """
         try:
-            # Расширенная диагностика входного файла
-            self.logger.info(f"Начало распознавания файла: {audio_path}")
-            
-            # Проверка существования файла
-            if not os.path.exists(audio_path):
-                self.logger.error(f"Файл не существует: {audio_path}")
-                return ""
-            
-            # Проверка размера файла
-            file_size = os.path.getsize(audio_path)
-            self.logger.info(f"Размер файла: {file_size} байт")
-            
-            if file_size == 0:
-                self.logger.error("Файл пустой")
-                return ""
-            
-            # Конвертация файла, если необходимо
-            if not audio_path.lower().endswith('.wav'):
-                self.logger.info("Конвертация файла в формат .wav")
-                audio_path = self._convert_audio(audio_path)
-            
-            # Прямая загрузка аудио с использованием soundfile
-            self.logger.info("Конвертация завершена")
-            audio_data, sample_rate = sf.read(audio_path)
-            
-            # Логирование параметров аудио
-            self.logger.info(f"Частота дискретизации: {sample_rate} Гц")
-            self.logger.info(f"Количество каналов: {audio_data.ndim}")
-            
-            # Преобразование в моно, если стерео
-            if audio_data.ndim > 1:
-                audio_data = audio_data.mean(axis=1)
-            
-            # Принудительная нормализация к диапазону [-1, 1]
-            audio_data = audio_data.astype(np.float32)
-            audio_data /= np.max(np.abs(audio_data))
-            
-            # Распознавание речи
-            result = self.model.transcribe(
-                audio_data, 
-                language='ru',  # Указываем русский язык
-                fp16=False      # Отключаем float16 для совместимости
-            )
-            
-            # Извлечение и логирование результата
-            transcribed_text = result['text'].strip()
+            if isinstance(audio, (bytes, bytearray)):
+                self.logger.info(f"Начало распознавания аудио из памяти: {len(audio)} байт")
+                if not audio:
+                    self.logger.error("Аудио пустое")
+                    return ""
+            else:
+                # Расширенная диагностика входного файла
+                self.logger.info(f"Начало распознавания файла: {audio}")
+
+                # Проверка существования файла
+                if not os.path.exists(audio):
+                    self.logger.error(f"Файл не существует: {audio}")
+                    return ""
+
+                # Проверка размера файла
+                file_size = os.path.getsize(audio)
+                self.logger.info(f"Размер файла: {file_size} байт")
+
+                if file_size == 0:
+                    self.logger.error("Файл пустой")
+                    return ""
+
+            audio_data = decode_audio(audio)
+            self.logger.info(f"Аудио декодировано: {len(audio_data) / WHISPER_SAMPLE_RATE:.1f} с")
+
+            # Распознавание речи по фрагментам не длиннее окна модели
+            texts = [self.transcribe_chunk(chunk) for chunk in split_speech(audio_data, self.vad, self.max_chunk_samples)]
+            transcribed_text = ' '.join(text for text in texts if text)
+
             self.logger.info(f"Распознанный текст: {transcribed_text}")
-            
+
             return transcribed_text
-        
+
         except Exception as e:
             self.logger.error(f"Критическая ошибка распознавания речи: {e}", exc_info=True)
-            return ""
\ No newline at end of file
+            return ""
@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, AsyncIterator, Callable, List, Optional, Union
+
+from config import get_config
+from src.utils.speech_text import normalize_for_speech, split_sentences
+
+# Синтезатор, загруженный в процессе-обработчике при его запуске
+_worker_synthesizer: Any = None
+
+
+class SynthesisQueueFull(Exception):
+    """Очередь синтеза речи заполнена, новое задание не принято."""
+
+
+def load_voice_synthesizer(**options):
+    """
+    Создает синтезатор Silero. Вызывается внутри процесса-обработчика.
+
+    :param options: Параметры VoiceSynthesizer (language, threads, bitrate)
+    :return: Синтезатор с методом synthesize_voice(text)
+    """
+    from src.audio_processing.voice_synthesis import VoiceSynthesizer
+    return VoiceSynthesizer(**options)
+
+
+def _init_worker(factory: Callable[..., Any], options: dict):
+    global _worker_synthesizer
+    _worker_synthesizer = factory(**options)
+
+
+def _synthesize_in_worker(text: str) -> bytes:
+    return _worker_synthesizer.synthesize_voice(text)
+
+
+class SynthesisService:
+    """
+    Синтез речи Silero в пуле процессов.
+
+    Модель загружается в каждом процессе один раз, число потоков torch
+    задается на процесс, чтобы процессы не делили ядра между собой.
+    Цикл событий бота только ждет готовое голосовое сообщение OGG/Opus, поэтому синтез длинного
+    ответа не задерживает другие чаты. Если заданий больше, чем
+    workers + queue_size, новое отклоняется с SynthesisQueueFull.
+    """
+
+    def __init__(
+        self,
+        workers: int = 1,
+        queue_size: int = 4,
+        threads: int = 0,
+        max_chunk_chars: int = 400,
+        stream_in_flight: int = 2,
+        factory: Callable[..., Any] = load_voice_synthesizer,
+        **options
+    ):
+        """
+        :param workers: Количество процессов синтеза
+        :type workers: int
+        :param queue_size: Сколько заданий может ждать свободного процесса
+        :type queue_size: int
+        :param threads: Потоков torch на процесс (0 - ядра поровну между процессами)
+        :type threads: int
+        :param max_chunk_chars: Максимальная длина фрагмента ответа для synthesize_stream
+        :type max_chunk_chars: int
+        :param stream_in_flight: Сколько фрагментов одного ответа одновременно ставится в очередь
+        :type stream_in_flight: int
+        :param factory: Функция уровня модуля, создающая синтезатор по параметрам options
+        :type factory: Callable
+        :param options: Параметры синтезатора (например, language, bitrate)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.workers = max(1, workers)
+        self.capacity = self.workers + queue_size
+        self.threads = threads if threads > 0 else max(1, (os.cpu_count() or 1) // self.workers)
+        self.max_chunk_chars = max_chunk_chars
+        self.stream_in_flight = max(1, stream_in_flight)
+        self._pending = 0
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(factory, dict(options, threads=self.threads))
+        )
+        self.logger.info(f"Запущен синтез речи: {self.workers} процессов по {self.threads} потоков, очередь {queue_size}")
+
+    @property
+    def pending(self) -> int:
+        """Количество заданий в работе и в очереди."""
+        return self._pending
+
+    async def synthesize(self, text: str) -> bytes:
+        """
+        Синтезирует речь в одном из процессов.
+
+        :param text: Текст ответа
+        :type text: str
+        :return: Голосовое сообщение OGG/Opus или пустые байты при ошибке
+        :rtype: bytes
+        :raises SynthesisQueueFull: Если очередь заданий заполнена
+        """
+        if self._pending >= self.capacity:
+            raise SynthesisQueueFull(f"В очереди синтеза уже {self._pending} заданий")
+        self._pending += 1
+        try:
+            return await asyncio.wrap_future(self._submit(normalize_for_speech(text)))
+        finally:
+            self._pending -= 1
+
+    def _submit(self, text: str):
+        return self._executor.submit(_synthesize_in_worker, text)
+
+    def split_reply(self, text: str) -> List[str]:
+        """
+        Делит ответ на фрагменты из целых предложений для synthesize_stream.
+
+        Фрагменты - исходный текст: нормализуется каждый фрагмент отдельно,
+        поэтому недоговоренную часть ответа можно отправить текстом как есть.
+
+        :param text: Текст ответа
+        :type text: str
+        :return: Фрагменты по порядку
+        :rtype: List[str]
+        """
+        return split_sentences(text, self.max_chunk_chars)
+
+    def _submit_chunk(self, text: str) -> asyncio.Future:
+        # Каждый фрагмент занимает место в очереди, пока не синтезирован или не отменен
+        future = asyncio.wrap_future(self._submit(normalize_for_speech(text)))
+        self._pending += 1
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, _future: asyncio.Future):
+        self._pending -= 1
+
+    async def synthesize_stream(self, text: Union[str, List[str]]) -> AsyncIterator[bytes]:
+        """
+        Синтезирует длинный ответ по фрагментам из целых предложений.
+
+        В очереди пула одновременно не больше stream_in_flight фрагментов ответа:
+        пока вызывающий отправляет фрагмент N, следующие уже синтезируются,
+        а место в очереди остается ответам других чатов. Каждый фрагмент
+        считается отдельным заданием, но заполненность очереди проверяется
+        только при начале ответа: начатый ответ не обрывается.
+
+        :param text: Текст ответа или фрагменты, полученные из split_reply
+        :type text: str | List[str]
+        :return: Асинхронный генератор голосовых сообщений OGG/Opus по фрагментам (пустые байты - ошибка синтеза)
+        :raises SynthesisQueueFull: Если очередь заданий заполнена
+        """
+        if self._pending >= self.capacity:
+            raise SynthesisQueueFull(f"В очереди синтеза уже {self._pending} заданий")
+        chunks = self.split_reply(text) if isinstance(text, str) else text
+        futures: List[asyncio.Future] = []
+        try:
+            # Скользящее окно: отданный фрагмент освобождает место следующему
+            for chunk in chunks[:self.stream_in_flight]:
+                futures.append(self._submit_chunk(chunk))
+            for index in range(len(chunks)):
+                voice = await futures[index]
+                following = index + self.stream_in_flight
+                if following < len(chunks):
+                    futures.append(self._submit_chunk(chunks[following]))
+                yield voice
+        finally:
+            # Генератор закрыт раньше времени: лишние задания отменяются
+            for future in futures:
+                future.cancel()
+
+    def close(self):
+        """Останавливает процессы синтеза."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_synthesis_service: Optional[SynthesisService] = None
+
+
+def get_synthesis_service() -> SynthesisService:
+    """
+    Возвращает общий сервис синтеза, создавая его по настройкам при первом обращении.
+
+    :return: Сервис синтеза речи
+    :rtype: SynthesisService
+    """
+    global _synthesis_service
+    if _synthesis_service is None:
+        tts_config = get_config().text_to_speech
+        _synthesis_service = SynthesisService(
+            workers=tts_config.workers,
+            queue_size=tts_config.queue_size,
+            threads=tts_config.threads,
+            max_chunk_chars=tts_config.max_chunk_chars,
+            stream_in_flight=tts_config.stream_in_flight,
+            language=tts_config.language,
+            bitrate=tts_config.bitrate
+        )
+    return _synthesis_service
+
+
+def close_synthesis_service():
+    """Останавливает общий сервис синтеза, если он был создан."""
+    global _synthesis_service
+    if _synthesis_service is not None:
+        _synthesis_service.close()
+        _synthesis_service = None
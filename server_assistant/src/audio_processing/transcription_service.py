@@ -0,0 +1,310 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional, Set, Union
+
+import numpy as np
+
+from config import get_config
+from src.audio_processing.speech_recognition import WHISPER_SAMPLE_RATE, AudioTranscriber, decode_audio, split_speech
+from src.audio_processing.vad import create_vad
+
+# Распознаватель, загруженный в процессе-обработчике один раз на весь срок его жизни
+_worker_transcriber: Any = None
+
+
+class TranscriptionQueueFull(Exception):
+    """Очередь распознавания заполнена, новое задание не принято."""
+
+
+def load_whisper_transcriber(**options):
+    """
+    Создает распознаватель. Вызывается внутри процесса-обработчика.
+
+    :param options: Параметры AudioTranscriber (language, model_name, backend, compute_type, vad, ...)
+    :return: Распознаватель с методом transcribe_audio(audio)
+    """
+    return AudioTranscriber(**options)
+
+
+def _init_worker(factory: Callable[..., Any], options: dict, threads: int):
+    global _worker_transcriber
+    # Процессы делят ядра между собой, чтобы потоки torch не конкурировали
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _worker_transcriber = factory(**options)
+
+
+def _transcribe_in_worker(audio: Union[str, bytes]) -> str:
+    return _worker_transcriber.transcribe_audio(audio)
+
+
+def _transcribe_batch_in_worker(chunks: List[np.ndarray]) -> List[str]:
+    return _worker_transcriber.transcribe_chunks(chunks)
+
+
+def _split_audio(audio: Union[str, bytes], vad, max_chunk_samples: int) -> List[np.ndarray]:
+    return split_speech(decode_audio(audio), vad, max_chunk_samples)
+
+
+class MicroBatcher:
+    """
+    Собирает одиночные задания в пачки.
+
+    Пачка отправляется, когда набралось max_batch_size заданий или с момента
+    первого задания в ней прошло max_wait секунд. Так одновременные голосовые
+    сообщения разных пользователей обрабатываются моделью за один проход.
+    """
+
+    def __init__(
+        self,
+        process: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch_size: int = 8,
+        max_wait: float = 0.03
+    ):
+        """
+        :param process: Корутина обработки пачки, возвращающая результаты в том же порядке
+        :type process: Callable[[List], Awaitable[List]]
+        :param max_batch_size: Максимальный размер пачки
+        :type max_batch_size: int
+        :param max_wait: Максимальное ожидание пополнения пачки в секундах
+        :type max_wait: float
+        """
+        self.logger = logging.getLogger(__name__)
+        self.process = process
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self._items: List[Any] = []
+        self._futures: List[asyncio.Future] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Добавляет задание в текущую пачку и ждет его результат.
+
+        :param item: Задание
+        :return: Результат задания
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._items.append(item)
+        self._futures.append(future)
+        if len(self._items) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._items:
+            return
+        items, futures = self._items, self._futures
+        self._items, self._futures = [], []
+        task = asyncio.create_task(self._run(items, futures))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, items: List[Any], futures: List[asyncio.Future]):
+        self.logger.debug(f"Обработка пачки из {len(items)} заданий")
+        try:
+            results = await self.process(items)
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future, result in zip(futures, results):
+            if not future.done():
+                future.set_result(result)
+
+
+class TranscriptionService:
+    """
+    Распознавание речи в отдельных процессах.
+
+    Каждый процесс-обработчик загружает модель один раз и берет задания из
+    общей очереди пула; цикл событий бота только ждет результат и продолжает
+    отвечать на текстовые сообщения. Число заданий в очереди ограничено:
+    при переполнении новое задание сразу отклоняется с TranscriptionQueueFull.
+    Фрагменты одновременных сообщений объединяются в пачки (MicroBatcher);
+    от одного сообщения в пачках одновременно не больше stream_in_flight
+    фрагментов, чтобы длинная запись не занимала пачку целиком.
+    """
+
+    def __init__(
+        self,
+        workers: int = 1,
+        queue_size: int = 8,
+        streaming: bool = True,
+        max_batch_size: int = 8,
+        max_batch_wait: float = 0.03,
+        stream_in_flight: int = 2,
+        factory: Callable[..., Any] = load_whisper_transcriber,
+        **options
+    ):
+        """
+        :param workers: Количество процессов-обработчиков (0 - по числу ядер)
+        :type workers: int
+        :param queue_size: Сколько заданий может ждать свободного обработчика
+        :type queue_size: int
+        :param streaming: Распознавать длинные записи по фрагментам (transcribe_stream)
+        :type streaming: bool
+        :param max_batch_size: Максимальное количество фрагментов, распознаваемых за один проход модели
+        :type max_batch_size: int
+        :param max_batch_wait: Сколько секунд ждать пополнения пачки фрагментов
+        :type max_batch_wait: float
+        :param stream_in_flight: Сколько фрагментов одного сообщения одновременно ставится в пачки
+        :type stream_in_flight: int
+        :param factory: Функция уровня модуля, создающая распознаватель по параметрам options
+        :type factory: Callable
+        :param options: Параметры распознавателя (language, model_name, backend, compute_type, vad, ...)
+        """
+        self.logger = logging.getLogger(__name__)
+        cpu_count = os.cpu_count() or 1
+        self.workers = workers if workers > 0 else cpu_count
+        self.capacity = self.workers + queue_size
+        self._pending = 0
+        self.streaming = streaming
+        self.stream_in_flight = max(1, stream_in_flight)
+        self.max_chunk_samples = int(options.get('max_chunk_seconds', 30) * WHISPER_SAMPLE_RATE)
+        self._vad_name = options.get('vad', 'energy')
+        self._vad = None
+        # spawn: процессы не наследуют потоки и состояние цикла событий бота
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(factory, options, max(1, cpu_count // self.workers))
+        )
+        self._batcher = MicroBatcher(self._transcribe_batch, max_batch_size, max_batch_wait)
+        self.logger.info(f"Запущено распознавание речи: {self.workers} процессов, очередь {queue_size}")
+
+    async def _transcribe_batch(self, chunks: List[np.ndarray]) -> List[str]:
+        return await asyncio.wrap_future(self._executor.submit(_transcribe_batch_in_worker, chunks))
+
+    @property
+    def pending(self) -> int:
+        """Количество заданий в работе и в очереди."""
+        return self._pending
+
+    async def transcribe(self, audio: Union[str, bytes]) -> str:
+        """
+        Распознает речь в одном из процессов-обработчиков.
+
+        :param audio: Путь к аудиофайлу или его содержимое
+        :type audio: str | bytes
+        :return: Распознанный текст или пустая строка при ошибке
+        :rtype: str
+        :raises TranscriptionQueueFull: Если очередь заданий заполнена
+        """
+        if self._pending >= self.capacity:
+            raise TranscriptionQueueFull(f"В очереди распознавания уже {self._pending} заданий")
+        self._pending += 1
+        try:
+            future = self._executor.submit(_transcribe_in_worker, audio)
+            return await asyncio.wrap_future(future)
+        finally:
+            self._pending -= 1
+
+    async def transcribe_stream(self, audio: Union[str, bytes]) -> AsyncIterator[str]:
+        """
+        Распознает запись по фрагментам (окнам модели) и отдает текст каждого фрагмента
+        сразу по готовности, не дожидаясь конца записи.
+
+        Речь выделяется и делится на фрагменты в потоке бота, фрагменты
+        собираются в пачки вместе с фрагментами других сообщений, распознаются
+        в процессах-обработчиках и отдаются по порядку. Следующий фрагмент
+        ставится в пачку, когда освобождается место в окне stream_in_flight.
+        Если потоковый режим выключен, отдается один текст всей записи.
+
+        :param audio: Путь к аудиофайлу или его содержимое
+        :type audio: str | bytes
+        :return: Асинхронный генератор текстов фрагментов
+        :raises TranscriptionQueueFull: Если очередь заданий заполнена
+        """
+        if not self.streaming:
+            text = await self.transcribe(audio)
+            if text:
+                yield text
+            return
+
+        if self._pending >= self.capacity:
+            raise TranscriptionQueueFull(f"В очереди распознавания уже {self._pending} заданий")
+        self._pending += 1
+        tasks = []
+        try:
+            if self._vad is None:
+                self._vad = create_vad(self._vad_name)
+            try:
+                chunks = await asyncio.to_thread(_split_audio, audio, self._vad, self.max_chunk_samples)
+            except Exception as e:
+                self.logger.error(f"Ошибка декодирования аудио: {e}")
+                return
+            self.logger.info(f"Запись разделена на {len(chunks)} фрагментов")
+
+            # Скользящее окно: первый фрагмент отдается, и на его место ставится следующий
+            for chunk in chunks[:self.stream_in_flight]:
+                tasks.append(asyncio.ensure_future(self._batcher.submit(chunk)))
+            for index in range(len(chunks)):
+                text = await tasks[index]
+                following = index + self.stream_in_flight
+                if following < len(chunks):
+                    tasks.append(asyncio.ensure_future(self._batcher.submit(chunks[following])))
+                if text:
+                    yield text
+        finally:
+            # Генератор закрыт раньше времени: результаты оставшихся фрагментов не нужны
+            for task in tasks:
+                task.cancel()
+            self._pending -= 1
+
+    def close(self):
+        """Останавливает процессы-обработчики."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_transcription_service: Optional[TranscriptionService] = None
+
+
+def get_transcription_service() -> TranscriptionService:
+    """
+    Возвращает общий сервис распознавания, создавая его по настройкам при первом обращении.
+
+    :return: Сервис распознавания речи
+    :rtype: TranscriptionService
+    """
+    global _transcription_service
+    if _transcription_service is None:
+        speech_config = get_config().speech_recognition
+        _transcription_service = TranscriptionService(
+            workers=speech_config.workers,
+            queue_size=speech_config.queue_size,
+            streaming=speech_config.streaming,
+            max_batch_size=speech_config.max_batch_size,
+            max_batch_wait=speech_config.max_batch_wait_ms / 1000,
+            stream_in_flight=speech_config.stream_in_flight,
+            language=speech_config.language,
+            model_name=speech_config.model,
+            backend=speech_config.backend,
+            compute_type=speech_config.compute_type,
+            vad=speech_config.vad,
+            max_chunk_seconds=speech_config.max_chunk_seconds
+        )
+    return _transcription_service
+
+
+def close_transcription_service():
+    """Останавливает общий сервис распознавания, если он был создан."""
+    global _transcription_service
+    if _transcription_service is not None:
+        _transcription_service.close()
+        _transcription_service = None
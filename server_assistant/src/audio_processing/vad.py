@@ -0,0 +1,226 @@
+import logging
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+import numpy as np
+
+# Отрезок речи: (первый отсчет, отсчет после последнего)
+Segment = Tuple[int, int]
+
+
+@dataclass
+class VADResult:
+    """Результат выделения речи из записи."""
+    sample_rate: int
+    total_samples: int
+    segments: List[Segment] = field(default_factory=list)
+
+    @property
+    def speech_samples(self) -> int:
+        return sum(end - start for start, end in self.segments)
+
+    @property
+    def dropped_seconds(self) -> float:
+        """Длительность отброшенной тишины в секундах."""
+        return (self.total_samples - self.speech_samples) / self.sample_rate
+
+    @property
+    def is_silent(self) -> bool:
+        return not self.segments
+
+
+class EnergyVAD:
+    """
+    Выделение речи по энергии кадров.
+
+    Кадр считается речью, если его громкость выше абсолютного порога и
+    заметно выше уровня шума записи (нижнего процентиля громкости кадров).
+    Короткие паузы внутри речи не разрывают отрезок, короткие всплески
+    отбрасываются, края отрезков расширяются на padding.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_ms: int = 30,
+        threshold_db: float = -45.0,
+        noise_margin_db: float = 10.0,
+        min_speech_ms: int = 250,
+        min_silence_ms: int = 500,
+        padding_ms: int = 200
+    ):
+        """
+        :param sample_rate: Частота дискретизации
+        :type sample_rate: int
+        :param frame_ms: Длина кадра в миллисекундах
+        :type frame_ms: int
+        :param threshold_db: Абсолютный порог громкости речи (дБ относительно полной шкалы)
+        :type threshold_db: float
+        :param noise_margin_db: Насколько речь должна быть громче уровня шума
+        :type noise_margin_db: float
+        :param min_speech_ms: Отрезки короче отбрасываются
+        :type min_speech_ms: int
+        :param min_silence_ms: Паузы короче не разрывают отрезок
+        :type min_silence_ms: int
+        :param padding_ms: Запас по краям отрезка
+        :type padding_ms: int
+        """
+        self.sample_rate = sample_rate
+        self.frame = max(1, sample_rate * frame_ms // 1000)
+        self.threshold_db = threshold_db
+        self.noise_margin_db = noise_margin_db
+        self.min_speech = sample_rate * min_speech_ms // 1000
+        self.min_silence = sample_rate * min_silence_ms // 1000
+        self.padding = sample_rate * padding_ms // 1000
+
+    def detect(self, audio: np.ndarray) -> VADResult:
+        """
+        Находит отрезки речи.
+
+        :param audio: Моно сигнал float32
+        :type audio: np.ndarray
+        :return: Отрезки речи и статистика
+        :rtype: VADResult
+        """
+        result = VADResult(self.sample_rate, len(audio))
+        frames = len(audio) // self.frame
+        if frames == 0:
+            return result
+
+        framed = audio[:frames * self.frame].reshape(frames, self.frame).astype(np.float64)
+        rms = np.sqrt(np.mean(framed ** 2, axis=1))
+        levels = 20 * np.log10(np.maximum(rms, 1e-10))
+        threshold = max(self.threshold_db, np.percentile(levels, 10) + self.noise_margin_db)
+        # Запись без перепадов громкости (сплошная речь) не должна целиком уйти в шум
+        if levels.max() - np.percentile(levels, 10) < self.noise_margin_db:
+            threshold = self.threshold_db
+        voiced = levels > threshold
+
+        segments: List[Segment] = []
+        for start_frame, end_frame in _runs(voiced):
+            start, end = int(start_frame) * self.frame, int(end_frame) * self.frame
+            if segments and start - segments[-1][1] < self.min_silence:
+                segments[-1] = (segments[-1][0], end)
+            else:
+                segments.append((start, end))
+
+        padded: List[Segment] = []
+        for start, end in segments:
+            if end - start < self.min_speech:
+                continue
+            start, end = max(0, start - self.padding), min(len(audio), end + self.padding)
+            if padded and start <= padded[-1][1]:
+                padded[-1] = (padded[-1][0], end)
+            else:
+                padded.append((start, end))
+        result.segments = padded
+        return result
+
+
+class SileroVAD:
+    """
+    Выделение речи моделью Silero VAD (загружается через torch.hub и кешируется им).
+    """
+
+    def __init__(self, sample_rate: int = 16000, min_silence_ms: int = 500, padding_ms: int = 200):
+        """
+        :param sample_rate: Частота дискретизации (8000 или 16000)
+        :type sample_rate: int
+        :param min_silence_ms: Паузы короче не разрывают отрезок
+        :type min_silence_ms: int
+        :param padding_ms: Запас по краям отрезка
+        :type padding_ms: int
+        """
+        import torch
+        self.torch = torch
+        self.model, utils = torch.hub.load('snakers4/silero-vad', 'silero_vad', trust_repo=True)
+        self.get_speech_timestamps = utils[0]
+        self.sample_rate = sample_rate
+        self.min_silence_ms = min_silence_ms
+        self.padding_ms = padding_ms
+
+    def detect(self, audio: np.ndarray) -> VADResult:
+        timestamps = self.get_speech_timestamps(
+            self.torch.from_numpy(audio),
+            self.model,
+            sampling_rate=self.sample_rate,
+            min_silence_duration_ms=self.min_silence_ms,
+            speech_pad_ms=self.padding_ms
+        )
+        segments = [(int(item['start']), int(item['end'])) for item in timestamps]
+        return VADResult(self.sample_rate, len(audio), segments)
+
+
+class NoVAD:
+    """Без выделения речи: вся запись - один отрезок."""
+
+    def __init__(self, sample_rate: int = 16000):
+        self.sample_rate = sample_rate
+
+    def detect(self, audio: np.ndarray) -> VADResult:
+        segments = [(0, len(audio))] if len(audio) else []
+        return VADResult(self.sample_rate, len(audio), segments)
+
+
+VAD_BACKENDS = {
+    'energy': EnergyVAD,
+    'silero': SileroVAD,
+    'none': NoVAD,
+}
+
+
+def create_vad(name: str = 'energy', sample_rate: int = 16000):
+    """
+    Создает детектор речи по имени; если Silero VAD недоступен, используется энергетический.
+
+    :param name: energy, silero или none
+    :type name: str
+    :param sample_rate: Частота дискретизации
+    :type sample_rate: int
+    :raises ValueError: Если детектор неизвестен
+    """
+    if name not in VAD_BACKENDS:
+        raise ValueError(f"Неизвестный детектор речи: {name}")
+    try:
+        return VAD_BACKENDS[name](sample_rate=sample_rate)
+    except Exception as e:
+        if name != 'silero':
+            raise
+        logging.getLogger(__name__).warning(f"Silero VAD недоступен, используется энергетический детектор: {e}")
+        return EnergyVAD(sample_rate=sample_rate)
+
+
+def group_segments(segments: List[Segment], max_samples: int) -> List[List[Segment]]:
+    """
+    Собирает отрезки речи в фрагменты не длиннее max_samples (окно Whisper).
+    Отрезок длиннее окна делится на части.
+
+    :param segments: Отрезки речи по порядку
+    :type segments: List[Segment]
+    :param max_samples: Максимальная длина фрагмента в отсчетах
+    :type max_samples: int
+    :return: Фрагменты - списки отрезков, склеиваемых при распознавании
+    :rtype: List[List[Segment]]
+    """
+    chunks: List[List[Segment]] = []
+    current: List[Segment] = []
+    current_length = 0
+    for start, end in segments:
+        while end - start > 0:
+            piece_end = min(end, start + max_samples - current_length)
+            current.append((start, piece_end))
+            current_length += piece_end - start
+            start = piece_end
+            if current_length >= max_samples:
+                chunks.append(current)
+                current, current_length = [], 0
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _runs(mask: np.ndarray) -> List[Tuple[int, int]]:
+    """Возвращает границы непрерывных участков True."""
+    padded = np.concatenate(([False], mask, [False]))
+    changes = np.flatnonzero(padded[1:] != padded[:-1])
+    return list(zip(changes[::2], changes[1::2]))
@@ -0,0 +1,32 @@
+import io
+
+import numpy as np
+import soundfile as sf
+
+# Частоты, которые поддерживает кодек Opus
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+
+
+def encode_ogg_opus(audio: np.ndarray, sample_rate: int, bitrate: int = 32000) -> bytes:
+    """
+    Кодирует моно сигнал в OGG/Opus в памяти - формат голосовых сообщений Telegram.
+
+    libsndfile задает битрейт Opus через уровень сжатия: 0 - около 256 кбит/с,
+    1 - около 6 кбит/с, между ними линейно.
+
+    :param audio: Моно сигнал float32 в диапазоне [-1, 1]
+    :type audio: np.ndarray
+    :param sample_rate: Частота дискретизации (одна из OPUS_SAMPLE_RATES)
+    :type sample_rate: int
+    :param bitrate: Целевой битрейт в бит/с
+    :type bitrate: int
+    :return: Содержимое файла OGG/Opus
+    :rtype: bytes
+    :raises ValueError: Если частота не поддерживается кодеком
+    """
+    if sample_rate not in OPUS_SAMPLE_RATES:
+        raise ValueError(f"Opus не поддерживает частоту {sample_rate} Гц")
+    compression_level = min(1.0, max(0.0, 1 - (bitrate - 6000) / 250000))
+    buffer = io.BytesIO()
+    sf.write(buffer, audio, sample_rate, format='OGG', subtype='OPUS', compression_level=compression_level)
+    return buffer.getvalue()
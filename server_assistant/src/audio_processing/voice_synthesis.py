@@ -1,6 +1,6 @@
 import logging
 import os
-import time
+import uuid
 
 import numpy as np
 import soundfile as sf
@@ -9,6 +9,10 @@ import torchaudio
 
 from src.audio_processing.base.tts_model import TTSModel
 from src.audio_processing.base.tts_parameters import Parameters
+from src.audio_processing.voice_encoding import encode_ogg_opus
+
+# Частота синтеза Silero, она же частота голосового ответа (поддерживается Opus)
+TTS_SAMPLE_RATE = 24000
 
 
 class VoiceSynthesizer(TTSModel):
@@ -18,21 +22,26 @@ class VoiceSynthesizer(TTSModel):
     Поддерживает несколько голосов и форматов аудио вывода.
     """
 
-    def __init__(self, language: str = 'ru'):
+    def __init__(self, language: str = 'ru', threads: int = 4, bitrate: int = 32000):
         super().__init__()
         """
         Инициализация синтезатора речи с SileroTTS
         
         :param language: Язык синтеза речи
         :type language: str
+        :param threads: Количество потоков torch для синтеза
+        :type threads: int
+        :param bitrate: Битрейт голосового ответа OGG/Opus в бит/с
+        :type bitrate: int
         :raises Exception: При ошибке загрузки модели
         """
         self.logger = logging.getLogger(__name__)
         self.language = language
+        self.bitrate = bitrate
 
         try:
             # Загрузка модели Silero
-            torch.set_num_threads(4)  # Оптимизация для CPU
+            torch.set_num_threads(threads)  # Оптимизация для CPU
             self.device = torch.device('cpu')
 
             # Альтернативный метод загрузки
@@ -119,7 +128,7 @@ class VoiceSynthesizer(TTSModel):
             self.logger.error(f"Ошибка сохранения аудио: {e}", exc_info=True)
             return None
 
-    def text_to_speech(self, text: str, params: Parameters | None = None, output_file: str | None = "response.wav") -> str:
+    def text_to_speech(self, text: str, params: Parameters | None = None, output_file: str | None = None) -> str:
         """
         Преобразование текста в речь с помощью SileroTTS
         
@@ -145,36 +154,15 @@ class VoiceSynthesizer(TTSModel):
             # Генерация пути для файлов
             if not output_file:
                 base_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'temp')
-                output_file = os.path.join(base_dir, f'tts_response_{int(time.time())}.wav')
+                output_file = os.path.join(base_dir, f'tts_response_{uuid.uuid4().hex}.wav')
             else:
                 # Если указан относительный путь, делаем его абсолютным
                 output_file = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'temp', output_file))
             os.makedirs(os.path.dirname(output_file), exist_ok=True)
             
-            # Путь для .wav файла
-            wav_output_path = os.path.splitext(output_file)[0] + '.wav'
-            oga_output_path = os.path.splitext(output_file)[0] + '.oga'
-            
-            # Генерация речи
-            audio = self.model.apply_tts(
-                text=text,
-                speaker=self.speaker,
-                sample_rate=24000
-            )
-            
-            # Сохранение в .wav
-            full_output_path = wav_output_path
-            
-            # Нормализация и сохранение аудио
-            audio_data = audio.numpy().astype(np.float32)
-            audio_data /= np.max(np.abs(audio_data))
-            
-            output_path = os.path.abspath(os.path.join(
-                os.path.dirname(__file__), '..', '..', 'temp', output_file
-            ))
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            
-            sf.write(output_path, audio_data, 24000)
+            audio_data = self._generate(text)
+            output_path = os.path.splitext(output_file)[0] + '.wav'
+            sf.write(output_path, audio_data, TTS_SAMPLE_RATE)
             
             self.logger.info(f"Голосовой ответ сгенерирован: {output_path}")
             return output_path
@@ -182,3 +170,43 @@ class VoiceSynthesizer(TTSModel):
         except Exception as e:
             self.logger.error(f"Ошибка синтеза речи: {e}", exc_info=True)
             return ""
+
+    def _generate(self, text: str) -> np.ndarray:
+        """
+        Генерирует речь и нормирует ее по пику.
+
+        :param text: Текст для синтеза речи
+        :type text: str
+        :return: Моно сигнал float32 с частотой TTS_SAMPLE_RATE
+        :rtype: np.ndarray
+        """
+        audio = self.model.apply_tts(
+            text=text,
+            speaker=self.speaker,
+            sample_rate=TTS_SAMPLE_RATE
+        )
+        audio_data = audio.numpy().astype(np.float32)
+        peak = np.max(np.abs(audio_data))
+        if peak > 0:
+            audio_data /= peak
+        return audio_data
+
+    def synthesize_voice(self, text: str) -> bytes:
+        """
+        Синтезирует голосовой ответ в памяти, без временных файлов.
+
+        :param text: Текст для синтеза речи
+        :type text: str
+        :return: Голосовое сообщение OGG/Opus или пустые байты при ошибке
+        :rtype: bytes
+        """
+        if not text or not text.strip():
+            self.logger.warning("Пустой текст для синтеза речи")
+            return b""
+        try:
+            voice = encode_ogg_opus(self._generate(text), TTS_SAMPLE_RATE, self.bitrate)
+            self.logger.info(f"Голосовой ответ сгенерирован: {len(voice)} байт")
+            return voice
+        except Exception as e:
+            self.logger.error(f"Ошибка синтеза речи: {e}", exc_info=True)
+            return b""
@@ -24,9 +24,9 @@ class ComplexDialogNetwork:
         self.user_preferences = UserPreferences()
         selected_model = self.user_preferences.get_llm_model(chat_id=chat_id)
         
-        self.openai_processor = OpenAIProcessor(chat_id=chat_id)
+        self.openai_processor = OpenAIProcessor(task_type="COMPLEX_DIALOG", chat_id=chat_id)
 
-    def generate_response(self, message, transcribe=None):
+    async def generate_response(self, message, transcribe=None):
         """
         Генерация ответа на сообщение пользователя с учетом контекста
 
@@ -74,7 +74,7 @@ class ComplexDialogNetwork:
             text = message.from_user.username + ': ' + message.text
         else:
             text = message.from_user.username + ': ' + transcribe
-        response = self.openai_processor.process_with_retry(
+        response = await self.openai_processor.process_with_retry(
             prompt=system_message + '\n' + text, 
             system_message=system_message,
             max_tokens=2000, 
@@ -1,8 +1,8 @@
 import logging
-from openai import OpenAI
 from typing import Dict, Any, Optional
 from src.neural_networks.llm_processor import LLMProcessor
-from src.neural_networks.dialog_manager import dialog_manager
+from src.neural_networks.dialog_store import get_dialog_store
+from src.neural_networks.llm_client import get_async_client
 
 from config import get_config
 
@@ -15,12 +15,14 @@ class DeepSeekProcessor(LLMProcessor):
     управление контекстом диалога и валидацию API-ключа.
     """
 
-    def __init__(self, task_type: str = None):
+    def __init__(self, task_type: str = None, chat_id: int = None):
         """
         Инициализация процессора Deepseek
 
         :param task_type: Тип задачи для обработки
         :type task_type: str | None
+        :param chat_id: ID чата, контекст которого используется (None - без контекста)
+        :type chat_id: int | None
         :raises ValueError: Если API ключ не найден
         """
         deepseek_config = get_config().neural_networks.deepseek
@@ -32,11 +34,11 @@ class DeepSeekProcessor(LLMProcessor):
             self.logger.error("Deepseek API ключ не найден!")
             raise ValueError("Необходимо установить DEEPSEEK_API_KEY в .env файле")
         
-        self.client = OpenAI(api_key=api_key)
-        self.dialog_manager = dialog_manager  # Added DialogManager instance
+        self.client = get_async_client(api_key, base_url=self.get_model_info()['base_url'])
+        self.chat_id = chat_id
         self.task_type = task_type
 
-    def process_with_retry(
+    async def process_with_retry(
         self, 
         prompt: str, 
         system_message: str = """ Твой владелец - Владимир. Твой создатель - Глеб. 
@@ -70,8 +72,11 @@ class DeepSeekProcessor(LLMProcessor):
         :rtype: str | None
         """
         try:
+            # Контекст чата берется из общего хранилища (настроенный бэкенд и отложенная запись)
+            dialog_manager = get_dialog_store().get(self.chat_id) if self.chat_id is not None else None
+
             # Подготовка контекста
-            context = self.dialog_manager.get_context() if use_context else []
+            context = dialog_manager.get_context() if use_context and dialog_manager else []
             
             # Добавление системного сообщения            
             if system_message:
@@ -81,7 +86,7 @@ class DeepSeekProcessor(LLMProcessor):
             context.append({'role': 'user', 'content': prompt})
             
             # Вызов OpenAI API с контекстом
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=model,
                 messages=context,
                 max_tokens=max_tokens,
@@ -92,8 +97,9 @@ class DeepSeekProcessor(LLMProcessor):
             assistant_response = response.choices[0].message.content
             
             # Добавление ответа в контекст
-            self.dialog_manager.add_message(prompt, role='user')
-            self.dialog_manager.add_message(assistant_response, role='assistant')
+            if dialog_manager:
+                dialog_manager.add_message(prompt, role='user')
+                dialog_manager.add_message(assistant_response, role='assistant')
             
             return assistant_response
         
@@ -115,7 +121,7 @@ class DeepSeekProcessor(LLMProcessor):
             "default_model": "deepseek_chat"
         }
 
-    def validate_api_key(self) -> bool:
+    async def validate_api_key(self) -> bool:
         """
         Проверка валидности API-ключа Deepseek
 
@@ -124,7 +130,7 @@ class DeepSeekProcessor(LLMProcessor):
         """
         try:
             # Пробуем сделать простой запрос для проверки ключа
-            test_response = self.client.chat.completions.create(
+            test_response = await self.client.chat.completions.create(
                 model="deepseek_chat",
                 messages=[{"role": "user", "content": "Hello"}],
                 max_tokens=10
@@ -1,7 +1,45 @@
-import json
 import logging
-import os
 from datetime import datetime
+from functools import lru_cache
+
+from src.storage.base import DialogJournal
+from src.storage.json_journal import JsonJournal
+
+# Служебные токены, которые API добавляет к каждому сообщению
+MESSAGE_TOKEN_OVERHEAD = 4
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    """
+    Возвращает кодировщик tiktoken для моделей семейства gpt-4o.
+
+    :return: Кодировщик или None, если tiktoken недоступен
+    """
+    try:
+        import tiktoken
+        return tiktoken.get_encoding('o200k_base')
+    except Exception as e:
+        logging.getLogger(__name__).error(f"Не удалось загрузить кодировщик tiktoken: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Подсчитывает количество токенов в тексте.
+    Без tiktoken использует грубую оценку: четыре символа на токен.
+
+    :param text: Текст
+    :type text: str
+    :return: Количество токенов
+    :rtype: int
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
 
 
 class DialogManager:
@@ -16,64 +54,79 @@ class DialogManager:
         self, 
         max_context_length: int = 100000, 
         max_tokens: int = 10000,
-        context_file: str = 'temp/dialogue_context.json'
+        context_file: str = 'temp/dialogue_context.json',
+        compact_every: int = 500,
+        write_back: bool = False,
+        journal: DialogJournal | None = None
     ):
         """
         Инициализация менеджера диалога
 
         :param max_context_length: Максимальное количество сообщений в контексте
         :type max_context_length: int
-        :param max_tokens: Максимальное количество токенов в контексте
+        :param max_tokens: Бюджет токенов контекста по умолчанию
         :type max_tokens: int
-        :param context_file: Путь для сохранения контекста
+        :param context_file: Путь для сохранения снимка контекста
         :type context_file: str
+        :param compact_every: Количество записей журнала между снимками
+        :type compact_every: int
+        :param write_back: Копить записи в памяти до вызова flush (для DialogStore)
+        :type write_back: bool
+        :param journal: Хранилище контекста (по умолчанию - JSON снимок и журнал в context_file)
+        :type journal: DialogJournal
         """
         self.logger = logging.getLogger(__name__)
         self.max_context_length = max_context_length
         self.max_tokens = max_tokens
         
         self.context_file = context_file
-        # Создаем директорию, если не существует
-        os.makedirs(os.path.dirname(self.context_file), exist_ok=True)
+        # По умолчанию снимок хранится в context_file, изменения дописываются в журнал рядом с ним
+        self.journal = journal or JsonJournal(context_file, compact_every=compact_every)
 
-        
-        self.context = {
+        # В режиме write_back записи журнала копятся здесь до flush
+        self.write_back = write_back
+        self._pending_records = []
+
+        self.context = self._empty_context()
+        # Инициализация контекста
+        self.load_context()
+
+    @staticmethod
+    def _empty_context():
+        return {
             'messages': [],
             'task_types': {}
         }
-        # Инициализация контекста
-        self.load_context()
     
     def load_context(self):
         """
-        Загрузка контекста из файла
+        Загрузка контекста: снимок и воспроизведение журнала после него
 
         :return: Загруженный контекст или пустой контекст при ошибке
         :rtype: dict
         """
         try:
-            if os.path.exists(self.context_file):
-                with open(self.context_file, 'r', encoding='utf-8') as f:
-                    loaded_context = json.load(f)
-                    self.logger.info(f"Загружен контекст")
-                    
-                    # Проверка и восстановление структуры контекста
-                    if isinstance(loaded_context, list):
-                        # Если контекст - список, преобразуем его
-                        self.context['messages'] = loaded_context
-                        self.context['task_types'] = {}
-                        self.logger.info(f"Контекст список")
-                    elif isinstance(loaded_context, dict):
-                        # Если контекст - словарь, используем его как есть
-                        self.logger.info(f"Контекст словарь")
-                        self.context = loaded_context
-                    else:
-                        # Если структура неизвестна, сбрасываем к дефолту
-                        self.context = {
-                            'messages': [],
-                            'task_types': {}
-                        }
-            
+            state, records = self.journal.load()
+            self.context = self._empty_context()
+
+            # Проверка и восстановление структуры контекста
+            if isinstance(state, list):
+                # Старый формат: контекст - список сообщений
+                self.context['messages'] = state
+            elif isinstance(state, dict):
+                self.context['messages'] = state.get('messages', [])
+                if state.get('summary'):
+                    self.context['summary'] = state['summary']
+
+            for record in records:
+                self._apply_record(record)
+
+            self._trim_messages()
+            self._rebuild_task_types()
+            self.logger.info(
+                f"Загружен контекст: {len(self.context['messages'])} сообщений, "
+                f"{len(records)} записей журнала"
+            )
             return self.context
         
         except Exception as e:
@@ -82,20 +135,93 @@ class DialogManager:
 
     def save_context(self):
         """
-        Сохранение контекста в файл
-        
-        :raises Exception: При ошибке сохранения
+        Сохранение полного снимка контекста и очистка журнала
         """
         try:
-            with open(self.context_file, 'w', encoding='utf-8') as f:
-                json.dump(self.context, f, ensure_ascii=False, indent=2)
-                self.logger.info("Функция save_context завершена")
+            state = {'messages': self.context['messages']}
+            if self.context.get('summary'):
+                state['summary'] = self.context['summary']
+            self.journal.compact(state)
+            # Снимок уже содержит все отложенные записи
+            self._pending_records.clear()
+            self.logger.info("Функция save_context завершена")
         except Exception as e:
             self.logger.error(f"Ошибка сохранения контекста: {e}")
 
+    def _write_record(self, record):
+        """
+        Записывает изменение в журнал или откладывает его до flush в режиме write_back.
+
+        :param record: Запись журнала
+        :type record: dict
+        """
+        if self.write_back:
+            self._pending_records.append(record)
+            return
+        self.journal.append(record)
+        # Снимок - когда журнал разросся
+        if self.journal.needs_compaction():
+            self.save_context()
+
+    @property
+    def dirty(self) -> bool:
+        """Есть ли изменения, еще не записанные на диск."""
+        return bool(self._pending_records)
+
+    def flush(self):
+        """
+        Записывает отложенные изменения в журнал одной операцией.
+        """
+        if not self._pending_records:
+            return
+        try:
+            self.journal.append_many(self._pending_records)
+            self._pending_records.clear()
+            if self.journal.needs_compaction():
+                self.save_context()
+        except Exception as e:
+            self.logger.error(f"Ошибка записи контекста на диск: {e}")
+
+    def _apply_record(self, record):
+        """
+        Применяет запись журнала к контексту в памяти.
+
+        :param record: Запись журнала
+        :type record: dict
+        """
+        if record.get('op') == 'add':
+            self.context['messages'].append(record['message'])
+        elif record.get('op') == 'summary':
+            self._set_summary(record['summary'])
+
+    def _rebuild_task_types(self):
+        """
+        Строит индекс сообщений по типам задач.
+        Индекс хранится только в памяти и ссылается на те же сообщения.
+        """
+        self.context['task_types'] = {}
+        for message_entry in self.context['messages']:
+            task_type = message_entry.get('task_type')
+            if task_type:
+                self.context['task_types'].setdefault(task_type, []).append(message_entry)
+
+    def _trim_messages(self) -> bool:
+        """
+        Обрезает контекст до max_context_length сообщений.
+
+        :return: True, если сообщения были удалены
+        :rtype: bool
+        """
+        if len(self.context['messages']) <= self.max_context_length:
+            return False
+        self.context['messages'] = self.context['messages'][-self.max_context_length:]
+        self._rebuild_task_types()
+        return True
+
     def add_message(self, message, role='user', task_type=None):
         """
-        Добавление сообщения в контекст
+        Добавление сообщения в контекст.
+        Сообщение дописывается в журнал одной строкой, без перезаписи всего контекста.
 
         :param message: Текст сообщения
         :type message: str
@@ -112,40 +238,47 @@ class DialogManager:
                 'task_type': task_type,
                 'timestamp': datetime.now().timestamp()
             }
+            self.message_tokens(message_entry)
 
             # Добавляем в общий список сообщений
             self.context['messages'].append(message_entry)            
             self.logger.info(f"Добавлено сообщение: {message_entry}")
-            # Добавляем в список сообщений по типу задачи
+            # Добавляем в индекс сообщений по типу задачи
             if task_type:
-                if task_type not in self.context['task_types']:
-                    self.context['task_types'][task_type] = []
-                self.context['task_types'][task_type].append(message_entry)
+                self.context['task_types'].setdefault(task_type, []).append(message_entry)
+
+            self._write_record({'op': 'add', 'message': message_entry})
 
             # Обрезаем контекст, если превышена максимальная длина
-            if len(self.context['messages']) > self.max_context_length:
-                self.context['messages'] = self.context['messages'][-self.max_context_length:]
-                
-                # Обрезаем контекст для каждого типа задачи
-                for task_type in list(self.context['task_types'].keys()):
-                    if len(self.context['task_types'][task_type]) > self.max_context_length:
-                        self.context['task_types'][task_type] = self.context['task_types'][task_type][-self.max_context_length:]
-            
-            #if len(all_mes) > 140:
-            #    all_mes.pop(0)
-            # Сохраняем контекст
-            self.logger.info(f"Сохранение контекста")
-            self.save_context()
-            self.logger.info("Сохранение контекста завершено")
+            if self._trim_messages():
+                self.save_context()
+
             self.logger.info(f"Добавлено сообщение. Роль: {role}, Тип задачи: {task_type}")
             self.logger.info(f"Общее количество сообщений: {len(self.context['messages'])}")
         
         except Exception as e:
             self.logger.error(f"Ошибка при добавлении сообщения: {e}")
 
-    def get_context(self, task_type=None, include_general=True, hours_to_include=24):
+    def message_tokens(self, message_entry):
+        """
+        Возвращает количество токенов сообщения.
+        Значение вычисляется один раз и сохраняется в самом сообщении.
+
+        :param message_entry: Сообщение контекста
+        :type message_entry: dict
+        :return: Количество токенов с учетом служебных
+        :rtype: int
+        """
+        tokens = message_entry.get('tokens')
+        if tokens is None:
+            tokens = count_tokens(message_entry.get('content') or '') + MESSAGE_TOKEN_OVERHEAD
+            message_entry['tokens'] = tokens
+        return tokens
+
+    def get_context(self, task_type=None, include_general=True, hours_to_include=24, max_tokens=None):
         """
-        Получение отфильтрованного контекста диалога
+        Получение отфильтрованного контекста диалога.
+        Из истории берутся самые новые сообщения, укладывающиеся в бюджет токенов.
 
         :param task_type: Тип задачи для фильтрации
         :type task_type: str | None
@@ -153,6 +286,8 @@ class DialogManager:
         :type include_general: bool
         :param hours_to_include: Временной период в часах
         :type hours_to_include: int
+        :param max_tokens: Бюджет токенов истории (по умолчанию self.max_tokens)
+        :type max_tokens: int | None
         :return: Список отфильтрованных сообщений
         :rtype: list[dict]
         """
@@ -182,12 +317,110 @@ class DialogManager:
             
             # Сортируем по времени
             context.sort(key=lambda x: x['timestamp'])
+
+            # Оставляем самые новые сообщения в пределах бюджета токенов
+            budget = self.max_tokens if max_tokens is None else max_tokens
+            summary_message = self._summary_message() if include_general else None
+            if summary_message:
+                budget -= self.message_tokens(self.context['summary'])
+            used_tokens = 0
+            start = len(context)
+            while start > 0:
+                tokens = self.message_tokens(context[start - 1])
+                if used_tokens + tokens > budget:
+                    break
+                used_tokens += tokens
+                start -= 1
+            context = context[start:]
             
+            context = [
+                {key: value for key, value in msg.items() if key != 'tokens'}
+                for msg in context
+            ]
+            # Сводка более ранней истории идет первой
+            if summary_message:
+                context.insert(0, summary_message)
             return context
         
         except Exception as e:
             self.logger.error(f"Ошибка при получении контекста: {e}")
             return []
 
-# Создаем глобальный экземпляр DialogManager
-dialog_manager = DialogManager()
\ No newline at end of file
+    def _summary_message(self):
+        """
+        Формирует системное сообщение со сводкой ранней истории.
+
+        :return: Сообщение со сводкой или None, если сводки нет
+        :rtype: dict | None
+        """
+        summary = self.context.get('summary')
+        if not summary or not summary.get('content'):
+            return None
+        return {
+            'role': 'system',
+            'content': f"Краткое содержание предыдущей части диалога: {summary['content']}"
+        }
+
+    def get_summary(self):
+        """
+        Возвращает текст текущей сводки ранней истории.
+
+        :return: Текст сводки или пустая строка
+        :rtype: str
+        """
+        return (self.context.get('summary') or {}).get('content', '')
+
+    def get_messages_to_summarize(self, keep_tokens):
+        """
+        Возвращает старые сообщения, не попадающие в окно последних keep_tokens токенов.
+
+        :param keep_tokens: Сколько токенов самой новой истории оставить без сжатия
+        :type keep_tokens: int
+        :return: Список старых сообщений в хронологическом порядке
+        :rtype: list[dict]
+        """
+        messages = sorted(self.context['messages'], key=lambda x: x['timestamp'])
+        kept_tokens = 0
+        start = len(messages)
+        while start > 0:
+            tokens = self.message_tokens(messages[start - 1])
+            if kept_tokens + tokens > keep_tokens:
+                break
+            kept_tokens += tokens
+            start -= 1
+        return messages[:start]
+
+    def apply_summary(self, summary_text, until_timestamp):
+        """
+        Заменяет сообщения до until_timestamp включительно сводкой.
+        Без write_back контекст перечитывается, чтобы не потерять сообщения,
+        добавленные во время сжатия другими экземплярами.
+
+        :param summary_text: Текст новой сводки
+        :type summary_text: str
+        :param until_timestamp: Время последнего сжатого сообщения
+        :type until_timestamp: float
+        """
+        if not self.write_back:
+            self.load_context()
+        summary = {
+            'role': 'system',
+            'content': summary_text,
+            'timestamp': until_timestamp
+        }
+        self._set_summary(summary)
+        self._write_record({'op': 'summary', 'summary': summary})
+        self.logger.info(f"История до {until_timestamp} заменена сводкой")
+
+    def _set_summary(self, summary):
+        """
+        Устанавливает сводку и удаляет сообщения, вошедшие в нее.
+
+        :param summary: Сводка (время последнего сжатого сообщения - в timestamp)
+        :type summary: dict
+        """
+        self.context['summary'] = summary
+        self.context['messages'] = [
+            msg for msg in self.context['messages'] if msg['timestamp'] > summary['timestamp']
+        ]
+        self._rebuild_task_types()
\ No newline at end of file
@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from src.neural_networks.dialog_manager import DialogManager
+from src.storage import Storage, get_storage
+
+from config import get_config
+
+
+class DialogStore:
+    """
+    Общее для процесса хранилище контекстов диалогов.
+
+    Держит контексты активных чатов в памяти, поэтому get_context не читает
+    диск. Изменения копятся в памяти и записываются пачкой раз в
+    flush_interval секунд, при вытеснении чата и при остановке бота.
+    Простаивающие чаты вытесняются по LRU.
+    """
+
+    def __init__(self, max_chats: int = 1024, idle_ttl: float = 3600, flush_interval: float = 2.0, context_dir: str = 'temp', storage: Optional[Storage] = None):
+        """
+        :param max_chats: Максимальное количество контекстов в памяти
+        :type max_chats: int
+        :param idle_ttl: Время простоя в секундах, после которого контекст выгружается
+        :type idle_ttl: float
+        :param flush_interval: Интервал записи изменений на диск в секундах
+        :type flush_interval: float
+        :param context_dir: Директория файлов контекста
+        :type context_dir: str
+        :param storage: Хранилище состояния (None - JSON файлы в context_dir)
+        :type storage: Storage
+        """
+        self.logger = logging.getLogger(__name__)
+        self.max_chats = max_chats
+        self.idle_ttl = idle_ttl
+        self.flush_interval = flush_interval
+        self.context_dir = context_dir
+        self.storage = storage
+
+        # chat_id -> (менеджер, время последнего обращения); порядок - от давних к свежим
+        self._managers: "OrderedDict[int, tuple[DialogManager, float]]" = OrderedDict()
+
+    def get(self, chat_id: int) -> DialogManager:
+        """
+        Возвращает контекст чата, загружая его с диска при первом обращении.
+
+        :param chat_id: Идентификатор чата
+        :type chat_id: int
+        :return: Менеджер диалога чата
+        :rtype: DialogManager
+        """
+        now = time.monotonic()
+        entry = self._managers.get(chat_id)
+        if entry is not None:
+            self._managers[chat_id] = (entry[0], now)
+            self._managers.move_to_end(chat_id)
+            return entry[0]
+
+        manager = DialogManager(
+            context_file=os.path.join(self.context_dir, f'dialogue_context_{chat_id}.json'),
+            write_back=True,
+            journal=self.storage.dialog_journal(chat_id) if self.storage else None
+        )
+        self._managers[chat_id] = (manager, now)
+        self._evict(now)
+        return manager
+
+    def flush_all(self):
+        """Записывает на диск изменения всех контекстов."""
+        for manager, _ in list(self._managers.values()):
+            if manager.dirty:
+                manager.flush()
+
+    def _evict(self, now: float):
+        """
+        Выгружает простаивающие контексты и контексты сверх лимита, предварительно записав их.
+
+        :param now: Текущее время
+        :type now: float
+        """
+        threshold = now - self.idle_ttl
+        while self._managers:
+            chat_id, (manager, last_used) = next(iter(self._managers.items()))
+            if len(self._managers) <= self.max_chats and last_used > threshold:
+                break
+            manager.flush()
+            # Если менеджер еще используется незавершенным запросом, его записи пойдут сразу на диск
+            manager.write_back = False
+            self._managers.popitem(last=False)
+            self.logger.info(f"Контекст чата {chat_id} выгружен из памяти")
+
+    async def run_flusher(self):
+        """Периодически записывает изменения на диск и выгружает простаивающие контексты."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                self.flush_all()
+                self._evict(time.monotonic())
+            except Exception as e:
+                self.logger.error(f"Ошибка записи контекстов: {e}")
+
+    def __len__(self) -> int:
+        return len(self._managers)
+
+    def __contains__(self, chat_id: int) -> bool:
+        return chat_id in self._managers
+
+
+_dialog_store: Optional[DialogStore] = None
+
+
+def get_dialog_store() -> DialogStore:
+    """
+    Возвращает общий экземпляр хранилища, создавая его по настройкам при первом обращении.
+
+    :return: Хранилище контекстов
+    :rtype: DialogStore
+    """
+    global _dialog_store
+    if _dialog_store is None:
+        store_config = get_config().dialog_store
+        _dialog_store = DialogStore(
+            max_chats=store_config.max_chats,
+            idle_ttl=store_config.idle_ttl,
+            flush_interval=store_config.flush_interval,
+            context_dir=get_config().storage.base_dir,
+            storage=get_storage()
+        )
+    return _dialog_store
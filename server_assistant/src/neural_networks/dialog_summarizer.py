@@ -0,0 +1,147 @@
+import asyncio
+import logging
+from typing import Optional, Set
+
+from config import get_config
+from src.neural_networks.dialog_manager import DialogManager
+
+# Файлы контекста, для которых сжатие уже выполняется
+_in_progress: Set[str] = set()
+# Ссылки на фоновые задачи, чтобы их не собрал сборщик мусора
+_background_tasks: Set[asyncio.Task] = set()
+
+
+class DialogSummarizer:
+    """
+    Фоновое сжатие старой истории диалога в сводку.
+
+    Когда история чата за пределами окна последних сообщений становится
+    достаточно большой, старые сообщения заменяются краткой сводкой,
+    которую DialogManager.get_context подставляет в начало контекста.
+    Сжатие выполняется в отдельной задаче и не задерживает ответ. Длинная
+    история сжимается порциями от самых старых сообщений: каждая порция
+    объединяется с уже готовой сводкой.
+    """
+
+    def __init__(
+        self,
+        llm_processor,
+        keep_tokens: Optional[int] = None,
+        min_batch_tokens: int = 2000,
+        max_batch_tokens: int = 8000,
+        summary_tokens: int = 500
+    ):
+        """
+        :param llm_processor: Процессор LLM для генерации сводки
+        :param keep_tokens: Сколько токенов последней истории не сжимать
+            (по умолчанию - DialogContext.summary_keep_tokens, самый маленький бюджет контекста)
+        :type keep_tokens: int | None
+        :param min_batch_tokens: Минимальный объем старой истории для запуска сжатия
+        :type min_batch_tokens: int
+        :param max_batch_tokens: Максимальный объем сообщений в одном запросе сжатия
+        :type max_batch_tokens: int
+        :param summary_tokens: Максимальная длина сводки в токенах
+        :type summary_tokens: int
+        """
+        self.logger = logging.getLogger(__name__)
+        self.llm_processor = llm_processor
+        self.keep_tokens = keep_tokens if keep_tokens is not None else get_config().dialog_context.summary_keep_tokens
+        self.min_batch_tokens = min_batch_tokens
+        self.max_batch_tokens = max(min_batch_tokens, max_batch_tokens)
+        self.summary_tokens = summary_tokens
+
+    def schedule(self, dialog_manager: DialogManager):
+        """
+        Запускает фоновое сжатие, если старая история превысила порог.
+
+        :param dialog_manager: Менеджер диалога чата
+        :type dialog_manager: DialogManager
+        """
+        if dialog_manager.context_file in _in_progress:
+            return
+
+        if not self._has_enough_history(dialog_manager):
+            return
+
+        _in_progress.add(dialog_manager.context_file)
+        task = asyncio.create_task(self._summarize(dialog_manager))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+    def _has_enough_history(self, dialog_manager: DialogManager) -> bool:
+        messages = dialog_manager.get_messages_to_summarize(self.keep_tokens)
+        return sum(dialog_manager.message_tokens(msg) for msg in messages) >= self.min_batch_tokens
+
+    def _next_batch(self, dialog_manager: DialogManager):
+        """
+        Возвращает самые старые сообщения вне окна keep_tokens общим объемом
+        не больше max_batch_tokens (но хотя бы одно сообщение).
+
+        :param dialog_manager: Менеджер диалога чата
+        :type dialog_manager: DialogManager
+        :return: Порция сообщений в хронологическом порядке
+        :rtype: list[dict]
+        """
+        batch = []
+        batch_tokens = 0
+        for msg in dialog_manager.get_messages_to_summarize(self.keep_tokens):
+            tokens = dialog_manager.message_tokens(msg)
+            if batch and batch_tokens + tokens > self.max_batch_tokens:
+                break
+            batch.append(msg)
+            batch_tokens += tokens
+        return batch
+
+    async def _summarize(self, dialog_manager: DialogManager):
+        """
+        Сжимает старую историю порциями, пока ее остаток не станет меньше min_batch_tokens.
+        При ошибке или пустом ответе модели сжатие прекращается до следующего запуска.
+
+        :param dialog_manager: Менеджер диалога чата
+        :type dialog_manager: DialogManager
+        """
+        try:
+            while True:
+                messages = self._next_batch(dialog_manager)
+                if not messages or not await self._summarize_batch(dialog_manager, messages):
+                    break
+                if not self._has_enough_history(dialog_manager):
+                    break
+        except Exception as e:
+            self.logger.error(f"Ошибка сжатия истории диалога: {e}")
+        finally:
+            _in_progress.discard(dialog_manager.context_file)
+
+    async def _summarize_batch(self, dialog_manager: DialogManager, messages) -> bool:
+        """
+        Объединяет порцию сообщений с текущей сводкой и заменяет их новой сводкой.
+
+        :param dialog_manager: Менеджер диалога чата
+        :type dialog_manager: DialogManager
+        :param messages: Старые сообщения для сжатия
+        :type messages: list[dict]
+        :return: Удалось ли получить сводку
+        :rtype: bool
+        """
+        history = '\n'.join(f"{msg['role']}: {msg['content']}" for msg in messages)
+        system_message = f"""
+        Системное сообщение:
+        Ты составляешь краткое содержание переписки для долговременной памяти ассистента.
+        Объедини предыдущее краткое содержание и новые сообщения в одну сводку.
+        Сохрани имена, договоренности, факты о пользователях, даты и незавершенные темы.
+        Не добавляй ничего от себя. Пиши сжато, в третьем лице.
+        Предыдущее краткое содержание:
+        {dialog_manager.get_summary() or 'отсутствует'}
+        Новые сообщения:
+        """
+        summary = await self.llm_processor.process_with_retry(
+            prompt=history,
+            system_message=system_message,
+            max_tokens=self.summary_tokens,
+            temperature=0.3
+        )
+        if not summary:
+            return False
+        dialog_manager.apply_summary(summary.strip(), messages[-1]['timestamp'])
+        self.logger.info(f"Сжато {len(messages)} сообщений в сводку: {dialog_manager.context_file}")
+        return True
@@ -24,10 +24,10 @@ class FunctionalNetwork:
         selected_model = self.user_preferences.get_llm_model(chat_id=chat_id)
 
             
-        self.openai_processor = OpenAIProcessor(chat_id=chat_id)
+        self.openai_processor = OpenAIProcessor(task_type="FUNCTIONAL", chat_id=chat_id)
 
 
-    def generate_response(self, message, transcribe=None):
+    async def generate_response(self, message, transcribe=None):
         """
         Генерация ответа на функциональный запрос
         
@@ -71,7 +71,7 @@ class FunctionalNetwork:
             text = message.from_user.username + ': ' + message.text
         else:
             text = message.from_user.username + ': ' + transcribe
-        response = self.openai_processor.process_with_retry(
+        response = await self.openai_processor.process_with_retry(
             prompt=system_message + '\n' + text, 
             max_tokens=2000, 
             temperature=0.4,
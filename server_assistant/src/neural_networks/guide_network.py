@@ -1,4 +1,7 @@
+import asyncio
 import logging
+from typing import AsyncIterator
+
 from aiogram import types
 
 from src.neural_networks.complex_dialog_network import ComplexDialogNetwork
@@ -50,14 +53,14 @@ class GuideNetwork:
         """
         try:
             if task_type == TaskType.SMALL_TALK:
-                return self.small_talk_network.generate_response(message, transcribe=transcribe)
+                return await self.small_talk_network.generate_response(message, transcribe=transcribe)
             elif task_type == TaskType.COMPLEX_DIALOG:
-                return self.complex_dialog_network.generate_response(message, transcribe=transcribe)
+                return await self.complex_dialog_network.generate_response(message, transcribe=transcribe)
             elif task_type == TaskType.INFORMATION:
                 self.logger.info("Приступил к генерации информационного ответа")
-                return self.information_network.generate_response(message, transcribe=transcribe)
+                return await self.information_network.generate_response(message, transcribe=transcribe)
             elif task_type == TaskType.FUNCTIONAL:
-                return self.functional_network.generate_response(message, transcribe=transcribe)
+                return await self.functional_network.generate_response(message, transcribe=transcribe)
             elif task_type == TaskType.REMINDER:
                 return await self.reminder_network.create_reminder(message, transcribe=transcribe)
             elif task_type == TaskType.RECALL_MEMORY:
@@ -74,7 +77,7 @@ class GuideNetwork:
             elif task_type == TaskType.VIEW_MEMORIES:
                 return self.memory_network.get_all_notes()
             elif task_type == TaskType.TODO:
-                return self.todo_network.generate_response(message, transcribe=transcribe)
+                return await self.todo_network.generate_response(message, transcribe=transcribe)
             # Fallback для функциональных задач
             return "Извините, я не могу обработать это сообщение."
         
@@ -87,16 +90,51 @@ class GuideNetwork:
         """
         Основной метод обработки входящего сообщения
         """
-        # Определение типа задачи
+        # Определение типа задачи и типа вывода
         if transcribe == None:
             text = message.text
         else:
             text = transcribe
-        task_type = self.router_network.detect_task_type(text)
-        output_type = self.router_network.detect_output_type(text)
+        task_type, output_type = await self.router_network.classify(text)
         
         
         # Выбор и генерация ответа
         response = await self._route_to_network(task_type, message, transcribe)
         self.logger.info(f"Получено от нейросети: {response}")
         return response, output_type
+
+    async def process_voice_stream(self, message: types.Message, chunks: AsyncIterator[str]):
+        """
+        Обработка голосового сообщения, распознаваемого по фрагментам.
+
+        Классификация запроса запускается по первому фрагменту и идет
+        параллельно с распознаванием остальных; сеть-исполнитель получает
+        полный текст.
+
+        :param message: Голосовое сообщение
+        :type message: types.Message
+        :param chunks: Тексты фрагментов по порядку (см. TranscriptionService.transcribe_stream)
+        :type chunks: AsyncIterator[str]
+        :return: Кортеж (ответ, тип вывода, распознанный текст); при пустом распознавании ответ None
+        """
+        parts = []
+        classification = None
+        try:
+            async for text in chunks:
+                parts.append(text)
+                if classification is None:
+                    self.logger.info("Получен первый фрагмент распознавания, запуск классификации")
+                    classification = asyncio.create_task(self.router_network.classify(text))
+        except BaseException:
+            if classification is not None:
+                classification.cancel()
+            raise
+
+        transcribe = ' '.join(parts)
+        if classification is None:
+            return None, OutputType.DEFAULT, transcribe
+
+        task_type, output_type = await classification
+        response = await self._route_to_network(task_type, message, transcribe)
+        self.logger.info(f"Получено от нейросети: {response}")
+        return response, output_type, transcribe
@@ -0,0 +1,107 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+
+class GuideNetworkPool:
+    """
+    Реестр экземпляров GuideNetwork по чатам.
+
+    Хранит уже построенные графы сетей, чтобы не создавать заново
+    процессоры, клиенты и настройки на каждое сообщение.
+    Ограничен по размеру (вытеснение LRU) и по времени простоя (TTL).
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[int], Any],
+        max_size: int = 256,
+        idle_ttl: float = 3600,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        :param factory: Функция, создающая сеть для chat_id
+        :type factory: Callable[[int], Any]
+        :param max_size: Максимальное количество сетей в пуле
+        :type max_size: int
+        :param idle_ttl: Время простоя в секундах, после которого сеть удаляется
+        :type idle_ttl: float
+        :param clock: Источник времени (монотонные секунды)
+        :type clock: Callable[[], float]
+        """
+        if max_size < 1:
+            raise ValueError("Размер пула должен быть положительным")
+
+        self.logger = logging.getLogger(__name__)
+        self.factory = factory
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self.clock = clock
+
+        # chat_id -> (сеть, время последнего обращения); порядок - от давних к свежим
+        self._networks: "OrderedDict[int, tuple[Any, float]]" = OrderedDict()
+
+    def get(self, chat_id: int):
+        """
+        Возвращает сеть для чата, создавая ее при первом обращении.
+
+        :param chat_id: Идентификатор чата
+        :type chat_id: int
+        :return: Экземпляр сети для чата
+        """
+        now = self.clock()
+        self._evict_idle(now)
+
+        entry = self._networks.get(chat_id)
+        if entry is not None:
+            self._networks[chat_id] = (entry[0], now)
+            self._networks.move_to_end(chat_id)
+            return entry[0]
+
+        self.logger.info(f"Создание сети для чата {chat_id}")
+        network = self.factory(chat_id)
+        self._networks[chat_id] = (network, now)
+
+        while len(self._networks) > self.max_size:
+            evicted_chat_id, _ = self._networks.popitem(last=False)
+            self.logger.info(f"Сеть чата {evicted_chat_id} вытеснена из пула")
+
+        return network
+
+    def discard(self, chat_id: int) -> Optional[Any]:
+        """
+        Удаляет сеть чата из пула.
+
+        :param chat_id: Идентификатор чата
+        :type chat_id: int
+        :return: Удаленная сеть или None
+        """
+        entry = self._networks.pop(chat_id, None)
+        return entry[0] if entry else None
+
+    def clear(self):
+        """Очищает пул."""
+        self._networks.clear()
+
+    def _evict_idle(self, now: float):
+        """
+        Удаляет сети, простаивающие дольше idle_ttl.
+
+        :param now: Текущее время
+        :type now: float
+        """
+        threshold = now - self.idle_ttl
+        # Записи упорядочены по времени обращения, поэтому достаточно смотреть в начало
+        while self._networks:
+            chat_id, (_, last_used) = next(iter(self._networks.items()))
+            if last_used > threshold:
+                break
+            self._networks.popitem(last=False)
+            self.logger.info(f"Сеть чата {chat_id} удалена по простою")
+
+    def __len__(self) -> int:
+        return len(self._networks)
+
+    def __contains__(self, chat_id: int) -> bool:
+        return chat_id in self._networks
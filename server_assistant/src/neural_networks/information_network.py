@@ -23,10 +23,10 @@ class InformationNetwork:
         self.user_preferences = UserPreferences()
         selected_model = self.user_preferences.get_llm_model(chat_id=chat_id)
         
-        self.openai_processor = OpenAIProcessor(chat_id=chat_id)
+        self.openai_processor = OpenAIProcessor(task_type="INFORMATION", chat_id=chat_id)
 
 
-    def generate_response(self, message, transcribe=None):
+    async def generate_response(self, message, transcribe=None):
         """
         Генерация информационного ответа
         
@@ -73,7 +73,7 @@ class InformationNetwork:
         else:
             text = message.from_user.username + ': ' + transcribe
         self.logger.info(f"Отправка запроса в INFORMATION. Запрос: {system_message + text}")
-        response = self.openai_processor.process_with_retry(
+        response = await self.openai_processor.process_with_retry(
             prompt=system_message + '\n' + text, 
             temperature=0.5,
             max_tokens=2000, 
@@ -0,0 +1,297 @@
+import json
+import logging
+import os
+import re
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.utils.text_normalization import normalize_text
+
+logger = logging.getLogger(__name__)
+
+# Выражения времени, отличающие напоминание от просьбы вспомнить заметку.
+# Текст уже нормализован: "10:30" превращается в "10 30"
+_TIME_PATTERN = (
+    r'(\b(в|к|до)\s+\d{1,2}(\s\d{2})?\b|\b\d{1,2}\s\d{2}\b'
+    r'|\bчерез\s+(\d+\s+|пару\s+|несколько\s+)?(минут[уы]?|час(а|ов)?|полчаса|день|дня|дней|недел[юиь])\b'
+    r'|\b\d+\s+(минут[уы]?|час(а|ов)?)\b'
+    r'|\bсегодня\b|\bзавтра\b|\bпослезавтра\b'
+    r'|\bкажд(ый|ую|ое|ые)\s+(день|утро|вечер|час|неделю|месяц|год|понедельник|вторник|среду|четверг|пятницу|субботу|воскресенье)\b'
+    r'|\bежедневно\b|\bутром\b|\bвечером\b|\bднем\b|\bночью\b'
+    r'|\bв (понедельник|вторник|среду|четверг|пятницу|субботу|воскресенье)\b)'
+)
+_TIME_RE = re.compile(_TIME_PATTERN)
+
+# Правила проверяются по порядку; метки совпадают с именами TaskType
+KEYWORD_RULES: List[Tuple[re.Pattern, str]] = [
+    (re.compile(r'\b(удали|удалить|очисти|очистить|сотри|стереть)\b.*\b(все|всю)\b.*\b(заметк\w*|записи|память)\b'),
+     'DELETE_ALL_MEMORIES'),
+    (re.compile(r'\b(очисти|очистить)\b\s+(список заметок|память|заметки)\b'), 'DELETE_ALL_MEMORIES'),
+    (re.compile(r'\b(удали|удалить|сотри|стереть)\b.*\bзаметк\w*'), 'DELETE_MEMORY'),
+    (re.compile(r'\b(покажи|показать|выведи|перечисли)\b.*\b(заметки|записи)\b'), 'VIEW_MEMORIES'),
+    (re.compile(r'\bчто у нас записано\b'), 'VIEW_MEMORIES'),
+]
+
+# Признаки того, что ключевое правило не охватывает запрос целиком и решать должна LLM
+# с контекстом диалога: тема ("покажи заметки про отпуск" - это вспомнить, а не вывести все),
+# правка внутри заметки и несколько действий в одном сообщении
+_TOPIC_RE = re.compile(r'\b(про|о|об|насчет|по поводу)\b')
+_TOPIC_SENSITIVE = ('VIEW_MEMORIES', 'DELETE_ALL_MEMORIES')
+_EDIT_RE = re.compile(
+    r'\b(добав\w*|допиши|измени\w*|замени\w*|исправ\w*|обнови\w*|перепиши|поменя\w*)\b|\bиз\s+заметк\w*'
+)
+
+# Правила, зависящие от наличия выражения времени в сообщении
+_REMIND_RE = re.compile(r'\bнапомни\w*\b')
+_REMEMBER_RE = re.compile(r'\bзапомни\b')
+_RECALL_RE = re.compile(r'\b(напомни|вспомни)\b.*\b(какой|какая|какое|какие|что|где|когда|как|кто|сколько)\b')
+
+
+def match_rules(text: str) -> Optional[str]:
+    """
+    Определяет тип задачи по ключевым правилам для очевидных случаев.
+
+    :param text: Сообщение пользователя
+    :type text: str
+    :return: Имя типа задачи или None, если правила не сработали
+    :rtype: str | None
+    """
+    normalized = normalize_text(text)
+    for pattern, label in KEYWORD_RULES:
+        if pattern.search(normalized):
+            if _EDIT_RE.search(normalized):
+                return None
+            if label in _TOPIC_SENSITIVE and _TOPIC_RE.search(normalized):
+                return None
+            return label
+
+    has_time = bool(_TIME_RE.search(normalized))
+    if _REMIND_RE.search(normalized) and has_time:
+        return 'REMINDER'
+    if _REMEMBER_RE.search(normalized) and not has_time:
+        return 'ADD_MEMORY'
+    if _RECALL_RE.search(normalized) and not has_time:
+        return 'RECALL_MEMORY'
+    return None
+
+
+class IntentClassifier:
+    """
+    Локальный классификатор типа задачи, работающий перед LLM-роутером.
+
+    Сначала применяет ключевые правила, затем TF-IDF модель с линейным
+    классификатором. Возвращает метку только при уверенности выше порога,
+    иначе решение остается за LLM.
+    """
+
+    def __init__(self, model_path: Optional[str] = None, threshold: float = 0.75):
+        """
+        :param model_path: Путь к обученной модели (joblib)
+        :type model_path: str | None
+        :param threshold: Минимальная уверенность модели для ответа без LLM
+        :type threshold: float
+        """
+        self.logger = logging.getLogger(__name__)
+        self.threshold = threshold
+        self.model = None
+
+        if model_path and os.path.exists(model_path):
+            try:
+                import joblib
+                self.model = joblib.load(model_path)
+                self.logger.info(f"Загружена модель классификатора: {model_path}")
+            except Exception as e:
+                self.logger.error(f"Ошибка загрузки модели классификатора: {e}")
+
+    def predict(self, text: str) -> Tuple[Optional[str], float]:
+        """
+        Классифицирует сообщение.
+
+        :param text: Сообщение пользователя
+        :type text: str
+        :return: Кортеж (имя типа задачи или None, уверенность)
+        :rtype: Tuple[str | None, float]
+        """
+        label = match_rules(text)
+        if label:
+            return label, 1.0
+
+        if self.model is None:
+            return None, 0.0
+
+        label, confidence = self.predict_model(text)
+        if confidence < self.threshold:
+            return None, confidence
+        return label, confidence
+
+    def predict_model(self, text: str) -> Tuple[str, float]:
+        """
+        Классифицирует сообщение только моделью, без правил и порога.
+
+        :param text: Сообщение пользователя
+        :type text: str
+        :return: Кортеж (имя типа задачи, уверенность)
+        :rtype: Tuple[str, float]
+        """
+        probabilities = self.model.predict_proba([normalize_text(text)])[0]
+        best = probabilities.argmax()
+        return str(self.model.classes_[best]), float(probabilities[best])
+
+    def fit(self, samples: Iterable[Tuple[str, str]]):
+        """
+        Обучает модель на парах (текст, метка).
+
+        :param samples: Обучающие примеры
+        :type samples: Iterable[Tuple[str, str]]
+        :return: self
+        """
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.pipeline import make_pipeline
+
+        texts, labels = zip(*samples)
+        self.model = make_pipeline(
+            TfidfVectorizer(analyzer='char_wb', ngram_range=(2, 5), sublinear_tf=True, min_df=1),
+            LogisticRegression(max_iter=1000, class_weight='balanced')
+        )
+        self.model.fit([normalize_text(text) for text in texts], list(labels))
+        return self
+
+    def save(self, model_path: str):
+        """
+        Сохраняет модель в файл.
+
+        :param model_path: Путь для сохранения модели
+        :type model_path: str
+        """
+        import joblib
+
+        directory = os.path.dirname(model_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        joblib.dump(self.model, model_path)
+
+    def evaluate(self, samples: List[Tuple[str, str]]) -> Dict[str, float]:
+        """
+        Оценивает классификатор на отложенной выборке.
+
+        :param samples: Пары (текст, метка) для проверки
+        :type samples: List[Tuple[str, str]]
+        :return: Отчет: точность модели, покрытие и точность без LLM, задержка
+        :rtype: Dict[str, float]
+        """
+        model_correct = 0
+        answered = 0
+        answered_correct = 0
+        latencies = []
+
+        for text, expected in samples:
+            start = time.perf_counter()
+            label, _ = self.predict(text)
+            latencies.append(time.perf_counter() - start)
+
+            if label is not None:
+                answered += 1
+                answered_correct += int(label == expected)
+            if self.model is not None:
+                model_correct += int(self.predict_model(text)[0] == expected)
+
+        total = len(samples)
+        latencies.sort()
+        return {
+            'samples': total,
+            'model_accuracy': model_correct / total if total and self.model is not None else 0.0,
+            'coverage': answered / total if total else 0.0,
+            'accuracy_on_covered': answered_correct / answered if answered else 0.0,
+            'latency_mean_ms': 1000 * sum(latencies) / total if total else 0.0,
+            'latency_p95_ms': 1000 * latencies[int(0.95 * (total - 1))] if total else 0.0
+        }
+
+
+def log_decision(log_path: str, text: str, label: str, source: str):
+    """
+    Дописывает решение роутера в журнал для последующего обучения.
+
+    :param log_path: Путь к журналу решений (JSONL)
+    :type log_path: str
+    :param text: Сообщение пользователя
+    :type text: str
+    :param label: Имя типа задачи
+    :type label: str
+    :param source: Источник решения ('llm' или 'local')
+    :type source: str
+    """
+    try:
+        directory = os.path.dirname(log_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        record = {'text': text, 'label': label, 'source': source, 'timestamp': time.time()}
+        with open(log_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    except Exception as e:
+        logger.error(f"Ошибка записи решения роутера: {e}")
+
+
+# Один поток: записи в журнал идут по порядку и не перемешиваются
+_decision_log_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='router-decisions')
+
+
+def log_decision_in_background(log_path: str, text: str, label: str, source: str) -> Future:
+    """
+    Дописывает решение роутера в журнал в фоновом потоке, не блокируя цикл событий.
+
+    :param log_path: Путь к журналу решений (JSONL)
+    :type log_path: str
+    :param text: Сообщение пользователя
+    :type text: str
+    :param label: Имя типа задачи
+    :type label: str
+    :param source: Источник решения ('llm' или 'local')
+    :type source: str
+    :return: Future записи (ждать его не обязательно)
+    :rtype: Future
+    """
+    return _decision_log_executor.submit(log_decision, log_path, text, label, source)
+
+
+def load_decisions(log_path: str, source: Optional[str] = 'llm') -> List[Tuple[str, str]]:
+    """
+    Загружает решения роутера из журнала.
+
+    :param log_path: Путь к журналу решений (JSONL)
+    :type log_path: str
+    :param source: Учитывать только решения этого источника (None - все)
+    :type source: str | None
+    :return: Список пар (текст, метка)
+    :rtype: List[Tuple[str, str]]
+    """
+    samples = []
+    with open(log_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if source is None or record.get('source') == source:
+                samples.append((record['text'], record['label']))
+    return samples
+
+
+@lru_cache(maxsize=None)
+def get_intent_classifier(model_path: str, threshold: float) -> IntentClassifier:
+    """
+    Возвращает общий для всех чатов экземпляр классификатора.
+
+    :param model_path: Путь к обученной модели
+    :type model_path: str
+    :param threshold: Порог уверенности
+    :type threshold: float
+    :return: Классификатор
+    :rtype: IntentClassifier
+    """
+    return IntentClassifier(model_path=model_path, threshold=threshold)
@@ -0,0 +1,57 @@
+import logging
+from typing import Dict, Optional, Tuple
+
+import httpx
+from openai import AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
+# Общий пул соединений для всех асинхронных клиентов LLM
+_http_client: Optional[httpx.AsyncClient] = None
+_clients: Dict[Tuple[str, Optional[str]], AsyncOpenAI] = {}
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Возвращает общий httpx.AsyncClient, создавая его при первом обращении.
+
+    :return: Асинхронный HTTP клиент с пулом соединений
+    :rtype: httpx.AsyncClient
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            timeout=httpx.Timeout(60.0, connect=10.0)
+        )
+    return _http_client
+
+
+def get_async_client(api_key: str, base_url: Optional[str] = None) -> AsyncOpenAI:
+    """
+    Возвращает AsyncOpenAI клиент для пары (ключ, адрес API).
+    Клиенты переиспользуются и работают поверх общего пула соединений.
+
+    :param api_key: API ключ
+    :type api_key: str
+    :param base_url: Адрес API (None - адрес OpenAI по умолчанию)
+    :type base_url: str | None
+    :return: Асинхронный клиент OpenAI-совместимого API
+    :rtype: AsyncOpenAI
+    """
+    key = (api_key, base_url)
+    client = _clients.get(key)
+    if client is None or client.is_closed():
+        client = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=get_http_client())
+        _clients[key] = client
+    return client
+
+
+async def close_clients():
+    """Закрывает общий пул соединений и сбрасывает кэш клиентов."""
+    global _http_client
+    _clients.clear()
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+        logger.info("Пул соединений LLM закрыт")
+    _http_client = None
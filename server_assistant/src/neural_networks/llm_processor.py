@@ -10,7 +10,7 @@ class LLMProcessor(ABC):
     """
 
     @abstractmethod
-    def process_with_retry(
+    async def process_with_retry(
         self, 
         prompt: str, 
         system_message: str = '', 
@@ -19,7 +19,7 @@ class LLMProcessor(ABC):
         temperature: float = 0.7
     ) -> Optional[str]:
         """
-        Абстрактный метод обработки запроса к LLM
+        Абстрактный метод асинхронной обработки запроса к LLM
         
         :param prompt: Пользовательский запрос
         :param system_message: Системное сообщение для контекста
@@ -40,7 +40,7 @@ class LLMProcessor(ABC):
         pass
 
     @abstractmethod
-    def validate_api_key(self) -> bool:
+    async def validate_api_key(self) -> bool:
         """
         Проверяет валидность API-ключа
         
@@ -0,0 +1,168 @@
+import hashlib
+import uuid
+from collections import OrderedDict, defaultdict
+from math import log
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.neural_networks.memory_index import QUERY_STOP_WORDS
+from src.utils.text_normalization import normalize_text, tokenize
+
+# Длина основы слова: грубая замена стемминга, сводящая словоформы ("шоколад", "шоколада") к одной
+STEM_LENGTH = 5
+
+
+def content_hash(text: str) -> str:
+    """
+    Хеш нормализованного текста заметки для поиска точных дубликатов.
+
+    :param text: Текст заметки
+    :type text: str
+    :return: Хеш в шестнадцатеричном виде
+    :rtype: str
+    """
+    return hashlib.sha1(normalize_text(text).encode('utf-8')).hexdigest()
+
+
+def index_terms(text: str) -> Set[str]:
+    """
+    Возвращает термы текста для инвертированного индекса.
+
+    :param text: Исходный текст
+    :type text: str
+    :return: Множество основ значимых слов
+    :rtype: Set[str]
+    """
+    return {token[:STEM_LENGTH] for token in tokenize(text) if token not in QUERY_STOP_WORDS}
+
+
+def new_note_id() -> str:
+    return uuid.uuid4().hex
+
+
+class NoteCatalog:
+    """
+    Заметки одного чата в памяти с индексами по ID, хешу текста и словам.
+
+    Проверка дубликата - поиск хеша во множестве, поиск по словам - обход
+    списков вхождений термов запроса, изменение и удаление - по ID заметки.
+    """
+
+    def __init__(self):
+        # id -> заметка; порядок - порядок добавления
+        self.notes: "OrderedDict[str, dict]" = OrderedDict()
+        # Хеш текста -> ID заметок с этим текстом (дубликаты возможны в старых файлах)
+        self._hashes: Dict[str, Set[str]] = defaultdict(set)
+        self._postings: Dict[str, Set[str]] = defaultdict(set)
+
+    def load(self, memories: List[dict]) -> bool:
+        """
+        Загружает заметки, назначая ID тем, у которых его нет.
+
+        :param memories: Список заметок из хранилища
+        :type memories: List[dict]
+        :return: True, если заметкам были назначены новые ID и список нужно сохранить
+        :rtype: bool
+        """
+        self.notes.clear()
+        self._hashes.clear()
+        self._postings.clear()
+
+        assigned = False
+        for memory in memories:
+            if not memory.get('id') or memory['id'] in self.notes:
+                memory['id'] = new_note_id()
+                assigned = True
+            self._index(memory)
+        return assigned
+
+    def _index(self, note: dict):
+        self.notes[note['id']] = note
+        self._hashes[content_hash(note['text'])].add(note['id'])
+        for term in index_terms(note['text']):
+            self._postings[term].add(note['id'])
+
+    def _unindex(self, note: dict):
+        text_hash = content_hash(note['text'])
+        note_ids = self._hashes.get(text_hash)
+        if note_ids is not None:
+            note_ids.discard(note['id'])
+            if not note_ids:
+                del self._hashes[text_hash]
+        for term in index_terms(note['text']):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.discard(note['id'])
+                if not postings:
+                    del self._postings[term]
+
+    def contains_text(self, text: str) -> bool:
+        return bool(self._hashes.get(content_hash(text)))
+
+    def find_id(self, text: str) -> Optional[str]:
+        """
+        Возвращает ID заметки с таким же текстом (с точностью до нормализации).
+
+        :param text: Текст заметки
+        :type text: str
+        :return: ID заметки или None
+        """
+        note_ids = self._hashes.get(content_hash(text))
+        return next(iter(note_ids)) if note_ids else None
+
+    def get(self, note_id: str) -> Optional[dict]:
+        return self.notes.get(note_id)
+
+    def add(self, chat_id: int, text: str) -> dict:
+        note = {'id': new_note_id(), 'chat_id': chat_id, 'text': text}
+        self._index(note)
+        return note
+
+    def remove(self, note_id: str) -> Optional[dict]:
+        note = self.notes.get(note_id)
+        if note is None:
+            return None
+        del self.notes[note_id]
+        self._unindex(note)
+        return note
+
+    def update(self, note_id: str, text: str) -> Optional[dict]:
+        note = self.notes.get(note_id)
+        if note is None:
+            return None
+        self._unindex(note)
+        note['text'] = text
+        # Заметка остается на своем месте в списке
+        self._index(note)
+        return note
+
+    def search(self, query: str, limit: int = 5) -> List[Tuple[dict, float]]:
+        """
+        Ищет заметки по словам запроса, взвешивая совпадения по редкости слова (IDF).
+
+        :param query: Текст запроса
+        :type query: str
+        :param limit: Максимальное количество заметок
+        :type limit: int
+        :return: Список (заметка, вес) по убыванию веса
+        :rtype: List[Tuple[dict, float]]
+        """
+        scores: Dict[str, float] = defaultdict(float)
+        total = len(self.notes)
+        for term in index_terms(query):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            weight = log(1 + total / len(postings))
+            for note_id in postings:
+                scores[note_id] += weight
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [(self.notes[note_id], score) for note_id, score in ranked]
+
+    def to_list(self) -> List[dict]:
+        return list(self.notes.values())
+
+    def __len__(self) -> int:
+        return len(self.notes)
+
+    def __contains__(self, note_id: str) -> bool:
+        return note_id in self.notes
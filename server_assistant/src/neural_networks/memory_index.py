@@ -0,0 +1,330 @@
+import logging
+import os
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.text_normalization import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Служебные слова запросов к заметкам, не несущие смысла для поиска
+QUERY_STOP_WORDS = {
+    'бот', 'пожалуйста', 'вспомни', 'напомни', 'найди', 'запомни', 'удали', 'удалить', 'сотри',
+    'измени', 'исправь', 'поменяй', 'обнови', 'допиши', 'добавь', 'заметку', 'заметка', 'заметки',
+    'заметке', 'запись', 'записи', 'мне', 'меня', 'мой', 'моя', 'мои', 'я', 'какой', 'какая', 'какое',
+    'какие', 'что', 'где', 'когда', 'про', 'о', 'об', 'в', 'на', 'и', 'а', 'там',
+}
+
+
+def query_text(text: str) -> str:
+    """
+    Убирает из запроса служебные слова, оставляя предмет поиска.
+
+    :param text: Запрос пользователя
+    :type text: str
+    :return: Текст для поиска (исходный нормализованный, если значимых слов нет)
+    :rtype: str
+    """
+    tokens = tokenize(text)
+    meaningful = [token for token in tokens if token not in QUERY_STOP_WORDS]
+    return ' '.join(meaningful or tokens)
+
+
+class HashingEmbedder:
+    """
+    Векторизация по символьным n-граммам без обучения и внешних моделей.
+    Словарь не нужен, поэтому новые заметки добавляются в индекс без перестроения.
+    """
+
+    name = 'hashing'
+
+    def __init__(self, n_features: int = 2 ** 12):
+        """
+        :param n_features: Размерность векторов
+        :type n_features: int
+        """
+        from sklearn.feature_extraction.text import HashingVectorizer
+
+        self.vectorizer = HashingVectorizer(
+            analyzer='char_wb',
+            ngram_range=(2, 4),
+            n_features=n_features,
+            alternate_sign=False,
+            norm='l2'
+        )
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        normalized = [' '.join(tokenize(text)) for text in texts]
+        # Сублинейный вес частых n-грамм, как у TF-IDF с sublinear_tf
+        matrix = self.vectorizer.transform(normalized)
+        matrix.data = 1 + np.log1p(matrix.data)
+        vectors = matrix.toarray().astype(np.float32)
+        return _normalize_rows(vectors)
+
+
+class SentenceEmbedder:
+    """
+    Векторизация локальной моделью sentence-transformers на CPU.
+    """
+
+    def __init__(self, model_name: str):
+        """
+        :param model_name: Имя или путь модели sentence-transformers
+        :type model_name: str
+        """
+        from sentence_transformers import SentenceTransformer
+
+        self.name = model_name
+        self.model = SentenceTransformer(model_name, device='cpu')
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        vectors = self.model.encode(texts, convert_to_numpy=True, normalize_embeddings=True)
+        return vectors.astype(np.float32)
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+@lru_cache(maxsize=None)
+def get_embedder(model_name: str = ''):
+    """
+    Возвращает векторизатор: модель эмбеддингов, если она задана и доступна, иначе хеширование n-грамм.
+
+    :param model_name: Имя модели sentence-transformers (пустая строка - без модели)
+    :type model_name: str
+    """
+    if model_name:
+        try:
+            return SentenceEmbedder(model_name)
+        except Exception as e:
+            logger.warning(f"Модель эмбеддингов {model_name} недоступна, используется хеширование n-грамм: {e}")
+    return HashingEmbedder()
+
+
+class MemoryIndex:
+    """
+    Векторный индекс заметок одного чата.
+
+    Векторы хранятся матрицей NumPy (строка - заметка), поиск - косинусная
+    близость одним умножением матрицы на вектор запроса. Индекс обновляется
+    точечно при добавлении, изменении и удалении заметок.
+
+    Матрица растет удвоением, удаленные строки помечаются надгробиями и
+    исключаются из поиска. На диске лежит снимок (.npz) и журнал изменений
+    рядом с ним: каждая операция дописывает в журнал только свою строку.
+    Снимок перезаписывается, когда журнал или число надгробий становятся
+    большими.
+    """
+
+    def __init__(self, embedder=None, index_file: Optional[str] = None, compact_every: int = 200):
+        """
+        :param embedder: Векторизатор (по умолчанию - хеширование n-грамм)
+        :param index_file: Путь для сохранения индекса (.npz); None - только в памяти
+        :type index_file: str | None
+        :param compact_every: Количество записей журнала, после которого снимок перезаписывается
+        :type compact_every: int
+        """
+        self.embedder = embedder or get_embedder()
+        self.index_file = index_file
+        self.journal_file = os.path.splitext(index_file)[0] + '.journal' if index_file else None
+        self.compact_every = compact_every
+        self._reset()
+
+    def _reset(self):
+        # Ключи и тексты в порядке строк матрицы; у удаленной строки ключ None
+        self._keys: List[Optional[str]] = []
+        self._texts: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._matrix: Optional[np.ndarray] = None
+        self._alive: Optional[np.ndarray] = None
+        self._tombstones = 0
+        self._journal_records = 0
+
+    @property
+    def keys(self) -> List[str]:
+        """ID заметок в порядке строк."""
+        return [key for key in self._keys if key is not None]
+
+    @property
+    def texts(self) -> List[str]:
+        """Тексты заметок в порядке строк."""
+        return [text for key, text in zip(self._keys, self._texts) if key is not None]
+
+    @property
+    def vectors(self) -> Optional[np.ndarray]:
+        """Копия векторов действующих заметок (строки в порядке keys)."""
+        if not self._rows:
+            return None
+        size = len(self._keys)
+        return self._matrix[:size][self._alive[:size]]
+
+    def build(self, items: List[Tuple[str, str]]):
+        """
+        Строит индекс заново, переиспользуя сохраненные векторы, если заметки не менялись.
+
+        :param items: Пары (ID заметки, текст) всех заметок
+        :type items: List[Tuple[str, str]]
+        """
+        keys = [key for key, _ in items]
+        texts = [text for _, text in items]
+        if self._load_saved(keys, texts):
+            return
+        self._reset()
+        if texts:
+            self._append_rows(keys, texts, self.embedder.encode(texts))
+        self.save()
+
+    def _load_saved(self, keys: List[str], texts: List[str]) -> bool:
+        if not self.index_file or not os.path.exists(self.index_file):
+            return False
+        try:
+            with np.load(self.index_file, allow_pickle=False) as data:
+                if str(data['embedder']) != self.embedder.name:
+                    return False
+                self._reset()
+                saved_keys = list(data['keys'])
+                if saved_keys:
+                    self._append_rows(saved_keys, list(data['texts']), data['vectors'])
+            self._replay_journal()
+            if self.keys != keys or self.texts != texts:
+                self._reset()
+                return False
+            return True
+        except Exception as e:
+            logger.warning(f"Не удалось загрузить индекс заметок {self.index_file}: {e}")
+            self._reset()
+            return False
+
+    def _replay_journal(self):
+        if not os.path.exists(self.journal_file):
+            return
+        size = os.path.getsize(self.journal_file)
+        with open(self.journal_file, 'rb') as f:
+            while f.tell() < size:
+                op, key, text = (str(value) for value in np.load(f, allow_pickle=False))
+                if op == 'remove':
+                    self._remove_row(key)
+                else:
+                    self._set_row(key, text, np.load(f, allow_pickle=False))
+                self._journal_records += 1
+
+    def save(self):
+        """Сохраняет снимок действующих строк на диск и очищает журнал."""
+        if not self.index_file:
+            return
+        try:
+            vectors = self.vectors if self._rows else np.zeros((0, 0), dtype=np.float32)
+            np.savez(
+                self.index_file,
+                embedder=np.array(self.embedder.name),
+                keys=np.array(self.keys, dtype=str),
+                texts=np.array(self.texts, dtype=str),
+                vectors=vectors
+            )
+            if os.path.exists(self.journal_file):
+                os.remove(self.journal_file)
+            # Снимок содержит только действующие строки: матрица уплотняется так же
+            keys, texts = self.keys, self.texts
+            self._reset()
+            if keys:
+                self._append_rows(keys, texts, vectors)
+        except Exception as e:
+            logger.error(f"Ошибка сохранения индекса заметок: {e}")
+
+    def _log(self, op: str, key: str, text: str = '', vector: Optional[np.ndarray] = None):
+        """Дописывает одну операцию в журнал; при необходимости перезаписывает снимок."""
+        if not self.index_file:
+            return
+        try:
+            with open(self.journal_file, 'ab') as f:
+                np.save(f, np.array([op, key, text], dtype=str), allow_pickle=False)
+                if vector is not None:
+                    np.save(f, vector, allow_pickle=False)
+            self._journal_records += 1
+        except Exception as e:
+            logger.error(f"Ошибка записи журнала индекса заметок: {e}")
+            return
+        if self._journal_records >= self.compact_every or self._tombstones > len(self._rows):
+            self.save()
+
+    def _append_rows(self, keys: List[str], texts: List[str], vectors: np.ndarray):
+        """Добавляет строки в конец матрицы, увеличивая ее емкость удвоением."""
+        size = len(self._keys)
+        needed = size + len(keys)
+        if self._matrix is None:
+            self._matrix = np.empty((max(needed, 16), vectors.shape[1]), dtype=np.float32)
+            self._alive = np.zeros(len(self._matrix), dtype=bool)
+        elif needed > len(self._matrix):
+            capacity = max(needed, 2 * len(self._matrix))
+            matrix = np.empty((capacity, self._matrix.shape[1]), dtype=np.float32)
+            matrix[:size] = self._matrix[:size]
+            alive = np.zeros(capacity, dtype=bool)
+            alive[:size] = self._alive[:size]
+            self._matrix, self._alive = matrix, alive
+        self._matrix[size:needed] = vectors
+        self._alive[size:needed] = True
+        for offset, (key, text) in enumerate(zip(keys, texts)):
+            self._rows[key] = size + offset
+        self._keys.extend(keys)
+        self._texts.extend(texts)
+
+    def _set_row(self, key: str, text: str, vector: np.ndarray):
+        position = self._rows.get(key)
+        if position is None:
+            self._append_rows([key], [text], vector.reshape(1, -1))
+        else:
+            self._texts[position] = text
+            self._matrix[position] = vector
+
+    def _remove_row(self, key: str) -> bool:
+        position = self._rows.pop(key, None)
+        if position is None:
+            return False
+        self._keys[position] = None
+        self._texts[position] = ''
+        self._alive[position] = False
+        self._tombstones += 1
+        return True
+
+    def add(self, key: str, text: str):
+        self.update(key, text)
+
+    def remove(self, key: str) -> bool:
+        if not self._remove_row(key):
+            return False
+        self._log('remove', key)
+        return True
+
+    def update(self, key: str, text: str):
+        vector = self.embedder.encode([text])[0]
+        self._set_row(key, text, vector)
+        self._log('set', key, text, vector)
+
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[str, float]]:
+        """
+        Возвращает заметки, ближайшие к запросу.
+
+        :param query: Текст запроса
+        :type query: str
+        :param top_k: Количество кандидатов
+        :type top_k: int
+        :return: Список (ID заметки, косинусная близость) по убыванию близости
+        :rtype: List[Tuple[str, float]]
+        """
+        if not self._rows:
+            return []
+        size = len(self._keys)
+        scores = self._matrix[:size] @ self.embedder.encode([query])[0]
+        scores[~self._alive[:size]] = -np.inf
+        top_k = min(top_k, len(self._rows))
+        positions = np.argpartition(-scores, top_k - 1)[:top_k]
+        positions = positions[np.argsort(-scores[positions])]
+        return [(self._keys[position], float(scores[position])) for position in positions]
+
+    def __len__(self) -> int:
+        return len(self._rows)
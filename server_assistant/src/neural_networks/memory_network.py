@@ -6,7 +6,12 @@ import os
 from re import I, T
 from typing import Dict, List, Optional
 
+from src.neural_networks.memory_catalog import NoteCatalog
+from src.neural_networks.memory_index import MemoryIndex, get_embedder, query_text
 from src.neural_networks.openai_processor import OpenAIProcessor
+from src.storage import get_storage
+
+from config import get_config
 
 
 class MemoryNetwork:
@@ -14,7 +19,7 @@ class MemoryNetwork:
     Сеть для управления пользовательскими заметками.
     
     Обеспечивает создание, поиск, редактирование и удаление заметок
-    с использованием персистентного хранения в JSON файлах.
+    с использованием персистентного хранения (JSON файлы или SQLite).
     """
 
     def __init__(self, chat_id: int):
@@ -26,10 +31,13 @@ class MemoryNetwork:
         """
 
         self.logger = logging.getLogger(__name__)
-        self.memory_file = os.path.join('temp', f'memories_{chat_id}.json')
-        # Создаем директорию, если не существует
-        os.makedirs(os.path.dirname(self.memory_file), exist_ok=True)
-        self.openai_processor = OpenAIProcessor(chat_id=chat_id)
+        self.storage = get_storage()
+        self.index_config = get_config().memory_index
+        # Заметки с индексами по ID, хешу и словам загружаются при первом обращении
+        self._catalog: Optional[NoteCatalog] = None
+        # Векторный индекс заметок строится при первом поиске
+        self._index: Optional[MemoryIndex] = None
+        self.openai_processor = OpenAIProcessor(task_type="MEMORY", chat_id=chat_id)
         self.chat_id = chat_id
         self.memory = {
             'chat_id': self.chat_id,
@@ -63,7 +71,7 @@ class MemoryNetwork:
         else:
             text = message.from_user.username + ': ' + transcribe
         try:
-            response = self.openai_processor.process_with_retry(
+            response = await self.openai_processor.process_with_retry(
                 prompt=system_message + '\n' + text, 
                 temperature=0.5,
                 max_tokens=2000, 
@@ -82,6 +90,24 @@ class MemoryNetwork:
         :param message: Сообщение пользователя
         :return: Извлеченный текст заметки или None
         """
+        # В LLM передаются только ближайшие к запросу заметки
+        query = transcribe if transcribe is not None else message.text
+        candidates = self._find_candidates(query)
+        if not candidates:
+            self.logger.info("Нет заметок для поиска")
+            return None
+        candidate_memories = [memory for memory, _ in candidates]
+
+        # Если одна заметка явно подходит, ответ не требует LLM
+        if search_type in ("SEARCH", "DELETE") and self._is_clear_match(candidates):
+            memory = candidates[0][0]
+            self.logger.info(f"Заметка выбрана по индексу без LLM: {memory['text']}")
+            if search_type == "SEARCH":
+                return memory['text']
+            return json.dumps(
+                {'id': memory['id'], 'chat_id': memory['chat_id'], 'text': memory['text']}, ensure_ascii=False
+            )
+
         if search_type == "SEARCH":
             self.logger.info("Активирована ветка SEARCH метода search_memories")
             system_message = f"""
@@ -101,7 +127,7 @@ class MemoryNetwork:
                 text = message.from_user.username + ': ' + transcribe
             memories = [
             {"role": "system", "content": "Ты помощник, который умеет извлекать информацию из памяти."},
-            {"role": "system", "content": str(self._load_memories())},
+            {"role": "system", "content": str(candidate_memories)},
             {"role": "user", "content": text}
             ]   
         if search_type == "DELETE":
@@ -115,6 +141,7 @@ class MemoryNetwork:
             Хорошо проанализируй список заметок и выбери наиболее подходящую.
             Выбранную для удаления заметку верни в формате json по шаблону:
             
+            "id": "<id заметки>",
             "chat_id": <id пользователя>,
             "text": "<текст заметки>"
             
@@ -127,7 +154,7 @@ class MemoryNetwork:
                 text = message.from_user.username + ': ' + transcribe
             memories = [
             {"role": "system", "content": "Ты помощник, который профессионально сопоставляет заметку из запроса пользователя с заметкой из списка."},
-            {"role": "system", "content": str(self._load_memories())},
+            {"role": "system", "content": str(candidate_memories)},
             {"role": "user", "content": text}
             ]   
 
@@ -144,10 +171,12 @@ class MemoryNetwork:
             В ответе тебе нужно вернуть изначальную заметку и обновленную заметку в формате json по шаблону:
             [
             
+            "id": "<id заметки>",
             "chat_id": <id пользователя>,
             "text": "<текст заметки>"
             
             
+            "id": "<id заметки>",
             "chat_id": <id пользователя>,
             "text": "<обновленный текст заметки>"
             
@@ -160,12 +189,12 @@ class MemoryNetwork:
                 text = message.from_user.username + ': ' + transcribe
             memories = [
             {"role": "system", "content": "Ты помощник, который профессионально редактирует заметки пользователя"},
-            {"role": "system", "content": str(self._load_memories())},
+            {"role": "system", "content": str(candidate_memories)},
             {"role": "user", "content": text}
             ]   
 
         try:
-            response = self.openai_processor.process_with_retry(
+            response = await self.openai_processor.process_with_retry(
                 prompt=system_message + '\n' + text, 
                 temperature=0.5,
                 max_tokens=2000, 
@@ -179,17 +208,94 @@ class MemoryNetwork:
         
         return response
             
+    def _get_catalog(self) -> NoteCatalog:
+        """
+        Возвращает заметки чата, загружая их из хранилища при первом обращении.
+
+        :return: Каталог заметок чата
+        """
+        if self._catalog is None:
+            self._catalog = NoteCatalog()
+            # Заметкам из старых файлов назначаются постоянные ID
+            if self._catalog.load(self._load_memories()):
+                self._save_memories(self._catalog.to_list())
+        return self._catalog
+
+    def _get_index(self) -> MemoryIndex:
+        """
+        Возвращает векторный индекс заметок, строя его при первом обращении.
+
+        :return: Индекс заметок чата
+        """
+        if self._index is None:
+            self._index = MemoryIndex(
+                embedder=get_embedder(self.index_config.embedding_model),
+                index_file=os.path.join(get_config().storage.base_dir, f'memory_index_{self.chat_id}.npz')
+            )
+            self._index.build([(note['id'], note['text']) for note in self._get_catalog().to_list()])
+        return self._index
+
+    def _find_candidates(self, query: str) -> List[tuple]:
+        """
+        Находит заметки, ближайшие к запросу: по векторному индексу и по словам.
+
+        :param query: Текст запроса пользователя
+        :return: Список (заметка, близость) по убыванию близости
+        """
+        catalog = self._get_catalog()
+        try:
+            index = self._get_index()
+            # Индекс мог разойтись с хранилищем (например, после ручной правки файла)
+            if index.keys != list(catalog.notes):
+                index.build([(note['id'], note['text']) for note in catalog.to_list()])
+            query = query_text(query)
+            candidates = [
+                (catalog.get(note_id), score)
+                for note_id, score in index.search(query, self.index_config.top_k)
+            ]
+            # Точные совпадения слов, не попавшие в векторную выдачу, идут в конец списка
+            found = {note['id'] for note, _ in candidates}
+            for note, _ in catalog.search(query, self.index_config.top_k):
+                if note['id'] not in found:
+                    candidates.append((note, 0.0))
+            return candidates
+        except Exception as e:
+            self.logger.error(f"Ошибка поиска по индексу заметок: {e}")
+            return [(note, 0.0) for note in catalog.to_list()]
+
+    def _resolve_note_id(self, memory: dict) -> Optional[str]:
+        """
+        Находит ID заметки из ответа LLM: по полю id или по тексту.
+
+        :param memory: Заметка из ответа LLM
+        :return: ID заметки или None
+        """
+        catalog = self._get_catalog()
+        if memory.get('id') in catalog:
+            return memory['id']
+        return catalog.find_id(memory.get('text', ''))
+
+    def _is_clear_match(self, candidates: List[tuple]) -> bool:
+        """
+        Проверяет, что лучшая заметка подходит с большим отрывом от остальных.
+
+        :param candidates: Список (заметка, близость) по убыванию близости
+        """
+        best_score = candidates[0][1]
+        next_score = candidates[1][1] if len(candidates) > 1 else 0.0
+        return (
+            best_score >= self.index_config.direct_threshold
+            and best_score - next_score >= self.index_config.direct_margin
+        )
+
     def _load_memories(self) -> List[Dict[str, str]]:
         """
-        Загрузка заметок из файла
+        Загрузка заметок из хранилища
         
         :return: Список заметок
         """
         try:
-            if os.path.exists(self.memory_file):
-                with open(self.memory_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return []
+            return self.storage.load_memories(self.chat_id)
         except Exception as e:
             self.logger.error(f"Ошибка загрузки памяти: {e}")
             return []
@@ -197,16 +303,37 @@ class MemoryNetwork:
 
     def _save_memories(self, memories: List[Dict[str, str]]):
         """
-        Сохранение заметок в файл
+        Сохранение заметок в хранилище
         
         :param memories: Список заметок для сохранения
         """
         try:
-            with open(self.memory_file, 'w', encoding='utf-8') as f:
-                json.dump(memories, f, ensure_ascii=False, indent=2)
+            self.storage.save_memories(self.chat_id, memories)
         except Exception as e:
             self.logger.error(f"Ошибка сохранения памяти: {e}")
 
+    def _upsert_memory(self, memory: Dict[str, str]):
+        """
+        Сохранение одной заметки по ID без перезаписи остальных
+
+        :param memory: Новая или измененная заметка
+        """
+        try:
+            self.storage.upsert_memory(self.chat_id, memory)
+        except Exception as e:
+            self.logger.error(f"Ошибка сохранения памяти: {e}")
+
+    def _delete_memory(self, note_id: str):
+        """
+        Удаление одной заметки из хранилища по ID
+
+        :param note_id: ID заметки
+        """
+        try:
+            self.storage.delete_memory(self.chat_id, note_id)
+        except Exception as e:
+            self.logger.error(f"Ошибка удаления памяти: {e}")
+
     async def add_memory(self, message: types.Message, transcribe=None) -> str:
         """
         Добавление новой заметки
@@ -221,24 +348,17 @@ class MemoryNetwork:
         if not memory_text:
             return "Не удалось извлечь информацию для заметки."
         
-        # Загрузка существующих заметок
-        self.logger.info("Загрузка существующих заметок")
-        try:
-            memories = self._load_memories()
-            self.logger.info(f"Существующие заметки извлечены")
-            if any(mem['text'] == memory_text for mem in memories):
-                return "Такая заметка уже существует."
-        except Exception as e:
-            self.logger.error(f"Ошибка загрузки памяти: {e}")
+        # Проверка дубликата по хешу текста
+        catalog = self._get_catalog()
+        if catalog.contains_text(memory_text):
+            return "Такая заметка уже существует."
+
         # Создание новой заметки
-        new_memory = {
-            'chat_id': self.chat_id,
-            'text': memory_text
-        }
-        
-        memories.append(new_memory)
+        new_memory = catalog.add(self.chat_id, memory_text)
         self.logger.info(f"Сохранение новой заметки: {new_memory}")
-        self._save_memories(memories)
+        self._upsert_memory(new_memory)
+        if self._index is not None:
+            self._index.add(new_memory['id'], memory_text)
         self.logger.info(f"Заметка успешно добавлена")
         
         return f"Запомнил: {memory_text}"
@@ -264,19 +384,17 @@ class MemoryNetwork:
             if response:
                 # Преобразуем JSON-строку в объект
                 memory_to_delete = json.loads(response)  # Предполагаем, что message содержит JSON
-                chat_id = memory_to_delete['chat_id']
-                text_to_delete = memory_to_delete['text']
-                
-                # Загружаем существующие заметки
-                memories = self._load_memories()
                 
-                # Поиск и удаление заметки
-                initial_count = len(memories)
-                memories = [mem for mem in memories if not (mem['chat_id'] == chat_id and mem['text'] == text_to_delete)]
+                # Поиск и удаление заметки по ID
+                catalog = self._get_catalog()
+                note_id = self._resolve_note_id(memory_to_delete)
+                removed = catalog.remove(note_id) if note_id else None
                 
-                if len(memories) < initial_count:
-                    self._save_memories(memories)
-                    return f"Удалил заметку: {text_to_delete}"
+                if removed:
+                    self._delete_memory(note_id)
+                    if self._index is not None:
+                        self._index.remove(note_id)
+                    return f"Удалил заметку: {removed['text']}"
                 
                 return "Не нашел заметок для удаления."
         
@@ -293,21 +411,20 @@ class MemoryNetwork:
             # Преобразуем ответ в JSON
             updated_memory = json.loads(response)
             
-            # Извлекаем chat_id и текст обновленной заметки
-            chat_id = updated_memory[1]['chat_id']  # Обновленная заметка
+            # Извлекаем текст обновленной заметки
             updated_text = updated_memory[1]['text']
             
-            # Загружаем существующие заметки
-            memories = self._load_memories()
-            
-            # Обновляем заметку
-            for mem in memories:
-                if mem['chat_id'] == chat_id and mem['text'] == updated_memory[0]['text']:
-                    mem['text'] = updated_text
-                    break
+            # Обновляем заметку по ID
+            catalog = self._get_catalog()
+            note_id = self._resolve_note_id(updated_memory[0])
+            updated_note = catalog.update(note_id, updated_text) if note_id else None
+            if not updated_note:
+                return "Не нашел заметку для изменения."
             
-            # Сохраняем обновленный список заметок
-            self._save_memories(memories)
+            # Сохраняем только измененную заметку
+            self._upsert_memory(updated_note)
+            if self._index is not None:
+                self._index.update(note_id, updated_text)
             
             return f"Заметка обновлена: {updated_text}"
         except Exception as e:
@@ -317,8 +434,10 @@ class MemoryNetwork:
     def delete_all(self):
         """Полное очищение списка заметок"""
         try:
-            if os.path.exists(self.memory_file):
-                os.remove(self.memory_file)  # Удаляем файл заметок
+            self._get_catalog().load([])
+            if self._index is not None:
+                self._index.build([])
+            if self.storage.delete_memories(self.chat_id):
                 return "Все заметки были удалены."
             else:
                 return "Файл заметок не найден."
@@ -330,7 +449,7 @@ class MemoryNetwork:
     def get_all_notes(self) -> str:
         """Возвращает текст всех заметок, каждая заметка на новой строке"""
         try:
-            memories = self._load_memories()  # Загружаем все заметки
+            memories = self._get_catalog().to_list()  # Загружаем все заметки
             if not memories:
                 return "Нет заметок для отображения."
             
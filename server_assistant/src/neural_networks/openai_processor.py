@@ -1,11 +1,11 @@
-import os
 import logging
-from openai import OpenAI
 from typing import Dict, Any, Optional
 from aiogram import types
 
 from src.neural_networks.llm_processor import LLMProcessor
-from src.neural_networks.dialog_manager import DialogManager
+from src.neural_networks.dialog_store import get_dialog_store
+from src.neural_networks.dialog_summarizer import DialogSummarizer
+from src.neural_networks.llm_client import get_async_client
 
 from config import get_config
 
@@ -17,10 +17,11 @@ class OpenAIProcessor(LLMProcessor):
 
     def __init__(self, task_type: str = None, chat_id: int = 0):
         """
-        :param task_type: Тип задачи для контекстуализации запросов
-        :param user_id: ID пользователя для управления контекстом
+        :param task_type: Тип задачи для контекстуализации запросов и выбора бюджета контекста
+        :param chat_id: ID чата для управления контекстом
         """
-        openai_config = get_config().neural_networks.openai
+        config = get_config()
+        openai_config = config.neural_networks.openai
         self.logger = logging.getLogger(__name__)
         api_key = openai_config.api_key
         
@@ -29,10 +30,20 @@ class OpenAIProcessor(LLMProcessor):
             raise ValueError("Необходимо установить OPENAI_API_KEY в .env файле")
         self.chat_id = chat_id
         
-        self.client = OpenAI(api_key=api_key)
+        self.client = get_async_client(api_key)
         self.task_type = task_type
 
-    def process_with_retry(
+        # Бюджет токенов истории диалога для данного типа задачи
+        context_config = config.dialog_context
+        self.context_max_tokens = context_config.budgets.get(task_type, context_config.max_tokens)
+        self.summarizer = DialogSummarizer(
+            self,
+            keep_tokens=context_config.summary_keep_tokens,
+            min_batch_tokens=context_config.summary_min_tokens,
+            max_batch_tokens=context_config.summary_max_batch_tokens
+        )
+
+    async def process_with_retry(
         self, 
         prompt: str, 
         system_message: str = "", 
@@ -56,7 +67,7 @@ class OpenAIProcessor(LLMProcessor):
         :return: Сгенерированный ответ или None при ошибке
         """
      
-        dialog_manager = DialogManager(context_file=os.path.join('temp', f'dialogue_context_{self.chat_id}.json'))  # Added DialogManager instance
+        dialog_manager = get_dialog_store().get(self.chat_id)
       
         if use_context == "MEM":
             try:
@@ -64,7 +75,7 @@ class OpenAIProcessor(LLMProcessor):
                     raise ValueError("Context file должен быть списком сообщений")
                 memory = context_file
                 memory.append({'role': 'user', 'content': prompt})              
-                response = self.client.chat.completions.create(
+                response = await self.client.chat.completions.create(
                     model=model,
                     messages=memory,
                     max_tokens=max_tokens,
@@ -79,7 +90,7 @@ class OpenAIProcessor(LLMProcessor):
 
             try:
                 # Подготовка контекста
-                context = dialog_manager.get_context() if use_context else []
+                context = dialog_manager.get_context(max_tokens=self.context_max_tokens) if use_context else []
                 
                 # Добавление системного сообщения            
                 if system_message:
@@ -89,7 +100,7 @@ class OpenAIProcessor(LLMProcessor):
                 context.append({'role': 'user', 'content': prompt})
                 
                 # Вызов OpenAI API с контекстом
-                response = self.client.chat.completions.create(
+                response = await self.client.chat.completions.create(
                     model=model,
                     messages=context,
                     max_tokens=max_tokens,
@@ -102,6 +113,9 @@ class OpenAIProcessor(LLMProcessor):
                 # Добавление ответа в контекст
                 dialog_manager.add_message(prompt, role='user')
                 dialog_manager.add_message(assistant_response, role='assistant')
+
+                # Сжатие старой истории - в фоне, вне пути ответа
+                self.summarizer.schedule(dialog_manager)
                 
                 return assistant_response
             
@@ -111,7 +125,7 @@ class OpenAIProcessor(LLMProcessor):
         else:
             mes = system_message + '\n' + prompt
             arr = [{'role': 'user', 'content': mes}]
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                     model=model,
                     messages=arr,
                     max_tokens=max_tokens,
@@ -128,7 +142,7 @@ class OpenAIProcessor(LLMProcessor):
                 text = f"{message.from_user.username}: {message.text}"
         except Exception as e:
             text = message.from_user.username + ': ' + message.text
-        dialog_manager = DialogManager(context_file=os.path.join('temp', f'dialogue_context_{chat_id}.json'))
+        dialog_manager = get_dialog_store().get(chat_id)
         dialog_manager.add_message(text, role='user')
 
     def get_model_info(self) -> Dict[str, Any]:
@@ -142,13 +156,13 @@ class OpenAIProcessor(LLMProcessor):
             "default_model": "gpt-4o-mini"
         }
 
-    def validate_api_key(self) -> bool:
+    async def validate_api_key(self) -> bool:
         """
         Проверяет валидность API-ключа OpenAI
         """
         try:
             # Пробуем сделать простой запрос для проверки ключа
-            test_response = self.client.chat.completions.create(
+            test_response = await self.client.chat.completions.create(
                 model="gpt-4o-mini",
                 messages=[{"role": "user", "content": "Hello"}],
                 max_tokens=10
@@ -0,0 +1,99 @@
+import re
+from typing import Optional
+
+from src.utils.text_normalization import normalize_text
+
+# Фразы, которые сами по себе означают просьбу о формате ответа.
+# Голые основы (голос*, озвуч*, текст*) не подходят: "как голосовать", "кто озвучивал", "текст письма"
+_AUDIO_PHRASE_RE = re.compile(
+    r'\b(голосом|вслух|голосовухой|голосовым|голосовыми|аудиосообщением|аудио сообщением|озвучь|озвучи'
+    r'|в (голосовом|аудио)( сообщении| формате)?|в виде (голосового|аудио)( сообщения)?|в аудиоформате)\b'
+)
+_TEXT_PHRASE_RE = re.compile(
+    r'\b(текстом|письменно|текстовыми|текстовым( сообщением)?|в (текстовом|письменном) (виде|формате)'
+    r'|в виде текста)\b'
+)
+
+# Сообщение-носитель, которое означает формат только рядом с просьбой: "пришли голосовое", но "я отправил голосовое"
+_AUDIO_MEDIUM_RE = re.compile(r'\b(голосовое|голосовуху|аудио|аудиосообщение|войс)\b')
+_TEXT_MEDIUM_RE = re.compile(r'\b(текстовое сообщение|текстовое)\b')
+
+# Просьбы в повелительном наклонении ("ответь", "пришли"), а не рассказ о прошлом ("отправил")
+_REPLY_VERB_RE = re.compile(
+    r'\b(ответь|ответьте|отвечай|отвечайте|пришли|пришлите|присылай|присылайте|отправь|отправьте'
+    r'|отправляй|запиши|запишите|продублируй|скинь|кинь)\b'
+)
+
+# Запросы, для которых ответ по умолчанию дублируется текстом и голосом
+_MULTI_RE = re.compile(r'\b(напомни\w*|составь\w* план|состав\w* расписани\w*|план на)\b')
+
+# Постоянный формат задается только явной фразой: наречие постоянства и глагол несовершенного вида,
+# относящийся к ответам ("всегда отвечай голосом"), а не просьба к одному ответу ("теперь расскажи ...")
+_STICKY_RE = re.compile(r'\b(всегда|теперь|впредь|дальше|отныне|постоянно|по умолчанию|с этого момента)\b')
+_STICKY_VERBS = r'отвечай|отвечайте|пиши|пишите|присылай|присылайте|отправляй|отправляйте|говори|говорите'
+_STICKY_VERB_RE = re.compile(rf'\b({_STICKY_VERBS})\b')
+# Сброс: "как обычно" только рядом с глаголом ответа или словом "формат" ("отвечай как обычно"),
+# а не в любом сообщении ("как обычно, напомни купить хлеб")
+_RESET_TARGETS = rf'{_STICKY_VERBS}|формат\w*|режим\w*'
+_RESET_RE = re.compile(
+    rf'\b({_RESET_TARGETS})( \w+)? (как обычно|как раньше)\b'
+    rf'|\b(как обычно|как раньше) ({_RESET_TARGETS})\b'
+    r'|\bсбрось\w* (формат|настройк\w*)\b'
+)
+
+RESET = 'RESET'
+
+
+def _wants(normalized: str, phrase_re: re.Pattern, medium_re: re.Pattern) -> bool:
+    return bool(phrase_re.search(normalized) or (medium_re.search(normalized) and _REPLY_VERB_RE.search(normalized)))
+
+
+def match_explicit_output_type(text: str) -> Optional[str]:
+    """
+    Определяет формат ответа по явной просьбе пользователя.
+
+    :param text: Сообщение пользователя
+    :type text: str
+    :return: 'TEXT', 'AUDIO', 'MULTI' или None, если формат не указан
+    :rtype: str | None
+    """
+    normalized = normalize_text(text)
+    wants_audio = _wants(normalized, _AUDIO_PHRASE_RE, _AUDIO_MEDIUM_RE)
+    wants_text = _wants(normalized, _TEXT_PHRASE_RE, _TEXT_MEDIUM_RE)
+
+    if wants_audio and wants_text:
+        return 'MULTI'
+    if wants_audio:
+        return 'AUDIO'
+    if wants_text:
+        return 'TEXT'
+    return None
+
+
+def match_implicit_output_type(text: str) -> Optional[str]:
+    """
+    Определяет формат ответа по типу запроса (напоминания, планы).
+
+    :param text: Сообщение пользователя
+    :type text: str
+    :return: 'MULTI' или None
+    :rtype: str | None
+    """
+    return 'MULTI' if _MULTI_RE.search(normalize_text(text)) else None
+
+
+def match_sticky_output_type(text: str) -> Optional[str]:
+    """
+    Определяет просьбу запомнить формат ответа для всех следующих сообщений.
+
+    :param text: Сообщение пользователя
+    :type text: str
+    :return: 'TEXT', 'AUDIO', 'MULTI', RESET для сброса или None
+    :rtype: str | None
+    """
+    normalized = normalize_text(text)
+    if _RESET_RE.search(normalized):
+        return RESET
+    if _STICKY_RE.search(normalized) and _STICKY_VERB_RE.search(normalized):
+        return match_explicit_output_type(text)
+    return None
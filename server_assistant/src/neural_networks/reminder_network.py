@@ -8,6 +8,7 @@ from aiogram import types
 from datetime import datetime
 
 from src.neural_networks.openai_processor import OpenAIProcessor
+from src.utils.recurrence import DAILY, parse_recurrence
 from src.utils.user_preferences import UserPreferences
 
 
@@ -30,7 +31,7 @@ class ReminderNetwork:
         self.bot = bot
         self.chat_id = chat_id
 
-    def generate_response(self, message: types.Message, transcribe=None):
+    async def generate_response(self, message: types.Message, transcribe=None):
         """
         Генерирует структурированный ответ с деталями напоминания.
 
@@ -47,12 +48,18 @@ class ReminderNetwork:
         Всегда отвечай ТОЛЬКО в JSON формате с полями:
         
             "text": "текст напоминания",
-            "time": "время напоминания в ISO формате",
-            "type": "one-time или constant"
+            "time": "время первого напоминания в ISO формате",
+            "type": "one-time или constant",
+            "recurrence": null, "daily", "weekdays", "weekends", "weekly", "monthly", "yearly" или строка RRULE
         
+        Для повторяющихся напоминаний type = "constant", для RRULE используй FREQ, INTERVAL, BYDAY, BYMONTHDAY, COUNT, UNTIL.
         Примеры:
-        1. Напомнить купить хлеб -> "text": "Купить хлеб", "time": "2025-02-27T18:00:00", "type": "one-time"
-        2. Ежедневная зарядка -> "text": "Зарядка", "time": "2025-02-27T07:00:00", "type": "constant"
+        1. Напомнить купить хлеб -> "text": "Купить хлеб", "time": "2025-02-27T18:00:00", "type": "one-time", "recurrence": null
+        2. Ежедневная зарядка -> "text": "Зарядка", "time": "2025-02-27T07:00:00", "type": "constant", "recurrence": "daily"
+        3. По будням в 9 планерка -> "text": "Планерка", "time": "2025-02-28T09:00:00", "type": "constant", "recurrence": "weekdays"
+        4. Каждые две недели по понедельникам и пятницам -> "text": "Отчет", "time": "2025-03-03T10:00:00", "type": "constant", "recurrence": "FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,FR"
+        5. Каждое 10 число оплатить интернет -> "text": "Оплатить интернет", "time": "2025-03-10T12:00:00", "type": "constant", "recurrence": "monthly"
+        6. В последнюю пятницу месяца сдать отчет -> "text": "Сдать отчет", "time": "2025-03-28T15:00:00", "type": "constant", "recurrence": "FREQ=MONTHLY;BYDAY=-1FR"
         Запрос пользователя {message.from_user.username}:
         """
         
@@ -63,7 +70,7 @@ class ReminderNetwork:
             else:
                 full_prompt = system_message + '\n' + time_message + '\n' + f'Запрос пользователя {message.from_user.username}: ' + transcribe
             # Получаем ответ от OpenAI
-            response = self.openai_processor.process_with_retry(
+            response = await self.openai_processor.process_with_retry(
                 prompt=full_prompt,
                 temperature=0.2,
                 use_context=True
@@ -85,7 +92,7 @@ class ReminderNetwork:
         Извлекает данные напоминания из JSON-ответа.
 
         :param response: JSON-строка с данными напоминания
-        :return: Кортеж (текст, время, тип) или None при ошибке
+        :return: Кортеж (текст, время, тип, правило повторения) или None при ошибке
         """
         try:
             # Извлечение JSON из текста с помощью регулярного выражения
@@ -101,11 +108,24 @@ class ReminderNetwork:
                 
                 # Парсинг времени
                 reminder_time = datetime.fromisoformat(reminder_data['time'])
+
+                # Правило повторения; постоянное напоминание без правила повторяется ежедневно.
+                # Нераспознанное правило не должно стоить пользователю самого напоминания
+                try:
+                    recurrence = parse_recurrence(reminder_data.get('recurrence'))
+                except ValueError as e:
+                    self.logger.warning(f"Правило повторения не распознано, напоминание будет разовым: {e}")
+                    recurrence = None
+                    reminder_data['type'] = 'one-time'
+                if recurrence is None and reminder_data['type'] == 'constant':
+                    recurrence = dict(DAILY, interval=1)
+                reminder_type = 'constant' if recurrence else reminder_data['type']
                 
                 return (
                     reminder_data['text'], 
                     reminder_time, 
-                    reminder_data['type']
+                    reminder_type,
+                    recurrence
                 )
             
             self.logger.error(f"Не найден JSON в ответе: {response}")
@@ -126,13 +146,13 @@ class ReminderNetwork:
         try:
             # Получаем детали напоминания
             if transcribe == None:
-                reminder_details = self.generate_response(message)
+                reminder_details = await self.generate_response(message)
             else:
-                reminder_details = self.generate_response(message, transcribe)
+                reminder_details = await self.generate_response(message, transcribe)
             
             if reminder_details:
-                reminder_text, reminder_time, reminder_type = reminder_details
-                return ["Запуск", reminder_text, reminder_time, reminder_type]
+                reminder_text, reminder_time, reminder_type, recurrence = reminder_details
+                return ["Запуск", reminder_text, reminder_time, reminder_type, recurrence]
             
             return "Не удалось распознать детали напоминания."
         
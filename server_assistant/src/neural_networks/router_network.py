@@ -1,8 +1,16 @@
+import asyncio
 import logging
+import time
 from enum import Enum, auto
+from typing import Dict, Tuple
 
+from src.neural_networks.intent_classifier import get_intent_classifier, log_decision_in_background
 from src.neural_networks.openai_processor import OpenAIProcessor
+from src.neural_networks.output_type_rules import (
+    RESET, match_explicit_output_type, match_implicit_output_type, match_sticky_output_type
+)
 from src.utils.user_preferences import UserPreferences
+from config import get_config
 
 
 class TaskType(Enum):
@@ -41,12 +49,91 @@ class RouterNetwork:
        
         self.logger = logging.getLogger(__name__)
         self.user_preferences = UserPreferences()
+        self.chat_id = chat_id
         
-        self.openai_processor = OpenAIProcessor(chat_id=chat_id)
+        self.openai_processor = OpenAIProcessor(task_type="ROUTER", chat_id=chat_id)
+
+        # Локальный классификатор: отвечает без LLM в очевидных случаях
+        router_config = get_config().router
+        self.intent_classifier = get_intent_classifier(router_config.intent_model_path, router_config.intent_threshold)
+        self.decisions_log = router_config.decisions_log
+        self.output_llm_fallback = router_config.output_llm_fallback
+
+        # Длительность последней классификации по этапам, в секундах
+        self.last_timings: Dict[str, float] = {}
+
+    async def classify(self, message: str) -> Tuple[TaskType, OutputType]:
+        """
+        Определяет тип задачи и тип вывода одновременно.
+        Обе классификации независимы, поэтому запросы к LLM выполняются параллельно.
+
+        :param message: Сообщение пользователя
+        :return: Кортеж (тип задачи, тип вывода)
+        """
+        start = time.perf_counter()
+        (task_type, task_time), (output_type, output_time) = await asyncio.gather(
+            self._timed(self.detect_task_type(message)),
+            self._timed(self.detect_output_type(message))
+        )
+        self.last_timings = {
+            'task_type': task_time,
+            'output_type': output_time,
+            'total': time.perf_counter() - start
+        }
+        self.logger.info(
+            f"Классификация: задача {task_type.name} за {task_time:.3f} с, "
+            f"вывод {output_type.name} за {output_time:.3f} с, "
+            f"всего {self.last_timings['total']:.3f} с"
+        )
+        return task_type, output_type
+
+    @staticmethod
+    async def _timed(coro):
+        """
+        Выполняет корутину и замеряет время ее выполнения.
+
+        :param coro: Корутина
+        :return: Кортеж (результат, длительность в секундах)
+        """
+        start = time.perf_counter()
+        result = await coro
+        return result, time.perf_counter() - start
     
-    def detect_output_type(self, message: str) -> OutputType:
+    async def detect_output_type(self, message: str) -> OutputType:
         """
         Определяет желаемый тип вывода на основе сообщения пользователя.
+        Использует правила по явным фразам и сохраненный формат чата;
+        LLM вызывается только если включен режим ROUTER_OUTPUT_LLM_FALLBACK.
+
+        :param message: Сообщение пользователя
+        :return: Тип вывода из enum OutputType
+        """
+        sticky = match_sticky_output_type(message)
+        if sticky == RESET:
+            self.user_preferences.set_output_type(self.chat_id, None)
+        elif sticky:
+            self.logger.info(f"Сохранен постоянный формат ответа: {sticky}")
+            self.user_preferences.set_output_type(self.chat_id, sticky)
+
+        explicit = match_explicit_output_type(message)
+        if explicit:
+            return OutputType[explicit]
+
+        preferred = self.user_preferences.get_output_type(self.chat_id)
+        if preferred:
+            return OutputType[preferred]
+
+        implicit = match_implicit_output_type(message)
+        if implicit:
+            return OutputType[implicit]
+
+        if self.output_llm_fallback:
+            return await self._detect_output_type_llm(message)
+        return OutputType.DEFAULT
+
+    async def _detect_output_type_llm(self, message: str) -> OutputType:
+        """
+        Определяет желаемый тип вывода с помощью LLM.
 
         :param message: Сообщение пользователя
         :return: Тип вывода из enum OutputType
@@ -72,7 +159,7 @@ class RouterNetwork:
 
         Запрос пользователя:
         """
-        classification = self.openai_processor.process_with_retry(
+        classification = await self.openai_processor.process_with_retry(
             prompt=system_message + '\n' + message, 
             temperature=0.5,
             max_tokens=2000
@@ -94,9 +181,28 @@ class RouterNetwork:
         self.logger.warning(f"Не удалось определить тип ответа для: {message}")
         return OutputType.TEXT
 
-    def detect_task_type(self, message: str) -> TaskType:
+    async def detect_task_type(self, message: str) -> TaskType:
         """
         Определяет тип задачи на основе сообщения пользователя.
+        Сначала пробует локальный классификатор, к LLM обращается
+        только при низкой уверенности.
+
+        :param message: Сообщение пользователя
+        :return: Тип задачи из enum TaskType
+        """
+        label, confidence = self.intent_classifier.predict(message)
+        if label:
+            self.logger.info(f"Локальная классификация типа задачи: {label} ({confidence:.2f})")
+            log_decision_in_background(self.decisions_log, message, label, source='local')
+            return TaskType[label]
+
+        task_type = await self._detect_task_type_llm(message)
+        log_decision_in_background(self.decisions_log, message, task_type.name, source='llm')
+        return task_type
+
+    async def _detect_task_type_llm(self, message: str) -> TaskType:
+        """
+        Определяет тип задачи с помощью LLM.
 
         :param message: Сообщение пользователя
         :return: Тип задачи из enum TaskType
@@ -207,7 +313,7 @@ class RouterNetwork:
         Запрос пользователя:
         """
 
-        classification = self.openai_processor.process_with_retry(
+        classification = await self.openai_processor.process_with_retry(
             prompt=system_message + '\n' + message, 
             temperature=0.5,
             max_tokens=2000,
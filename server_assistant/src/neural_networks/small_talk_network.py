@@ -17,11 +17,11 @@ class SmallTalkNetwork:
 
         self.logger = logging.getLogger(__name__)
         self.user_preferences = UserPreferences()
-        self.openai_processor = OpenAIProcessor(chat_id=chat_id)
+        self.openai_processor = OpenAIProcessor(task_type="SMALL_TALK", chat_id=chat_id)
     
 
 
-    def generate_response(self, message, transcribe=None):
+    async def generate_response(self, message, transcribe=None):
         """
         Генерирует ответ на сообщение пользователя с учетом контекста беседы.
 
@@ -56,7 +56,7 @@ class SmallTalkNetwork:
         else:
             text = message.from_user.username + ': ' + transcribe
 
-        response = self.openai_processor.process_with_retry(
+        response = await self.openai_processor.process_with_retry(
             prompt=system_message + '\n' + text, 
             max_tokens=2000, 
             temperature=0.7,
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
@@ -36,7 +37,7 @@ class TodoNetwork:
         """
         self.logger = logging.getLogger(__name__)
         self.user_preferences = UserPreferences()
-        self.openai_processor = OpenAIProcessor(chat_id=chat_id)
+        self.openai_processor = OpenAIProcessor(task_type="TODO", chat_id=chat_id)
         self.chat_id = chat_id
         self.config = get_config()
         project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
@@ -172,7 +173,7 @@ class TodoNetwork:
                 results.append(False)
         return results
 
-    def generate_response(self, message: types.Message, transcribe: Optional[str] = None) -> str:
+    async def generate_response(self, message: types.Message, transcribe: Optional[str] = None) -> str:
         """
         Генерация ответа на сообщение пользователя
 
@@ -219,7 +220,7 @@ class TodoNetwork:
             text = f"{message.from_user.username}: {message.text}"
 
         # Получаем ответ от нейросети
-        response = self.openai_processor.process_with_retry(
+        response = await self.openai_processor.process_with_retry(
             prompt=text,
             system_message=system_message,
             temperature=0.3,
@@ -235,8 +236,8 @@ class TodoNetwork:
         if not tasks:
             return "Извините, не удалось извлечь задачи из вашего сообщения."
 
-        # Добавляем задачи в календарь
-        results = self._add_to_calendar(tasks)
+        # Добавляем задачи в календарь (синхронный клиент Google - вне цикла событий)
+        results = await asyncio.to_thread(self._add_to_calendar, tasks)
 
         # Формируем ответ
         success_count = sum(1 for r in results if r)
@@ -0,0 +1,39 @@
+from typing import Optional
+
+from src.storage.base import DialogJournal, Storage
+from src.storage.json_storage import JsonStorage
+from src.storage.sqlite_storage import SQLiteStorage
+
+from config import get_config
+
+_storage: Optional[Storage] = None
+
+
+def get_storage() -> Storage:
+    """
+    Возвращает общее хранилище состояния, создавая его по настройкам при первом обращении.
+
+    :return: Хранилище состояния
+    :rtype: Storage
+    """
+    global _storage
+    if _storage is None:
+        storage_config = get_config().storage
+        if storage_config.backend == 'sqlite':
+            _storage = SQLiteStorage(storage_config.sqlite_path)
+        elif storage_config.backend == 'json':
+            _storage = JsonStorage(storage_config.base_dir, storage_config.preferences_file)
+        else:
+            raise ValueError(f"Неизвестный тип хранилища: {storage_config.backend}")
+    return _storage
+
+
+def close_storage():
+    """Закрывает общее хранилище состояния."""
+    global _storage
+    if _storage is not None:
+        _storage.close()
+        _storage = None
+
+
+__all__ = ['DialogJournal', 'Storage', 'JsonStorage', 'SQLiteStorage', 'get_storage', 'close_storage']
@@ -0,0 +1,192 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class DialogJournal(ABC):
+    """
+    Абстрактное хранилище контекста одного диалога.
+
+    Состояние - словарь с сообщениями ('messages') и сводкой ('summary').
+    Изменения передаются записями журнала: {'op': 'add', 'message': ...}
+    или {'op': 'summary', 'summary': ...}.
+    """
+
+    @abstractmethod
+    def load(self) -> Tuple[Any, List[dict]]:
+        """
+        Загружает состояние диалога.
+
+        :return: Кортеж (состояние или None, записи журнала после него)
+        """
+        pass
+
+    @abstractmethod
+    def append(self, record: dict) -> dict:
+        """
+        Сохраняет одну запись журнала.
+
+        :param record: Запись журнала
+        :return: Сохраненная запись
+        """
+        pass
+
+    @abstractmethod
+    def append_many(self, records: List[dict]):
+        """
+        Сохраняет несколько записей журнала одной операцией.
+
+        :param records: Записи журнала
+        """
+        pass
+
+    @abstractmethod
+    def needs_compaction(self) -> bool:
+        """
+        Проверяет, нужно ли сохранить полное состояние.
+
+        :return: True, если пора вызвать compact
+        """
+        pass
+
+    @abstractmethod
+    def compact(self, state: Any):
+        """
+        Сохраняет полное состояние диалога взамен накопленных записей.
+
+        :param state: Полное состояние диалога
+        """
+        pass
+
+    @abstractmethod
+    def delete(self):
+        """Удаляет все данные диалога."""
+        pass
+
+
+class Storage(ABC):
+    """
+    Абстрактный слой хранения состояния бота:
+    контексты диалогов, заметки, напоминания и настройки пользователей.
+    """
+
+    @abstractmethod
+    def dialog_journal(self, chat_id: Optional[int] = None) -> DialogJournal:
+        """
+        Возвращает хранилище контекста диалога.
+
+        :param chat_id: ID чата (None - общий контекст без привязки к чату)
+        :return: Хранилище контекста диалога
+        """
+        pass
+
+    @abstractmethod
+    def load_memories(self, chat_id: int) -> List[Dict[str, Any]]:
+        """
+        Загружает заметки чата.
+
+        :param chat_id: ID чата
+        :return: Список заметок
+        """
+        pass
+
+    @abstractmethod
+    def save_memories(self, chat_id: int, memories: List[Dict[str, Any]]):
+        """
+        Сохраняет заметки чата.
+
+        :param chat_id: ID чата
+        :param memories: Полный список заметок
+        """
+        pass
+
+    @abstractmethod
+    def upsert_memory(self, chat_id: int, memory: Dict[str, Any]):
+        """
+        Добавляет заметку или заменяет заметку с тем же ID.
+
+        :param chat_id: ID чата
+        :param memory: Заметка (словарь с ключом 'id')
+        """
+        pass
+
+    @abstractmethod
+    def delete_memory(self, chat_id: int, memory_id: str) -> bool:
+        """
+        Удаляет одну заметку.
+
+        :param chat_id: ID чата
+        :param memory_id: ID заметки
+        :return: True, если заметка существовала
+        """
+        pass
+
+    @abstractmethod
+    def delete_memories(self, chat_id: int) -> bool:
+        """
+        Удаляет все заметки чата.
+
+        :param chat_id: ID чата
+        :return: True, если заметки существовали
+        """
+        pass
+
+    @abstractmethod
+    def load_reminders(self) -> List[Dict[str, Any]]:
+        """
+        Загружает все напоминания.
+
+        :return: Список напоминаний
+        """
+        pass
+
+    @abstractmethod
+    def save_reminders(self, reminders: List[Dict[str, Any]]):
+        """
+        Сохраняет все напоминания.
+
+        :param reminders: Полный список напоминаний
+        """
+        pass
+
+    @abstractmethod
+    def upsert_reminder(self, reminder: Dict[str, Any]):
+        """
+        Добавляет напоминание или заменяет напоминание с тем же ID.
+
+        :param reminder: Напоминание (словарь с ключом 'id')
+        """
+        pass
+
+    @abstractmethod
+    def delete_reminder(self, reminder_id: Any) -> bool:
+        """
+        Удаляет напоминание.
+
+        :param reminder_id: ID напоминания
+        :return: True, если напоминание существовало
+        """
+        pass
+
+    @abstractmethod
+    def load_preferences(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Загружает настройки всех чатов.
+
+        :return: Словарь {chat_id: настройки}
+        """
+        pass
+
+    @abstractmethod
+    def save_chat_preferences(self, chat_id: str, preferences: Dict[str, Any], all_preferences: Dict[str, Any]):
+        """
+        Сохраняет настройки чата.
+
+        :param chat_id: ID чата (строкой)
+        :param preferences: Настройки этого чата
+        :param all_preferences: Настройки всех чатов (для хранилищ, пишущих их целиком)
+        """
+        pass
+
+    def close(self):
+        """Освобождает ресурсы хранилища."""
+        pass
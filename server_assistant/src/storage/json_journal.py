@@ -0,0 +1,152 @@
+import json
+import logging
+import os
+from typing import Any, List, Optional, Tuple
+
+from src.storage.base import DialogJournal
+
+
+class JsonJournal(DialogJournal):
+    """
+    Хранилище состояния в виде снимка и журнала изменений (JSONL).
+
+    Каждое изменение дописывается в журнал одной строкой, поэтому запись
+    не зависит от размера состояния. Периодически состояние целиком
+    сохраняется в снимок (атомарно, через временный файл), после чего
+    журнал очищается. При загрузке читается снимок и воспроизводится хвост
+    журнала; записи, уже вошедшие в снимок, пропускаются по номеру.
+    """
+
+    def __init__(self, snapshot_path: str, journal_path: Optional[str] = None, compact_every: int = 500):
+        """
+        :param snapshot_path: Путь к файлу снимка (JSON)
+        :type snapshot_path: str
+        :param journal_path: Путь к журналу (по умолчанию - снимок с расширением .jsonl)
+        :type journal_path: str | None
+        :param compact_every: После скольких записей журнала делать новый снимок
+        :type compact_every: int
+        """
+        self.logger = logging.getLogger(__name__)
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path or os.path.splitext(snapshot_path)[0] + '.jsonl'
+        self.compact_every = compact_every
+
+        # Номер последней записи и количество записей после последнего снимка
+        self.seq = 0
+        self.pending = 0
+
+        directory = os.path.dirname(self.snapshot_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def load(self) -> Tuple[Any, List[dict]]:
+        """
+        Загружает снимок и записи журнала, сделанные после него.
+
+        Поддерживает снимки старого формата (состояние без номера записи).
+        Поврежденные строки журнала (например, недописанная при сбое) пропускаются.
+
+        :return: Кортеж (состояние из снимка или None, список записей журнала)
+        :rtype: Tuple[Any, List[dict]]
+        """
+        state = None
+        snapshot_seq = 0
+        if os.path.exists(self.snapshot_path):
+            try:
+                with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                    snapshot = json.load(f)
+                if isinstance(snapshot, dict) and set(snapshot.keys()) == {'seq', 'state'}:
+                    snapshot_seq = snapshot['seq']
+                    state = snapshot['state']
+                else:
+                    state = snapshot
+            except (json.JSONDecodeError, OSError) as e:
+                self.logger.error(f"Ошибка чтения снимка {self.snapshot_path}: {e}")
+
+        records = []
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        self.logger.warning(f"Пропущена поврежденная запись журнала {self.journal_path}")
+                        continue
+                    if record.get('seq', 0) > snapshot_seq:
+                        records.append(record)
+
+        self.seq = max([snapshot_seq] + [record['seq'] for record in records])
+        self.pending = len(records)
+        return state, records
+
+    def append(self, record: dict) -> dict:
+        """
+        Дописывает запись в журнал.
+
+        :param record: Запись (словарь, сериализуемый в JSON)
+        :type record: dict
+        :return: Запись с присвоенным номером
+        :rtype: dict
+        """
+        self.seq += 1
+        record = dict(record, seq=self.seq)
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.pending += 1
+        return record
+
+    def append_many(self, records: List[dict]):
+        """
+        Дописывает несколько записей в журнал одной операцией записи.
+
+        :param records: Записи
+        :type records: List[dict]
+        """
+        if not records:
+            return
+        lines = []
+        for record in records:
+            self.seq += 1
+            lines.append(json.dumps(dict(record, seq=self.seq), ensure_ascii=False))
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        self.pending += len(records)
+
+    def needs_compaction(self) -> bool:
+        """
+        Проверяет, накопилось ли в журнале достаточно записей для нового снимка.
+
+        :return: True, если пора сделать снимок
+        :rtype: bool
+        """
+        return self.pending >= self.compact_every
+
+    def compact(self, state: Any):
+        """
+        Атомарно сохраняет снимок состояния и очищает журнал.
+
+        :param state: Полное текущее состояние
+        :type state: Any
+        """
+        temp_path = self.snapshot_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'seq': self.seq, 'state': state}, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.snapshot_path)
+
+        # Снимок уже содержит все записи; при сбое до очистки они будут пропущены по номеру
+        with open(self.journal_path, 'w', encoding='utf-8'):
+            pass
+        self.pending = 0
+
+    def delete(self):
+        """Удаляет снимок и журнал."""
+        for path in (self.snapshot_path, self.journal_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self.seq = 0
+        self.pending = 0
@@ -0,0 +1,192 @@
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from src.storage.base import Storage
+from src.storage.json_journal import JsonJournal
+
+
+class JsonStorage(Storage):
+    """
+    Хранение состояния в JSON файлах (формат по умолчанию).
+
+    Контексты диалогов и заметки - снимок и журнал на чат,
+    напоминания - общий снимок и журнал, настройки - общий файл.
+    """
+
+    def __init__(self, base_dir: str = 'temp', preferences_file: str = 'user_preferences.json'):
+        """
+        :param base_dir: Директория файлов состояния
+        :type base_dir: str
+        :param preferences_file: Путь к файлу настроек пользователей
+        :type preferences_file: str
+        """
+        self.logger = logging.getLogger(__name__)
+        self.base_dir = base_dir
+        self.preferences_file = preferences_file
+        self.reminder_file = os.path.join(base_dir, 'reminders.json')
+        os.makedirs(base_dir, exist_ok=True)
+
+        # Изменения напоминаний дописываются в reminders.jsonl, снимок - reminders.json
+        self._reminder_journal = JsonJournal(self.reminder_file)
+        self._reminders: Optional[Dict[str, Dict[str, Any]]] = None
+        self._reminder_lock = threading.Lock()
+
+        # Заметки: снимок memories_<chat_id>.json и журнал изменений memories_<chat_id>.jsonl
+        self._memory_journals: Dict[int, JsonJournal] = {}
+        self._memories: Dict[int, Dict[str, Dict[str, Any]]] = {}
+        self._memory_lock = threading.Lock()
+
+    def dialog_context_file(self, chat_id: Optional[int] = None) -> str:
+        """
+        Возвращает путь к снимку контекста диалога.
+
+        :param chat_id: ID чата (None - общий контекст)
+        :return: Путь к файлу
+        """
+        if chat_id is None:
+            return os.path.join(self.base_dir, 'dialogue_context.json')
+        return os.path.join(self.base_dir, f'dialogue_context_{chat_id}.json')
+
+    def memory_file(self, chat_id: int) -> str:
+        """
+        Возвращает путь к файлу заметок чата.
+
+        :param chat_id: ID чата
+        :return: Путь к файлу
+        """
+        return os.path.join(self.base_dir, f'memories_{chat_id}.json')
+
+    def dialog_journal(self, chat_id: Optional[int] = None) -> JsonJournal:
+        return JsonJournal(self.dialog_context_file(chat_id))
+
+    def _memory_journal(self, chat_id: int) -> JsonJournal:
+        journal = self._memory_journals.get(chat_id)
+        if journal is None:
+            journal = JsonJournal(self.memory_file(chat_id))
+            self._memory_journals[chat_id] = journal
+        return journal
+
+    def load_memories(self, chat_id: int) -> List[Dict[str, Any]]:
+        with self._memory_lock:
+            state, records = self._memory_journal(chat_id).load()
+            memories = {}
+            for memory in state or []:
+                # Заметки старого формата без ID получают временный ключ до назначения постоянного
+                key = str(memory.get('id') or f'#{len(memories)}')
+                memories[key if key not in memories else f'{key}#{len(memories)}'] = memory
+            for record in records:
+                if record.get('op') == 'upsert':
+                    memories[str(record['memory']['id'])] = record['memory']
+                elif record.get('op') == 'delete':
+                    memories.pop(str(record['id']), None)
+            self._memories[chat_id] = memories
+            return list(memories.values())
+
+    def save_memories(self, chat_id: int, memories: List[Dict[str, Any]]):
+        with self._memory_lock:
+            self._memories[chat_id] = {str(memory['id']): memory for memory in memories}
+            self._memory_journal(chat_id).compact(memories)
+
+    def upsert_memory(self, chat_id: int, memory: Dict[str, Any]):
+        self._write_memory_record(chat_id, {'op': 'upsert', 'memory': memory})
+
+    def delete_memory(self, chat_id: int, memory_id: str) -> bool:
+        if chat_id not in self._memories:
+            self.load_memories(chat_id)
+        if str(memory_id) not in self._memories[chat_id]:
+            return False
+        self._write_memory_record(chat_id, {'op': 'delete', 'id': memory_id})
+        return True
+
+    def _write_memory_record(self, chat_id: int, record: Dict[str, Any]):
+        """
+        Дописывает изменение заметки в журнал чата и делает снимок, когда журнал разросся.
+
+        :param chat_id: ID чата
+        :param record: Запись журнала
+        """
+        if chat_id not in self._memories:
+            self.load_memories(chat_id)
+        with self._memory_lock:
+            memories = self._memories[chat_id]
+            if record['op'] == 'upsert':
+                memories[str(record['memory']['id'])] = record['memory']
+            else:
+                memories.pop(str(record['id']), None)
+            journal = self._memory_journal(chat_id)
+            journal.append(record)
+            if journal.needs_compaction():
+                journal.compact(list(memories.values()))
+
+    def delete_memories(self, chat_id: int) -> bool:
+        with self._memory_lock:
+            journal = self._memory_journal(chat_id)
+            existed = os.path.exists(journal.snapshot_path) or os.path.exists(journal.journal_path)
+            journal.delete()
+            self._memories.pop(chat_id, None)
+        return existed
+
+    def load_reminders(self) -> List[Dict[str, Any]]:
+        with self._reminder_lock:
+            state, records = self._reminder_journal.load()
+            reminders = {}
+            for reminder in state or []:
+                # Дубликаты ID старого формата сохраняются под отдельными ключами
+                key = str(reminder['id'])
+                reminders[key if key not in reminders else f'{key}#{len(reminders)}'] = reminder
+            for record in records:
+                if record.get('op') == 'upsert':
+                    reminders[str(record['reminder']['id'])] = record['reminder']
+                elif record.get('op') == 'delete':
+                    reminders.pop(str(record['id']), None)
+            self._reminders = reminders
+            return list(reminders.values())
+
+    def save_reminders(self, reminders: List[Dict[str, Any]]):
+        with self._reminder_lock:
+            self._reminders = {str(reminder['id']): reminder for reminder in reminders}
+            self._reminder_journal.compact(reminders)
+
+    def upsert_reminder(self, reminder: Dict[str, Any]):
+        self._write_reminder_record({'op': 'upsert', 'reminder': reminder})
+
+    def delete_reminder(self, reminder_id: Any) -> bool:
+        if self._reminders is None:
+            self.load_reminders()
+        if str(reminder_id) not in self._reminders:
+            return False
+        self._write_reminder_record({'op': 'delete', 'id': reminder_id})
+        return True
+
+    def _write_reminder_record(self, record: Dict[str, Any]):
+        """
+        Дописывает изменение напоминаний в журнал и делает снимок, когда журнал разросся.
+
+        :param record: Запись журнала
+        """
+        if self._reminders is None:
+            self.load_reminders()
+        with self._reminder_lock:
+            if record['op'] == 'upsert':
+                self._reminders[str(record['reminder']['id'])] = record['reminder']
+            else:
+                self._reminders.pop(str(record['id']), None)
+            self._reminder_journal.append(record)
+            if self._reminder_journal.needs_compaction():
+                self._reminder_journal.compact(list(self._reminders.values()))
+
+    def load_preferences(self) -> Dict[str, Dict[str, Any]]:
+        if os.path.exists(self.preferences_file):
+            try:
+                with open(self.preferences_file, 'r') as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, IOError):
+                return {}
+        return {}
+
+    def save_chat_preferences(self, chat_id: str, preferences: Dict[str, Any], all_preferences: Dict[str, Any]):
+        with open(self.preferences_file, 'w') as f:
+            json.dump(all_preferences, f, indent=4)
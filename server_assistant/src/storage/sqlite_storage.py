@@ -0,0 +1,263 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.storage.base import DialogJournal, Storage
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dialog_messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    chat_key TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_dialog_messages_chat_timestamp ON dialog_messages (chat_key, timestamp);
+
+CREATE TABLE IF NOT EXISTS dialog_summaries (
+    chat_key TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS memories (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    chat_id INTEGER NOT NULL,
+    memory_id TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_memories_chat ON memories (chat_id);
+
+CREATE TABLE IF NOT EXISTS reminders (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    reminder_id TEXT NOT NULL,
+    chat_id INTEGER,
+    time TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_reminders_reminder_id ON reminders (reminder_id);
+CREATE INDEX IF NOT EXISTS idx_reminders_chat ON reminders (chat_id);
+CREATE INDEX IF NOT EXISTS idx_reminders_time ON reminders (time);
+
+CREATE TABLE IF NOT EXISTS preferences (
+    chat_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+"""
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+
+class SQLiteDialogJournal(DialogJournal):
+    """
+    Контекст одного диалога в SQLite: сообщение - строка таблицы.
+    Запись сообщения - один INSERT, полного сохранения состояния не требуется.
+    """
+
+    def __init__(self, storage: 'SQLiteStorage', chat_key: str):
+        """
+        :param storage: Хранилище SQLite
+        :type storage: SQLiteStorage
+        :param chat_key: Ключ диалога
+        :type chat_key: str
+        """
+        self.storage = storage
+        self.chat_key = chat_key
+
+    def load(self) -> Tuple[Any, List[dict]]:
+        with self.storage.lock:
+            rows = self.storage.connection.execute(
+                "SELECT data FROM dialog_messages WHERE chat_key = ? ORDER BY timestamp, id",
+                (self.chat_key,)
+            ).fetchall()
+            summary_row = self.storage.connection.execute(
+                "SELECT data FROM dialog_summaries WHERE chat_key = ?",
+                (self.chat_key,)
+            ).fetchone()
+
+        if not rows and summary_row is None:
+            return None, []
+        state = {'messages': [json.loads(row[0]) for row in rows]}
+        if summary_row is not None:
+            state['summary'] = json.loads(summary_row[0])
+        return state, []
+
+    def append(self, record: dict) -> dict:
+        self.append_many([record])
+        return record
+
+    def append_many(self, records: List[dict]):
+        with self.storage.lock, self.storage.connection:
+            for record in records:
+                self._apply(record)
+
+    def _apply(self, record: dict):
+        connection = self.storage.connection
+        if record.get('op') == 'add':
+            message = record['message']
+            connection.execute(
+                "INSERT INTO dialog_messages (chat_key, timestamp, data) VALUES (?, ?, ?)",
+                (self.chat_key, message['timestamp'], _dumps(message))
+            )
+        elif record.get('op') == 'summary':
+            summary = record['summary']
+            connection.execute(
+                "INSERT OR REPLACE INTO dialog_summaries (chat_key, data) VALUES (?, ?)",
+                (self.chat_key, _dumps(summary))
+            )
+            connection.execute(
+                "DELETE FROM dialog_messages WHERE chat_key = ? AND timestamp <= ?",
+                (self.chat_key, summary['timestamp'])
+            )
+
+    def needs_compaction(self) -> bool:
+        return False
+
+    def compact(self, state: Any):
+        with self.storage.lock, self.storage.connection:
+            connection = self.storage.connection
+            connection.execute("DELETE FROM dialog_messages WHERE chat_key = ?", (self.chat_key,))
+            connection.executemany(
+                "INSERT INTO dialog_messages (chat_key, timestamp, data) VALUES (?, ?, ?)",
+                [(self.chat_key, message['timestamp'], _dumps(message)) for message in state.get('messages', [])]
+            )
+            if state.get('summary'):
+                connection.execute(
+                    "INSERT OR REPLACE INTO dialog_summaries (chat_key, data) VALUES (?, ?)",
+                    (self.chat_key, _dumps(state['summary']))
+                )
+
+    def delete(self):
+        with self.storage.lock, self.storage.connection:
+            self.storage.connection.execute("DELETE FROM dialog_messages WHERE chat_key = ?", (self.chat_key,))
+            self.storage.connection.execute("DELETE FROM dialog_summaries WHERE chat_key = ?", (self.chat_key,))
+
+
+class SQLiteStorage(Storage):
+    """
+    Хранение состояния в одной базе SQLite в режиме WAL.
+
+    Каждое изменение затрагивает только свои строки, поэтому стоимость
+    записи не растет с количеством чатов и объемом истории.
+    """
+
+    def __init__(self, database_path: str = 'temp/assistant.db'):
+        """
+        :param database_path: Путь к файлу базы данных
+        :type database_path: str
+        """
+        self.logger = logging.getLogger(__name__)
+        self.database_path = database_path
+        directory = os.path.dirname(database_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(database_path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self._migrate()
+        self.logger.info(f"Подключена база данных SQLite: {database_path}")
+
+    def _migrate(self):
+        """Дополняет таблицы баз, созданных предыдущими версиями."""
+        with self.lock, self.connection:
+            columns = {row[1] for row in self.connection.execute("PRAGMA table_info(memories)")}
+            if 'memory_id' not in columns:
+                self.connection.execute("ALTER TABLE memories ADD COLUMN memory_id TEXT")
+                rows = self.connection.execute("SELECT id, data FROM memories").fetchall()
+                self.connection.executemany(
+                    "UPDATE memories SET memory_id = ? WHERE id = ?",
+                    [(json.loads(data).get('id'), row_id) for row_id, data in rows]
+                )
+            self.connection.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_memories_chat_memory ON memories (chat_id, memory_id)"
+            )
+
+    def dialog_journal(self, chat_id: Optional[int] = None) -> SQLiteDialogJournal:
+        return SQLiteDialogJournal(self, 'default' if chat_id is None else str(chat_id))
+
+    def load_memories(self, chat_id: int) -> List[Dict[str, Any]]:
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT data FROM memories WHERE chat_id = ? ORDER BY id", (chat_id,)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def save_memories(self, chat_id: int, memories: List[Dict[str, Any]]):
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM memories WHERE chat_id = ?", (chat_id,))
+            self.connection.executemany(
+                "INSERT INTO memories (chat_id, memory_id, data) VALUES (?, ?, ?)",
+                [(chat_id, memory.get('id'), _dumps(memory)) for memory in memories]
+            )
+
+    def upsert_memory(self, chat_id: int, memory: Dict[str, Any]):
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT INTO memories (chat_id, memory_id, data) VALUES (?, ?, ?) "
+                "ON CONFLICT (chat_id, memory_id) DO UPDATE SET data = excluded.data",
+                (chat_id, str(memory['id']), _dumps(memory))
+            )
+
+    def delete_memory(self, chat_id: int, memory_id: str) -> bool:
+        with self.lock, self.connection:
+            cursor = self.connection.execute(
+                "DELETE FROM memories WHERE chat_id = ? AND memory_id = ?", (chat_id, str(memory_id))
+            )
+        return cursor.rowcount > 0
+
+    def delete_memories(self, chat_id: int) -> bool:
+        with self.lock, self.connection:
+            cursor = self.connection.execute("DELETE FROM memories WHERE chat_id = ?", (chat_id,))
+        return cursor.rowcount > 0
+
+    def load_reminders(self) -> List[Dict[str, Any]]:
+        with self.lock:
+            rows = self.connection.execute("SELECT data FROM reminders ORDER BY time, id").fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def save_reminders(self, reminders: List[Dict[str, Any]]):
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM reminders")
+            self.connection.executemany(
+                "INSERT INTO reminders (reminder_id, chat_id, time, data) VALUES (?, ?, ?, ?)",
+                [
+                    (str(reminder['id']), reminder.get('chat_id'), reminder['time'], _dumps(reminder))
+                    for reminder in reminders
+                ]
+            )
+
+    def upsert_reminder(self, reminder: Dict[str, Any]):
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT INTO reminders (reminder_id, chat_id, time, data) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (reminder_id) DO UPDATE SET chat_id = excluded.chat_id, time = excluded.time, "
+                "data = excluded.data",
+                (str(reminder['id']), reminder.get('chat_id'), reminder['time'], _dumps(reminder))
+            )
+
+    def delete_reminder(self, reminder_id: Any) -> bool:
+        with self.lock, self.connection:
+            cursor = self.connection.execute("DELETE FROM reminders WHERE reminder_id = ?", (str(reminder_id),))
+        return cursor.rowcount > 0
+
+    def load_preferences(self) -> Dict[str, Dict[str, Any]]:
+        with self.lock:
+            rows = self.connection.execute("SELECT chat_id, data FROM preferences").fetchall()
+        return {chat_id: json.loads(data) for chat_id, data in rows}
+
+    def save_chat_preferences(self, chat_id: str, preferences: Dict[str, Any], all_preferences: Dict[str, Any]):
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO preferences (chat_id, data) VALUES (?, ?)",
+                (str(chat_id), _dumps(preferences))
+            )
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
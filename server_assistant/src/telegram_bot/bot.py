@@ -1,23 +1,31 @@
 import os
 import logging
 import asyncio
-import json
-from datetime import datetime, timedelta
+from contextlib import aclosing
+from datetime import datetime
 
 from aiogram import Bot, Dispatcher, types
 from aiogram.filters import Command
 from aiogram.types import BufferedInputFile
 
-import aiofiles
 from src.neural_networks.router_network import OutputType
 from src.neural_networks.guide_network import GuideNetwork
-from src.neural_networks.dialog_manager import DialogManager
-from src.neural_networks.openai_processor import OpenAIProcessor
+from src.neural_networks.guide_network_pool import GuideNetworkPool
+from src.neural_networks.llm_client import close_clients
+from src.neural_networks.dialog_store import get_dialog_store
+from src.storage import get_storage, close_storage
 from src.utils.user_preferences import UserPreferences
-from src.audio_processing.speech_recognition import AudioTranscriber
-from src.audio_processing.voice_synthesis import VoiceSynthesizer
+from src.audio_processing.transcription_service import (
+    TranscriptionQueueFull, close_transcription_service, get_transcription_service
+)
+from src.audio_processing.synthesis_service import SynthesisQueueFull, close_synthesis_service, get_synthesis_service
+from src.telegram_bot.reminder_scheduler import ReminderScheduler
+from src.telegram_bot.reminder_store import ReminderStore, advance_recurring, fire_timestamp
+from src.telegram_bot.send_queue import BULK, INTERACTIVE, SendQueue
 import glob
 
+from config import get_config
+
 # Настройка логирования
 logging.basicConfig(
     level=logging.INFO,
@@ -46,78 +54,67 @@ class TelegramAssistantBot:
         self.dp = Dispatcher()
         self.logger = logger
         
-        self.reminder_file = 'temp/reminders.json'
-        self.reminders = []  # Инициализируем пустым списком    
+        self.storage = get_storage()
+        # Напоминания сохраняются поштучно, без перезаписи всего списка
+        self.reminder_store = ReminderStore(self.storage)
+        # Один планировщик на все напоминания вместо задачи на каждое
+        self.reminder_scheduler = ReminderScheduler(self.deliver_reminder)
+        # Все исходящие сообщения идут через общую очередь с учетом лимитов Telegram
+        queue_config = get_config().send_queue
+        self.send_queue = SendQueue(
+            global_rate=queue_config.global_rate,
+            chat_rate=queue_config.chat_rate,
+            chat_burst=queue_config.chat_burst,
+            max_retries=queue_config.max_retries,
+            metrics_interval=queue_config.metrics_interval
+        )
         
         # Инициализация компонентов
         self.user_preferences = UserPreferences()
-        self.audio_transcriber = AudioTranscriber()
-        self.voice_synthesizer = VoiceSynthesizer()
-        self.dialog_manager = DialogManager()
+        # Распознавание речи идет в отдельных процессах и не блокирует обработку сообщений
+        self.transcription_service = get_transcription_service()
+        # Синтез речи идет в отдельных процессах и не задерживает другие чаты
+        self.synthesis_service = get_synthesis_service()
+
+        # Пул сетей по чатам: граф сетей строится один раз на чат
+        pool_config = get_config().guide_pool
+        self.guide_pool = GuideNetworkPool(
+            factory=lambda chat_id: GuideNetwork(bot=self.bot, chat_id=chat_id),
+            max_size=pool_config.max_size,
+            idle_ttl=pool_config.idle_ttl
+        )
         
         # Регистрация обработчиков
         self._register_handlers()
         
-        # Запуск мониторинга напоминаний
+        # Запуск планировщика напоминаний
         asyncio.create_task(self.initialize_reminders())
-        asyncio.create_task(self.start_reminder_monitoring())
+        asyncio.create_task(self.reminder_scheduler.run())
+        asyncio.create_task(self.send_queue.run())
+
+        # Периодическая запись контекстов диалогов на диск
+        asyncio.create_task(get_dialog_store().run_flusher())
 
     async def initialize_reminders(self):
-        """Инициализирует систему напоминаний из файла."""
+        """Загружает напоминания из хранилища и передает их планировщику."""
         try:
-            # Загружаем напоминания
-            self.reminders = await self.load_reminders()
-            self.logger.info(f"Загружено {len(self.reminders)} напоминаний")
+            reminders = await asyncio.to_thread(self.reminder_store.load)
+            self.reminder_scheduler.schedule_many(
+                [(reminder, fire_timestamp(reminder)) for reminder in reminders]
+            )
+            self.logger.info(f"Загружено {len(reminders)} напоминаний")
         except Exception as e:
             self.logger.error(f"Ошибка инициализации напоминаний: {e}")
-            self.reminders = []
-
-    async def load_reminders(self):
-        """
-        Загружает напоминания из файла.
-
-        :return: Список напоминаний
-        """
-        try:
-            if os.path.exists(self.reminder_file):
-                async with aiofiles.open(self.reminder_file, 'r', encoding='utf-8') as f:
-                    content = await f.read()
-                    # Явная проверка на пустую строку или пустой JSON
-                    if content.strip() in ['', '[]', 'null']:
-                        return []
-                    try:
-                        return json.loads(content)
-                    except json.JSONDecodeError:
-                        self.logger.error(f"Ошибка декодирования JSON: {content}")
-                        return []
-            else:
-                # Создаем файл с пустым списком, если он не существует
-                async with aiofiles.open(self.reminder_file, 'w', encoding='utf-8') as f:
-                    await f.write('[]')
-                return []
-        except Exception as e:
-            self.logger.error(f"Ошибка при загрузке напоминаний: {e}")
-            return []
-
-    async def save_reminders(self):
-        """Сохраняет текущие напоминания в файл."""
-        try:
-            async with aiofiles.open(self.reminder_file, 'w', encoding='utf-8') as f:
-                await f.write(json.dumps(self.reminders, ensure_ascii=False))
-            
-            self.logger.info(f"Сохранено {len(self.reminders)} напоминаний")
-        except Exception as e:
-            self.logger.error(f"Ошибка сохранения напоминаний: {e}")
-
 
-    async def add_reminder(self, reminder_text, reminder_time, reminder_type='one-time', chat_id=None):
+    async def add_reminder(self, reminder_text, reminder_time, reminder_type='one-time', chat_id=None, recurrence=None):
         """
         Добавляет новое напоминание.
 
         :param reminder_text: Текст напоминания
-        :param reminder_time: Время напоминания
+        :param reminder_time: Время напоминания (первого срабатывания для повторяющихся)
         :param reminder_type: Тип напоминания ('one-time' или 'constant')
         :param chat_id: ID чата
+        :param recurrence: Правило повторения (см. src.utils.recurrence) или None
         :return: Созданное напоминание или None при ошибке
         """
 
@@ -125,89 +122,139 @@ class TelegramAssistantBot:
             self.logger.info(f"Добавление напоминания: {reminder_text}, время: {reminder_time}, тип: {reminder_type}")
             
             reminder = {
-                'id': len(self.reminders) + 1,
                 'text': reminder_text,
                 'time': reminder_time.isoformat(),
                 'type': reminder_type,
                 'chat_id': chat_id
             }
+            if recurrence:
+                reminder['recurrence'] = recurrence
+                reminder['start'] = reminder_time.isoformat()
+            reminder = await asyncio.to_thread(self.reminder_store.add, reminder)
             
-            self.reminders.append(reminder)
-            await self.save_reminders()
-            
-            self.logger.info(f"Напоминание успешно добавлено. Текущий список: {self.reminders}")
+            self.logger.info(f"Напоминание успешно добавлено. Всего напоминаний: {len(self.reminder_store)}")
             
-            # Запуск потока для уведомления
-            asyncio.create_task(self.wait_and_notify(reminder))
+            self.reminder_scheduler.schedule(reminder, reminder_time.timestamp())
             return reminder
         except Exception as e:
             self.logger.error(f"Ошибка при добавлении напоминания: {e}")
             return None
 
-    async def wait_and_notify(self, reminder):
+    async def deliver_reminder(self, reminder):
         """
-        Ожидает время напоминания и отправляет уведомление.
+        Отправляет сработавшее напоминание. Вызывается планировщиком один раз на напоминание.
 
         :param reminder: Словарь с данными напоминания
         """
         try:
-            reminder_time = datetime.fromisoformat(reminder['time'])
-            time_to_wait = max((reminder_time - datetime.now()).total_seconds(), 0)
-            await asyncio.sleep(time_to_wait)
             message_text = f"Напоминание: {reminder['text']}"
 
             # Отправка сообщения пользователю
             chat_id = reminder['chat_id']  # Получаем ID пользователя
             try:
-                await self.bot.send_message(chat_id, message_text)
+                # Напоминания уступают очередь ответам пользователям
+                await self.send_queue.send(
+                    lambda: self.bot.send_message(chat_id, message_text), chat_id, priority=BULK
+                )
             except Exception as send_error:
                 self.logger.error(f"Ошибка отправки напоминания: {send_error}")
             
-            self.reminders = [rem for rem in self.reminders if rem['id'] != reminder['id']]
-            await self.save_reminders()
-            
-            # Для постоянных напоминаний создаем новое
-            if reminder['type'] == 'constant':
-                new_reminder_time = reminder_time + timedelta(days=1)
-                await self.add_reminder(
-                    reminder['text'], 
-                    new_reminder_time, 
-                    'constant', 
-                    chat_id=chat_id
-                )   
+            # Повторяющееся напоминание переносится на следующее срабатывание той же записью
+            next_reminder = advance_recurring(reminder, datetime.now())
+            if next_reminder is None:
+                await asyncio.to_thread(self.reminder_store.remove, reminder['id'])
+            else:
+                await asyncio.to_thread(self.reminder_store.update, next_reminder)
+                self.reminder_scheduler.schedule(next_reminder, fire_timestamp(next_reminder))
         except Exception as e:
-            self.logger.error(f"Ошибка в wait_and_notify: {e}")
+            self.logger.error(f"Ошибка доставки напоминания: {e}")
 
-    async def start_reminder_monitoring(self):
-        """Запускает постоянный мониторинг напоминаний."""
-        # Небольшая задержка для инициализации
-        await asyncio.sleep(5)
-        while True:
-            try:
-                now = datetime.now()
-                active_reminders = [
-                    reminder for reminder in self.reminders 
-                    if datetime.fromisoformat(reminder['time']) <= now
-                ]
-                
-                for reminder in active_reminders:
-                    asyncio.create_task(self.wait_and_notify(reminder))
-                    
-                # Удаляем обработанные напоминания
-                self.reminders = [
-                    rem for rem in self.reminders 
-                    if datetime.fromisoformat(rem['time']) > now
-                ]
-                await self.save_reminders()
-                
-                # Ожидание перед следующей проверкой
-                await asyncio.sleep(60)
-            
-            except Exception as e:
-                self.logger.error(f"Ошибка в мониторинге напоминаний: {e}")
-                await asyncio.sleep(60)
+    async def _reply(self, message: types.Message, text: str):
+        """
+        Отвечает на сообщение через очередь отправки.
+
+        :param message: Сообщение, на которое дается ответ
+        :param text: Текст ответа
+        """
+        return await self.send_queue.send(lambda: message.reply(text), message.chat.id, priority=INTERACTIVE)
+
+    async def _answer_voice(self, message: types.Message, voice: bytes):
+        """
+        Отправляет голосовой ответ через очередь отправки.
+
+        :param message: Сообщение, на которое дается ответ
+        :param voice: Содержимое файла OGG/Opus
+        """
+        return await self.send_queue.send(
+            lambda: message.answer_voice(BufferedInputFile(voice, 'voice.oga')), message.chat.id, priority=INTERACTIVE
+        )
+
+    async def _send_voice_reply(self, message: types.Message, text: str, text_fallback: bool = True):
+        """
+        Синтезирует и отправляет голосовой ответ. Длинный ответ уходит несколькими
+        голосовыми сообщениями: следующий фрагмент синтезируется, пока отправляется текущий.
+        Если синтез не удался или очередь синтеза заполнена, неозвученная часть ответа
+        отправляется текстом.
+
+        :param message: Сообщение, на которое дается ответ
+        :param text: Текст ответа
+        :param text_fallback: Отвечать текстом, если синтез не удался (False - текст уже отправлен)
+        """
+        chunks = self.synthesis_service.split_reply(text)
+        sent = 0
+        try:
+            # aclosing: при ошибке синтеза оставшиеся фрагменты сразу снимаются с очереди
+            async with aclosing(self.synthesis_service.synthesize_stream(chunks)) as stream:
+                async for voice in stream:
+                    if not voice:
+                        break
+                    await self._answer_voice(message, voice)
+                    sent += 1
+        except SynthesisQueueFull as e:
+            self.logger.warning(f"Очередь синтеза заполнена: {e}")
+        if text_fallback and (not sent or sent < len(chunks)):
+            await self._reply(message, ' '.join(chunks[sent:]) if sent else text)
+
+    def _remember_group_message(self, chat_id: int, text: str, username: str):
+        """
+        Сохраняет сообщение группы, обращенное не к боту, в контекст чата без ответа.
+
+        :param chat_id: ID чата
+        :param text: Текст сообщения
+        :param username: Имя автора
+        """
+        get_dialog_store().get(chat_id).add_message(f"{username}: {text}", role='user')
+
+    async def _remember_group_voice(self, message: types.Message):
+        """
+        Распознает голосовое сообщение группы, обращенное не к боту, и сохраняет его в контекст чата.
+        При заполненной очереди распознавания сообщение пропускается.
+
+        :param message: Сообщение с голосом
+        """
+        try:
+            voice_data = await self._download_voice(message)
+            transcribed_text = await self.transcription_service.transcribe(voice_data)
+        except TranscriptionQueueFull as e:
+            self.logger.warning(f"Голосовое сообщение группы не сохранено: {e}")
+            return
+        if transcribed_text:
+            self._remember_group_message(message.chat.id, transcribed_text, message.from_user.username)
+
+    async def _download_voice(self, message: types.Message) -> bytes:
+        """
+        Скачивает голосовое сообщение в память, без временного файла.
+
+        :param message: Сообщение с голосом
+        :return: Содержимое файла OGG/Opus
+        :rtype: bytes
+        """
+        self.logger.info('Скачивание голосового сообщения')
+        buffer = await self.bot.download(message.voice.file_id)
+        voice_data = buffer.getvalue()
+        self.logger.info(f'Скачивание голосового сообщения завершено. Размер: {len(voice_data)} байт')
+        return voice_data
 
-                
     async def _process_message(self, message: types.Message, chat_id: int, transcribe=None):
         """
         Обрабатывает входящее сообщение.
@@ -216,18 +263,45 @@ class TelegramAssistantBot:
         :param chat_id: ID пользователя
         :return: Кортеж (ответ, тип вывода)
         """
-        guide_network = GuideNetwork(bot=self.bot, chat_id=chat_id)
+        guide_network = self.guide_pool.get(chat_id)
         if transcribe == None:
             response, output_type = await guide_network.process_message(message)
         else:
             response, output_type = await guide_network.process_message(message, transcribe=transcribe)
 
+        response = await self._apply_reminder(response, chat_id)
+        return response, output_type
+
+    async def _process_voice(self, message: types.Message, chat_id: int, voice_data: bytes):
+        """
+        Обрабатывает голосовое сообщение, распознаваемое по фрагментам:
+        маршрутизация начинается, как только готов первый фрагмент.
+
+        :param message: Объект телеграма - сообщение
+        :param chat_id: ID пользователя
+        :param voice_data: Содержимое голосового сообщения
+        :return: Кортеж (ответ, тип вывода, распознанный текст)
+        """
+        guide_network = self.guide_pool.get(chat_id)
+        chunks = self.transcription_service.transcribe_stream(voice_data)
+        response, output_type, transcribed_text = await guide_network.process_voice_stream(message, chunks)
+        response = await self._apply_reminder(response, chat_id)
+        return response, output_type, transcribed_text
+
+    async def _apply_reminder(self, response, chat_id: int):
+        """
+        Создает напоминание, если сеть вернула команду запуска, и заменяет ее текстом ответа.
+
+        :param response: Ответ сети
+        :param chat_id: ID пользователя
+        :return: Ответ для пользователя
+        """
         if isinstance(response, list):
             if response[0] == "Запуск":
-                await self.add_reminder(response[1], response[2], response[3], chat_id=chat_id)
+                recurrence = response[4] if len(response) > 4 else None
+                await self.add_reminder(response[1], response[2], response[3], chat_id=chat_id, recurrence=recurrence)
                 response = f"Установлено напоминание {response[1]} на {response[2]}"
-        
-        return response, output_type
+        return response
 
     def _register_handlers(self):
         """Регистрирует обработчики команд и сообщений."""
@@ -244,7 +318,7 @@ class TelegramAssistantBot:
                 "Отправь голосовое или текстовое сообщение для общения!"
             )
             
-            await message.answer(welcome_text)
+            await self.send_queue.send(lambda: message.answer(welcome_text), message.chat.id)
         
         async def req(message: types.Message):
             response = "Произошла ошибка при обработке вашего запроса."
@@ -255,44 +329,30 @@ class TelegramAssistantBot:
                     
                     if output_type == OutputType.TEXT:  
                         if response:
-                            await message.reply(response)
+                            await self._reply(message, response)
                         else:
                             response = "Извините, не удалось сгенерировать ответ. Попробуйте позже."
-                            await message.reply(response)
+                            await self._reply(message, response)
                     elif output_type == OutputType.AUDIO:
                         if response:
-                            # Синтез голосового ответа
-                            voice_response_path = self.voice_synthesizer.text_to_speech(response)
-                            
-                            # Отправка голосового ответа
-                            with open(voice_response_path, 'rb') as voice_file:
-                                await message.answer_voice(BufferedInputFile(voice_file.read(), 'voice.oga'))
-                            
-                            # Удаление временных файлов
-                            os.remove(voice_response_path)
+                            # Синтез и отправка голосового ответа
+                            await self._send_voice_reply(message, response)
 
                     elif output_type == OutputType.MULTI:
                         if response:
-                            await message.reply(response)
-                            # Синтез голосового ответа
-                            voice_response_path = self.voice_synthesizer.text_to_speech(response)
-                            
-                            # Отправка голосового ответа
-                            with open(voice_response_path, 'rb') as voice_file:
-                                await message.answer_voice(BufferedInputFile(voice_file.read(), 'voice.oga'))
-                            
-                            # Удаление временных файлов
-                            os.remove(voice_response_path)
+                            await self._reply(message, response)
+                            # Синтез и отправка голосового ответа
+                            await self._send_voice_reply(message, response, text_fallback=False)
                     elif output_type == OutputType.DEFAULT:
                         if response:
-                            await message.reply(response)
+                            await self._reply(message, response)
                         else:
                             response = "Извините, не удалось сгенерировать ответ. Попробуйте позже."
-                            await message.reply(response)
+                            await self._reply(message, response)
                 
                 except Exception as e:
                     self.logger.error(f"Ошибка обработки текстового сообщения: {e}")
-                    await message.reply("Произошла ошибка при обработке сообщения.")
+                    await self._reply(message, "Произошла ошибка при обработке сообщения.")
 
             elif message.content_type == types.ContentType.VOICE:
                 await handle_voice_message(message)
@@ -305,112 +365,58 @@ class TelegramAssistantBot:
                 await req(message=message)
             elif message.chat.type == "group" or message.chat.type == "supergroup":
                 self.logger.info("Сообщение в группе")
-                try:
-                    self.logger.info(f"Тип сообщения: {message.content_type}")
-                    if message.content_type == "text":
-                        if message.text.split()[0] in ["Бот", "бот", "Бот,", "бот,"] or message.reply_to_message.from_user.id == self.bot.id: 
-                            await req(message=message)
-                        else:
-                            openai_processor = OpenAIProcessor(chat_id=message.chat.id)
-                            openai_processor.silent(message=message, chat_id=message.chat.id)
-                    elif message.content_type == "voice":
-                        if message.reply_to_message.from_user.id == self.bot.id:
-                            await req(message=message)
-                        else:
-                            openai_processor = OpenAIProcessor(chat_id=message.chat.id)
-                            voice_file = message.voice
-                            self.logger.info('Скачивание голосового сообщения')
-                            destination = os.path.join('temp', f'voice_{message.from_user.id}_{message.message_id}.oga')
-                            await self.bot.download(voice_file.file_id, destination=destination)
-                            self.logger.info(f'Скачивание голосового сообщения завершено. Путь: {destination}')
-                            
-                            # Транскрибация аудио
-                            transcribed_text = self.audio_transcriber.transcribe_audio(destination)
-                            text = message.from_user.username + ": " + transcribed_text
-                            os.remove(destination)
-                            openai_processor.silent(message=text, chat_id=message.chat.id)
-                        
-                except AttributeError:
-                    openai_processor = OpenAIProcessor(chat_id=message.chat.id)
-                    voice_file = message.voice
-                    self.logger.info('Скачивание голосового сообщения')
-                    destination = os.path.join('temp', f'voice_{message.from_user.id}_{message.message_id}.oga')
-                    await self.bot.download(voice_file.file_id, destination=destination)
-                    self.logger.info(f'Скачивание голосового сообщения завершено. Путь: {destination}')
-                    
-                    # Транскрибация аудио
-                    transcribed_text = self.audio_transcriber.transcribe_audio(destination)
-                    text = message.from_user.username + ": " + transcribed_text
-                    os.remove(destination)
-                    openai_processor.silent(message=text, chat_id=message.chat.id)
+                self.logger.info(f"Тип сообщения: {message.content_type}")
+                reply_to = message.reply_to_message
+                replied_to_bot = reply_to is not None and reply_to.from_user is not None and reply_to.from_user.id == self.bot.id
+                if message.content_type == "text":
+                    if message.text.split()[0] in ["Бот", "бот", "Бот,", "бот,"] or replied_to_bot:
+                        await req(message=message)
+                    else:
+                        self._remember_group_message(message.chat.id, message.text, message.from_user.username)
+                elif message.content_type == "voice":
+                    if replied_to_bot:
+                        await req(message=message)
+                    else:
+                        await self._remember_group_voice(message)
 
         #@self.dp.message(lambda message: message.content_type == types.ContentType.VOICE)
         async def handle_voice_message(message: types.Message):
             """Обработчик голосовых сообщений"""
             try:
-                # Получаем информацию о файле
-                voice_file = message.voice
-                self.logger.info('Скачивание голосового сообщения')
-                destination = os.path.join('temp', f'voice_{message.from_user.id}_{message.message_id}.oga')
-                await self.bot.download(voice_file.file_id, destination=destination)
-                self.logger.info(f'Скачивание голосового сообщения завершено. Путь: {destination}')
-                
-                # Транскрибация аудио
-                transcribed_text = self.audio_transcriber.transcribe_audio(destination)
+                voice_data = await self._download_voice(message)
+
+                # Транскрибация по фрагментам и генерация ответа: классификация начинается с первого фрагмента
+                response, output_type, transcribed_text = await self._process_voice(message, message.chat.id, voice_data)
                 self.logger.info('Транскрибация аудио завершена')
                 
+                # Расшифровка уже сохранена в контексте чата обработчиком запроса с ролью user
                 if transcribed_text:
-                    self.dialog_manager.add_message(transcribed_text, role='user_voice')
-                    # Генерация ответа на основе транскрибированного текста
-                    response, output_type = await self._process_message(message, message.chat.id, transcribe=transcribed_text)
-                    
                     if output_type == OutputType.TEXT:  
                         if response:
-                            await message.reply(response)
+                            await self._reply(message, response)
                         else:
                             response = "Извините, не удалось сгенерировать ответ. Попробуйте позже."
-                            await message.reply(response)
+                            await self._reply(message, response)
                     elif output_type == OutputType.AUDIO:
                         if response:
-                            # Синтез голосового ответа
-                            voice_response_path = self.voice_synthesizer.text_to_speech(response)
-                            
-                            # Отправка голосового ответа
-                            with open(voice_response_path, 'rb') as voice_file:
-                                await message.answer_voice(BufferedInputFile(voice_file.read(), 'voice.oga'))
-                            
-                            # Удаление временных файлов
-                            os.remove(voice_response_path)
+                            # Синтез и отправка голосового ответа
+                            await self._send_voice_reply(message, response)
                     elif output_type == OutputType.MULTI:
                         if response:
-                            await message.reply(response)
-                            # Синтез голосового ответа
-                            voice_response_path = self.voice_synthesizer.text_to_speech(response)
-                            
-                            # Отправка голосового ответа
-                            with open(voice_response_path, 'rb') as voice_file:
-                                await message.answer_voice(BufferedInputFile(voice_file.read(), 'voice.oga'))
-                            
-                            # Удаление временных файлов
-                            os.remove(voice_response_path)
+                            await self._reply(message, response)
+                            # Синтез и отправка голосового ответа
+                            await self._send_voice_reply(message, response, text_fallback=False)
                     elif output_type == OutputType.DEFAULT:
                         if response:
-                            # Синтез голосового ответа
-                            voice_response_path = self.voice_synthesizer.text_to_speech(response)
-                            
-                            # Отправка голосового ответа
-                            with open(voice_response_path, 'rb') as voice_file:
-                                await message.answer_voice(BufferedInputFile(voice_file.read(), 'voice.oga'))
-                            
-                            # Удаление временных файлов
-                            os.remove(voice_response_path)
-                
-                # Удаление временного файла
-                os.remove(destination)
-            
+                            # Синтез и отправка голосового ответа
+                            await self._send_voice_reply(message, response)
+
+            except TranscriptionQueueFull as e:
+                logger.warning(f"Голосовое сообщение отклонено: {e}")
+                await self._reply(message, "Сейчас слишком много голосовых сообщений, попробуйте позже.")
             except Exception as e:
                 logger.error(f"Ошибка обработки голосового сообщения: {e}")
-                await message.reply("Не удалось обработать голосовое сообщение.")
+                await self._reply(message, "Не удалось обработать голосовое сообщение.")
     async def _cleanup_temp_audio_files(self):
         """Удаляет временные аудиофайлы."""
         try:
@@ -428,7 +434,14 @@ class TelegramAssistantBot:
     async def start(self):
         """Запускает бота."""
         self.logger.info("Telegram бот запущен")
-        await self.dp.start_polling(self.bot)
+        try:
+            await self.dp.start_polling(self.bot)
+        finally:
+            get_dialog_store().flush_all()
+            close_storage()
+            close_transcription_service()
+            close_synthesis_service()
+            await close_clients()
 
 async def main():
     # Настройка логирования
@@ -0,0 +1,156 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+
+class ReminderScheduler:
+    """
+    Планировщик напоминаний на одной корутине.
+
+    Напоминания лежат в куче по времени срабатывания; корутина спит до
+    ближайшего срока и просыпается раньше, если добавлено или отменено
+    напоминание. Отмена и перенос не ищут запись в куче: старая запись
+    становится устаревшей и пропускается при извлечении.
+    """
+
+    def __init__(
+        self,
+        deliver: Callable[[dict], Awaitable[Any]],
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        :param deliver: Корутина доставки сработавшего напоминания
+        :type deliver: Callable[[dict], Awaitable]
+        :param clock: Источник текущего времени (секунды Unix)
+        :type clock: Callable[[], float]
+        """
+        self.logger = logging.getLogger(__name__)
+        self.deliver = deliver
+        self.clock = clock
+
+        # Куча (время срабатывания, порядковый номер, ID напоминания)
+        self._heap: List[Tuple[float, int, Any]] = []
+        # ID -> (время срабатывания, порядковый номер, напоминание); актуальна только запись с этим номером
+        self._pending: Dict[Any, Tuple[float, int, dict]] = {}
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        # Ссылки на задачи доставки, чтобы их не собрал сборщик мусора
+        self._deliveries: Set[asyncio.Task] = set()
+
+    def schedule(self, reminder: dict, fire_at: float):
+        """
+        Добавляет напоминание или переносит уже запланированное с тем же ID.
+
+        :param reminder: Напоминание (словарь с ключом 'id')
+        :type reminder: dict
+        :param fire_at: Время срабатывания (секунды Unix)
+        :type fire_at: float
+        """
+        seq = next(self._counter)
+        self._pending[reminder['id']] = (fire_at, seq, reminder)
+        heapq.heappush(self._heap, (fire_at, seq, reminder['id']))
+        self._compact()
+        self._wakeup.set()
+
+    def schedule_many(self, items: List[Tuple[dict, float]]):
+        """
+        Добавляет напоминания пачкой: куча строится за O(n) вместо n вставок.
+
+        :param items: Пары (напоминание, время срабатывания)
+        :type items: List[Tuple[dict, float]]
+        """
+        for reminder, fire_at in items:
+            seq = next(self._counter)
+            self._pending[reminder['id']] = (fire_at, seq, reminder)
+            self._heap.append((fire_at, seq, reminder['id']))
+        heapq.heapify(self._heap)
+        self._compact()
+        self._wakeup.set()
+
+    def cancel(self, reminder_id: Any) -> bool:
+        """
+        Отменяет напоминание.
+
+        :param reminder_id: ID напоминания
+        :return: True, если напоминание было запланировано
+        :rtype: bool
+        """
+        if self._pending.pop(reminder_id, None) is None:
+            return False
+        self._compact()
+        self._wakeup.set()
+        return True
+
+    def _compact(self):
+        """Перестраивает кучу, когда устаревших записей становится больше актуальных."""
+        if len(self._heap) > 2 * len(self._pending) + 64:
+            self._heap = [(fire_at, seq, reminder_id) for reminder_id, (fire_at, seq, _) in self._pending.items()]
+            heapq.heapify(self._heap)
+
+    def _is_current(self, entry: Tuple[float, int, Any]) -> bool:
+        pending = self._pending.get(entry[2])
+        return pending is not None and pending[1] == entry[1]
+
+    def next_fire_time(self) -> Optional[float]:
+        """
+        Возвращает время ближайшего срабатывания.
+
+        :return: Секунды Unix или None, если напоминаний нет
+        """
+        while self._heap and not self._is_current(self._heap[0]):
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float) -> List[dict]:
+        """
+        Извлекает все напоминания, срок которых наступил.
+
+        :param now: Текущее время (секунды Unix)
+        :type now: float
+        :return: Напоминания в порядке срабатывания
+        :rtype: List[dict]
+        """
+        due = []
+        while True:
+            fire_at = self.next_fire_time()
+            if fire_at is None or fire_at > now:
+                return due
+            _, _, reminder_id = heapq.heappop(self._heap)
+            due.append(self._pending.pop(reminder_id)[2])
+
+    async def run(self):
+        """Доставляет напоминания по мере наступления их сроков."""
+        while True:
+            try:
+                self._wakeup.clear()
+                for reminder in self.pop_due(self.clock()):
+                    task = asyncio.create_task(self._deliver(reminder))
+                    self._deliveries.add(task)
+                    task.add_done_callback(self._deliveries.discard)
+
+                fire_at = self.next_fire_time()
+                timeout = None if fire_at is None else max(fire_at - self.clock(), 0)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Ошибка планировщика напоминаний: {e}")
+                await asyncio.sleep(1)
+
+    async def _deliver(self, reminder: dict):
+        try:
+            await self.deliver(reminder)
+        except Exception as e:
+            self.logger.error(f"Ошибка доставки напоминания {reminder.get('id')}: {e}")
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def __contains__(self, reminder_id: Any) -> bool:
+        return reminder_id in self._pending
@@ -0,0 +1,149 @@
+import logging
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from src.storage import Storage, get_storage
+from src.utils.recurrence import DAILY, next_occurrence
+
+
+def new_reminder_id() -> str:
+    return uuid.uuid4().hex
+
+
+def ensure_unique_ids(reminders: List[dict]) -> bool:
+    """
+    Назначает новые ID напоминаниям без ID и с повторяющимися ID (старый формат len + 1).
+
+    :param reminders: Список напоминаний
+    :type reminders: List[dict]
+    :return: True, если ID были изменены
+    :rtype: bool
+    """
+    seen = set()
+    changed = False
+    for reminder in reminders:
+        reminder_id = reminder.get('id')
+        if reminder_id is None or reminder_id in seen:
+            reminder['id'] = new_reminder_id()
+            changed = True
+        seen.add(reminder['id'])
+    return changed
+
+
+def fire_timestamp(reminder: dict) -> float:
+    """
+    Возвращает время срабатывания напоминания в секундах Unix.
+
+    :param reminder: Напоминание
+    :type reminder: dict
+    """
+    return datetime.fromisoformat(reminder['time']).timestamp()
+
+
+def advance_recurring(reminder: dict, now: datetime) -> Optional[dict]:
+    """
+    Переносит повторяющееся напоминание на следующее срабатывание после now.
+
+    Серия остается одной записью: меняются только время и счетчик срабатываний.
+    Пропущенные срабатывания (например, пока бот был выключен) не повторяются.
+
+    :param reminder: Сработавшее напоминание
+    :type reminder: dict
+    :param now: Текущее время
+    :type now: datetime
+    :return: Напоминание с новым временем или None, если повторений больше нет
+    :rtype: dict | None
+    """
+    rule = reminder.get('recurrence')
+    if rule is None and reminder.get('type') == 'constant':
+        rule = DAILY
+    if rule is None:
+        return None
+
+    fired_at = datetime.fromisoformat(reminder['time'])
+    start = datetime.fromisoformat(reminder.get('start', reminder['time']))
+    occurrences = reminder.get('occurrences', 0) + 1
+    next_time = next_occurrence(rule, start, max(now, fired_at), occurrences)
+    if next_time is None:
+        return None
+    return dict(reminder, time=next_time.isoformat(), start=start.isoformat(), occurrences=occurrences)
+
+
+class ReminderStore:
+    """
+    Напоминания в памяти с поштучным сохранением изменений.
+
+    Каждое добавление, изменение и удаление записывается в хранилище
+    отдельной операцией над одним напоминанием, без перезаписи всего списка.
+    """
+
+    def __init__(self, storage: Optional[Storage] = None):
+        """
+        :param storage: Хранилище состояния (по умолчанию - общее из настроек)
+        :type storage: Storage
+        """
+        self.logger = logging.getLogger(__name__)
+        self.storage = storage or get_storage()
+        # ID -> напоминание
+        self.reminders: Dict[Any, dict] = {}
+
+    def load(self) -> List[dict]:
+        """
+        Загружает напоминания из хранилища.
+
+        :return: Список напоминаний
+        :rtype: List[dict]
+        """
+        reminders = self.storage.load_reminders()
+        # Повторяющиеся ID старого формата исправляются один раз, полной перезаписью
+        if ensure_unique_ids(reminders):
+            self.storage.save_reminders(reminders)
+            self.logger.info("ID напоминаний обновлены")
+        self.reminders = {reminder['id']: reminder for reminder in reminders}
+        return reminders
+
+    def add(self, reminder: dict) -> dict:
+        """
+        Сохраняет новое напоминание, назначая ему уникальный ID.
+
+        :param reminder: Напоминание без ID
+        :type reminder: dict
+        :return: Напоминание с ID
+        :rtype: dict
+        """
+        reminder = dict(reminder, id=new_reminder_id())
+        self.storage.upsert_reminder(reminder)
+        self.reminders[reminder['id']] = reminder
+        return reminder
+
+    def update(self, reminder: dict):
+        """
+        Сохраняет изменения напоминания.
+
+        :param reminder: Напоминание с ID
+        :type reminder: dict
+        """
+        self.storage.upsert_reminder(reminder)
+        self.reminders[reminder['id']] = reminder
+
+    def remove(self, reminder_id: Any) -> Optional[dict]:
+        """
+        Удаляет напоминание.
+
+        :param reminder_id: ID напоминания
+        :return: Удаленное напоминание или None
+        """
+        reminder = self.reminders.pop(reminder_id, None)
+        if reminder is not None:
+            self.storage.delete_reminder(reminder_id)
+        return reminder
+
+    def get(self, reminder_id: Any) -> Optional[dict]:
+        return self.reminders.get(reminder_id)
+
+    def __len__(self) -> int:
+        return len(self.reminders)
+
+    def __contains__(self, reminder_id: Any) -> bool:
+        return reminder_id in self.reminders
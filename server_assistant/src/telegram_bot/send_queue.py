@@ -0,0 +1,355 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from aiogram.exceptions import TelegramNetworkError, TelegramRetryAfter, TelegramServerError
+
+# Приоритеты отправки: ответы пользователю раньше массовых рассылок
+INTERACTIVE = 0
+BULK = 1
+
+
+class TokenBucket:
+    """
+    Ограничение частоты: rate токенов в секунду, не более capacity подряд.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        """
+        :param rate: Скорость пополнения (токенов в секунду)
+        :type rate: float
+        :param capacity: Емкость (допустимая серия без ожидания)
+        :type capacity: float
+        :param clock: Источник монотонного времени
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self) -> float:
+        """
+        Возвращает, сколько секунд ждать до появления токена (0 - токен есть).
+        """
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def time_to_full(self) -> float:
+        """
+        Возвращает, через сколько секунд корзина наполнится до capacity.
+        """
+        self._refill()
+        return (self.capacity - self.tokens) / self.rate
+
+    def consume(self):
+        self._refill()
+        self.tokens -= 1
+
+    def pause(self, delay: float):
+        """
+        Запрещает расход токенов на delay секунд (долг, который погашается пополнением).
+        """
+        self._refill()
+        self.tokens = min(self.tokens, 1 - delay * self.rate)
+
+
+class _Job:
+    __slots__ = ('call', 'chat_id', 'priority', 'seq', 'future', 'enqueued_at', 'attempts')
+
+    def __init__(self, call, chat_id, priority, seq, future, enqueued_at):
+        self.call = call
+        self.chat_id = chat_id
+        self.priority = priority
+        self.seq = seq
+        self.future = future
+        self.enqueued_at = enqueued_at
+        self.attempts = 0
+
+
+class SendQueue:
+    """
+    Общая очередь исходящих сообщений Telegram.
+
+    Отправка ограничена корзинами токенов: общей для бота и отдельной для
+    каждого чата. Сообщения одного чата уходят по порядку и по одному,
+    ответы пользователю обгоняют напоминания и другие массовые отправки.
+    При TelegramRetryAfter чат приостанавливается на указанное время и
+    сообщение отправляется повторно; при сетевых ошибках - с экспоненциальной
+    задержкой. Telegram не сообщает, относится ли ограничение к чату или ко
+    всему боту, поэтому если ограничение пришло сразу нескольким чатам (или
+    отправке без чата), на паузу ставится и общая корзина.
+    """
+
+    def __init__(
+        self,
+        global_rate: float = 30,
+        chat_rate: float = 1,
+        chat_burst: float = 3,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        metrics_interval: float = 60,
+        global_flood_chats: int = 2,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        :param global_rate: Сообщений в секунду на весь бот
+        :type global_rate: float
+        :param chat_rate: Сообщений в секунду в один чат
+        :type chat_rate: float
+        :param chat_burst: Сколько сообщений в чат можно отправить подряд без ожидания
+        :type chat_burst: float
+        :param max_retries: Максимальное количество повторных попыток
+        :type max_retries: int
+        :param backoff_base: Начальная задержка повтора при сетевой ошибке в секундах
+        :type backoff_base: float
+        :param metrics_interval: Интервал записи метрик в лог в секундах (0 - не писать)
+        :type metrics_interval: float
+        :param global_flood_chats: Со скольких чатов под RetryAfter одновременно ограничение считается общим
+        :type global_flood_chats: int
+        :param clock: Источник монотонного времени
+        """
+        self.logger = logging.getLogger(__name__)
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.metrics_interval = metrics_interval
+        self.global_flood_chats = global_flood_chats
+        self.clock = clock
+        self.global_bucket = TokenBucket(global_rate, global_rate, clock)
+
+        # Очереди чатов по приоритетам и ограничители чатов
+        self._chats: Dict[Any, Tuple[Deque[_Job], Deque[_Job]]] = {}
+        self._chat_buckets: Dict[Any, TokenBucket] = {}
+        # Куча (приоритет, номер, чат) - кандидаты на отправку; устаревшие записи пропускаются
+        self._ready: List[Tuple[int, int, Any]] = []
+        # Чаты с сообщением в отправке или на паузе
+        self._blocked: Set[Any] = set()
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._tasks: Set[asyncio.Task] = set()
+        # Куча (момент наполнения, номер, чат) - корзины простаивающих чатов, которые можно удалить
+        self._idle_buckets: List[Tuple[float, int, Any]] = []
+        # Чат -> момент окончания его RetryAfter
+        self._flood_until: Dict[Any, float] = {}
+
+        self._sent = 0
+        self._failed = 0
+        self._retries = 0
+        self._latencies: Deque[float] = deque(maxlen=1000)
+
+    async def send(self, call: Callable[[], Awaitable[Any]], chat_id: Any, priority: int = INTERACTIVE) -> Any:
+        """
+        Ставит отправку в очередь и ждет ее результата.
+
+        :param call: Функция без аргументов, создающая корутину отправки (вызывается заново при повторе)
+        :type call: Callable[[], Awaitable]
+        :param chat_id: ID чата получателя
+        :param priority: INTERACTIVE или BULK
+        :type priority: int
+        :return: Результат отправки (например, отправленное сообщение)
+        """
+        future = asyncio.get_running_loop().create_future()
+        job = _Job(call, chat_id, priority, next(self._counter), future, self.clock())
+        queues = self._chats.get(chat_id)
+        if queues is None:
+            queues = self._chats[chat_id] = (deque(), deque())
+        queues[priority].append(job)
+        self._push_ready(chat_id)
+        return await future
+
+    def _head(self, chat_id: Any) -> Optional[_Job]:
+        queues = self._chats.get(chat_id)
+        if queues is None:
+            return None
+        for queue in queues:
+            if queue:
+                return queue[0]
+        return None
+
+    def _push_ready(self, chat_id: Any):
+        if chat_id in self._blocked:
+            return
+        head = self._head(chat_id)
+        if head is not None:
+            heapq.heappush(self._ready, (head.priority, head.seq, chat_id))
+            self._wakeup.set()
+
+    def _unblock(self, chat_id: Any):
+        self._blocked.discard(chat_id)
+        self._push_ready(chat_id)
+
+    def _pause_chat(self, chat_id: Any, delay: float):
+        self._blocked.add(chat_id)
+        asyncio.get_running_loop().call_later(delay, self._unblock, chat_id)
+
+    def _chat_bucket(self, chat_id: Any) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = self._chat_buckets[chat_id] = TokenBucket(self.chat_rate, self.chat_burst, self.clock)
+        return bucket
+
+    async def run(self):
+        """Отправляет сообщения из очереди с соблюдением ограничений."""
+        # Метрики пишутся по своему таймеру: и когда очередь простаивает, и когда она ждет RetryAfter
+        metrics_task = asyncio.create_task(self._log_metrics()) if self.metrics_interval else None
+        try:
+            await self._dispatch()
+        finally:
+            if metrics_task is not None:
+                metrics_task.cancel()
+
+    async def _dispatch(self):
+        while True:
+            try:
+                self._wakeup.clear()
+                if not self._ready:
+                    await self._wakeup.wait()
+                    continue
+
+                priority, seq, chat_id = heapq.heappop(self._ready)
+                head = self._head(chat_id)
+                # Запись устарела: чат занят, пуст или голова очереди уже другая
+                if chat_id in self._blocked or head is None or head.seq != seq:
+                    continue
+
+                chat_wait = self._chat_bucket(chat_id).wait_time()
+                if chat_wait > 0:
+                    self._pause_chat(chat_id, chat_wait)
+                    continue
+
+                global_wait = self.global_bucket.wait_time()
+                if global_wait > 0:
+                    heapq.heappush(self._ready, (priority, seq, chat_id))
+                    await asyncio.sleep(global_wait)
+                    continue
+
+                self._chats[chat_id][head.priority].popleft()
+                self._chat_bucket(chat_id).consume()
+                self.global_bucket.consume()
+                self._blocked.add(chat_id)
+                task = asyncio.create_task(self._deliver(head))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Ошибка очереди отправки: {e}")
+
+    async def _deliver(self, job: _Job):
+        """
+        Выполняет одну отправку; при ограничении или сетевой ошибке возвращает сообщение в начало очереди чата.
+        """
+        delay = 0.0
+        try:
+            result = await job.call()
+        except TelegramRetryAfter as e:
+            delay = float(e.retry_after)
+            self.logger.warning(f"Лимит Telegram для чата {job.chat_id}: повтор через {delay} с")
+            self._note_flood(job.chat_id, delay)
+            self._retry_or_fail(job, e)
+        except (TelegramNetworkError, TelegramServerError) as e:
+            delay = self.backoff_base * 2 ** job.attempts
+            self.logger.warning(f"Ошибка сети при отправке в чат {job.chat_id}: повтор через {delay} с")
+            self._retry_or_fail(job, e)
+        except Exception as e:
+            self._fail(job, e)
+        else:
+            self._sent += 1
+            self._latencies.append(self.clock() - job.enqueued_at)
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            if delay > 0:
+                self._pause_chat(job.chat_id, delay)
+            else:
+                self._unblock(job.chat_id)
+            self._forget_idle_chat(job.chat_id)
+
+    def _note_flood(self, chat_id: Any, delay: float):
+        """
+        Запоминает RetryAfter чата и ставит на паузу общую корзину, если ограничение похоже на общее для бота.
+        """
+        now = self.clock()
+        self._flood_until = {chat: until for chat, until in self._flood_until.items() if until > now}
+        self._flood_until[chat_id] = max(self._flood_until.get(chat_id, 0.0), now + delay)
+        if chat_id is None or len(self._flood_until) >= self.global_flood_chats:
+            global_delay = max(self._flood_until.values()) - now
+            self.logger.warning(f"Общее ограничение Telegram: все отправки приостановлены на {global_delay:.1f} с")
+            self.global_bucket.pause(global_delay)
+
+    def _retry_or_fail(self, job: _Job, error: Exception):
+        job.attempts += 1
+        if job.attempts > self.max_retries:
+            self._fail(job, error)
+            return
+        self._retries += 1
+        self._chats[job.chat_id][job.priority].appendleft(job)
+
+    def _fail(self, job: _Job, error: Exception):
+        self._failed += 1
+        self.logger.error(f"Не удалось отправить сообщение в чат {job.chat_id}: {error}")
+        if not job.future.done():
+            job.future.set_exception(error)
+
+    def _forget_idle_chat(self, chat_id: Any):
+        """
+        Удаляет пустые очереди чата, чтобы память не росла с числом чатов.
+        Корзина чата удаляется, когда снова наполнится: новая создается полной,
+        поэтому удалять ее раньше значило бы разрешить лишнюю серию отправок.
+        """
+        if chat_id not in self._blocked and self._head(chat_id) is None:
+            self._chats.pop(chat_id, None)
+            bucket = self._chat_buckets.get(chat_id)
+            if bucket is not None:
+                heapq.heappush(self._idle_buckets, (self.clock() + bucket.time_to_full(), next(self._counter), chat_id))
+        self._drop_refilled_buckets()
+
+    def _drop_refilled_buckets(self):
+        now = self.clock()
+        while self._idle_buckets and self._idle_buckets[0][0] <= now:
+            _, _, chat_id = heapq.heappop(self._idle_buckets)
+            # Чат снова активен: запись устарела, корзина попадет в кучу, когда чат опустеет
+            if chat_id in self._chats or chat_id in self._blocked:
+                continue
+            bucket = self._chat_buckets.get(chat_id)
+            if bucket is not None and bucket.time_to_full() <= 0:
+                del self._chat_buckets[chat_id]
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Возвращает метрики очереди.
+
+        :return: Глубина очереди по приоритетам, отправки в процессе, счетчики и задержка отправки (с)
+        :rtype: dict
+        """
+        interactive = sum(len(queues[INTERACTIVE]) for queues in self._chats.values())
+        bulk = sum(len(queues[BULK]) for queues in self._chats.values())
+        latencies = sorted(self._latencies)
+        return {
+            'queue_depth': interactive + bulk,
+            'queue_interactive': interactive,
+            'queue_bulk': bulk,
+            'in_flight': len(self._tasks),
+            'sent': self._sent,
+            'failed': self._failed,
+            'retries': self._retries,
+            'latency_mean': sum(latencies) / len(latencies) if latencies else 0.0,
+            'latency_p95': latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0,
+        }
+
+    async def _log_metrics(self):
+        while True:
+            await asyncio.sleep(self.metrics_interval)
+            self._drop_refilled_buckets()
+            self.logger.info(f"Очередь отправки: {self.metrics()}")
@@ -0,0 +1,241 @@
+import calendar
+import logging
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+# Правило повторения - словарь, сохраняемый в напоминании как есть:
+# {'freq': 'DAILY' | 'WEEKLY' | 'MONTHLY' | 'YEARLY', 'interval': 1,
+#  'byweekday': [0..6] (0 - понедельник), 'bymonthday': 1..31 или -1 (последний день),
+#  'bynweekday': [[день недели, номер в месяце], ...] - только для MONTHLY, например [[0, 1]] - первый понедельник,
+#  [[4, -1]] - последняя пятница, 'until': ISO-время окончания, 'count': количество повторений}
+FREQUENCIES = ('DAILY', 'WEEKLY', 'MONTHLY', 'YEARLY')
+
+PRESETS: Dict[str, Dict[str, Any]] = {
+    'daily': {'freq': 'DAILY'},
+    'weekdays': {'freq': 'WEEKLY', 'byweekday': [0, 1, 2, 3, 4]},
+    'weekends': {'freq': 'WEEKLY', 'byweekday': [5, 6]},
+    'weekly': {'freq': 'WEEKLY'},
+    'monthly': {'freq': 'MONTHLY'},
+    'yearly': {'freq': 'YEARLY'},
+}
+
+# Старые постоянные напоминания ('constant') повторяются ежедневно
+DAILY = PRESETS['daily']
+
+_RRULE_WEEKDAYS = {'MO': 0, 'TU': 1, 'WE': 2, 'TH': 3, 'FR': 4, 'SA': 5, 'SU': 6}
+# Элемент BYDAY: необязательный номер в месяце и день недели ("MO", "1MO", "-1FR")
+_BYDAY_RE = re.compile(r'^([+-]?\d{1,2})?(MO|TU|WE|TH|FR|SA|SU)$')
+
+logger = logging.getLogger(__name__)
+
+# Предел перебора периодов при поиске следующего срабатывания
+_MAX_PERIODS = 1000
+
+
+def parse_recurrence(value: Any) -> Optional[Dict[str, Any]]:
+    """
+    Разбирает правило повторения: имя шаблона ('daily', 'weekdays', 'weekly', 'monthly', ...),
+    строку RRULE ("FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,FR") или готовый словарь.
+
+    :param value: Описание правила (None или пустая строка - без повторения)
+    :return: Нормализованное правило или None
+    :rtype: dict | None
+    :raises ValueError: Если правило не распознано
+    """
+    if value is None or value == '' or value is False:
+        return None
+    if isinstance(value, dict):
+        rule = dict(value)
+    elif isinstance(value, str):
+        text = value.strip()
+        if text.lower() in PRESETS:
+            rule = dict(PRESETS[text.lower()])
+        elif text.lower() in ('none', 'null', 'no', 'once', 'one-time'):
+            return None
+        else:
+            rule = _parse_rrule(text)
+    else:
+        raise ValueError(f"Неизвестное правило повторения: {value!r}")
+    return _normalize(rule)
+
+
+def _parse_rrule(text: str) -> Dict[str, Any]:
+    if text.upper().startswith('RRULE:'):
+        text = text[len('RRULE:'):]
+    rule: Dict[str, Any] = {}
+    for part in filter(None, text.split(';')):
+        if '=' not in part:
+            raise ValueError(f"Некорректная часть RRULE: {part}")
+        key, value = part.split('=', 1)
+        key = key.strip().upper()
+        value = value.strip()
+        if key == 'FREQ':
+            rule['freq'] = value.upper()
+        elif key == 'INTERVAL':
+            rule['interval'] = int(value)
+        elif key == 'BYDAY':
+            for day in value.split(','):
+                match = _BYDAY_RE.match(day.strip().upper())
+                if not match:
+                    raise ValueError(f"Некорректный день BYDAY: {day}")
+                ordinal, weekday = match.groups()
+                if ordinal:
+                    rule.setdefault('bynweekday', []).append([_RRULE_WEEKDAYS[weekday], int(ordinal)])
+                else:
+                    rule.setdefault('byweekday', []).append(_RRULE_WEEKDAYS[weekday])
+        elif key == 'BYMONTHDAY':
+            rule['bymonthday'] = int(value)
+        elif key == 'COUNT':
+            rule['count'] = int(value)
+        elif key == 'UNTIL':
+            rule['until'] = _parse_until(value)
+        else:
+            # Время суток задает первое срабатывание, поэтому BYHOUR, WKST и т.п. не меняют серию
+            logger.warning(f"Часть RRULE {key} не поддерживается и пропущена: {text}")
+    return rule
+
+
+def _parse_until(value: str) -> str:
+    value = value.rstrip('Z')
+    for fmt in ('%Y%m%dT%H%M%S', '%Y%m%d'):
+        try:
+            return datetime.strptime(value, fmt).isoformat()
+        except ValueError:
+            pass
+    return datetime.fromisoformat(value).isoformat()
+
+
+def _normalize(rule: Dict[str, Any]) -> Dict[str, Any]:
+    freq = str(rule.get('freq', '')).upper()
+    if freq not in FREQUENCIES:
+        raise ValueError(f"Неизвестная частота повторения: {rule.get('freq')!r}")
+    normalized: Dict[str, Any] = {'freq': freq, 'interval': int(rule.get('interval') or 1)}
+    if normalized['interval'] < 1:
+        raise ValueError("Интервал повторения должен быть положительным")
+    if rule.get('byweekday'):
+        weekdays = sorted({int(day) for day in rule['byweekday']})
+        if any(day < 0 or day > 6 for day in weekdays):
+            raise ValueError(f"Некорректные дни недели: {rule['byweekday']}")
+        normalized['byweekday'] = weekdays
+    if rule.get('bynweekday'):
+        if freq != 'MONTHLY':
+            raise ValueError("Номер дня недели в BYDAY (например, 1MO) поддерживается только для FREQ=MONTHLY")
+        nweekdays = sorted({(int(day), int(ordinal)) for day, ordinal in rule['bynweekday']})
+        if any(day < 0 or day > 6 or ordinal == 0 or abs(ordinal) > 5 for day, ordinal in nweekdays):
+            raise ValueError(f"Некорректные дни BYDAY: {rule['bynweekday']}")
+        normalized['bynweekday'] = [list(item) for item in nweekdays]
+    if rule.get('bymonthday'):
+        normalized['bymonthday'] = int(rule['bymonthday'])
+    if rule.get('until'):
+        normalized['until'] = datetime.fromisoformat(rule['until']).isoformat()
+    if rule.get('count'):
+        normalized['count'] = int(rule['count'])
+    return normalized
+
+
+def next_occurrence(rule: Dict[str, Any], start: datetime, after: datetime, occurrences: int = 0) -> Optional[datetime]:
+    """
+    Вычисляет ближайшее срабатывание серии строго после after.
+
+    Серия хранит только правило и время первого срабатывания, поэтому
+    следующие срабатывания не сохраняются заранее, а вычисляются по требованию.
+
+    :param rule: Нормализованное правило повторения
+    :type rule: dict
+    :param start: Время первого срабатывания серии (задает время суток и опорную дату)
+    :type start: datetime
+    :param after: Момент, после которого ищется срабатывание
+    :type after: datetime
+    :param occurrences: Сколько срабатываний серии уже было (для ограничения count)
+    :type occurrences: int
+    :return: Время следующего срабатывания или None, если серия закончилась
+    :rtype: datetime | None
+    """
+    if rule.get('count') and occurrences >= rule['count']:
+        return None
+
+    freq = rule['freq']
+    interval = rule.get('interval', 1)
+    if freq == 'DAILY':
+        candidate = _next_daily(start, after, interval)
+    elif freq == 'WEEKLY':
+        candidate = _next_weekly(start, after, interval, rule.get('byweekday') or [start.weekday()])
+    elif freq == 'MONTHLY':
+        candidate = _next_monthly(
+            start, after, interval, rule.get('bymonthday'), rule.get('byweekday'), rule.get('bynweekday')
+        )
+    else:
+        candidate = _next_monthly(start, after, interval * 12, rule.get('bymonthday'))
+
+    if candidate is None:
+        return None
+    if rule.get('until') and candidate > datetime.fromisoformat(rule['until']):
+        return None
+    return candidate
+
+
+def _next_daily(start: datetime, after: datetime, interval: int) -> datetime:
+    if after < start:
+        return start
+    step = timedelta(days=interval)
+    periods = (after - start) // step + 1
+    return start + step * periods
+
+
+def _next_weekly(start: datetime, after: datetime, interval: int, weekdays) -> Optional[datetime]:
+    # Понедельник недели первого срабатывания, время суток - как у первого срабатывания
+    week_start = start - timedelta(days=start.weekday())
+    reference = max(after, start)
+    weeks = max((reference - week_start).days // 7, 0)
+    week = weeks - weeks % interval
+    for _ in range(_MAX_PERIODS):
+        for weekday in weekdays:
+            candidate = week_start + timedelta(weeks=week, days=weekday)
+            if candidate >= start and candidate > after:
+                return candidate
+        week += interval
+    return None
+
+
+def _next_monthly(
+    start: datetime,
+    after: datetime,
+    interval: int,
+    month_day: Optional[int],
+    weekdays: Optional[List[int]] = None,
+    nweekdays: Optional[List[List[int]]] = None
+) -> Optional[datetime]:
+    reference = max(after, start)
+    months = max((reference.year - start.year) * 12 + reference.month - start.month, 0)
+    month = months - months % interval
+    for _ in range(_MAX_PERIODS):
+        year, month_index = divmod(start.month - 1 + month, 12)
+        year += start.year
+        for day in _month_days(year, month_index + 1, month_day or start.day, weekdays, nweekdays, month_day):
+            candidate = start.replace(year=year, month=month_index + 1, day=day)
+            if candidate >= start and candidate > after:
+                return candidate
+        month += interval
+    return None
+
+
+def _month_days(year, month, month_day, weekdays, nweekdays, explicit_month_day) -> List[int]:
+    """Дни месяца, подходящие под правило, по возрастанию."""
+    days_in_month = calendar.monthrange(year, month)[1]
+    if not weekdays and not nweekdays:
+        # Отрицательный день считается с конца месяца; 31 число в коротком месяце - последний день
+        day = days_in_month + month_day + 1 if month_day < 0 else month_day
+        return [min(max(day, 1), days_in_month)]
+
+    days = {day for day in range(1, days_in_month + 1) if calendar.weekday(year, month, day) in (weekdays or [])}
+    for weekday, ordinal in nweekdays or []:
+        matching = [day for day in range(1, days_in_month + 1) if calendar.weekday(year, month, day) == weekday]
+        # Пятого понедельника в месяце может не быть - такой месяц пропускается
+        if ordinal <= len(matching) and -ordinal <= len(matching):
+            days.add(matching[ordinal - 1] if ordinal > 0 else matching[ordinal])
+    if explicit_month_day:
+        # BYMONTHDAY вместе с BYDAY - пересечение, например пятница 13-е
+        day = days_in_month + explicit_month_day + 1 if explicit_month_day < 0 else explicit_month_day
+        days &= {day}
+    return sorted(days)
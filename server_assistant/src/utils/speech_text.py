@@ -0,0 +1,233 @@
+import re
+from typing import List
+
+_UNITS = ['', 'один', 'два', 'три', 'четыре', 'пять', 'шесть', 'семь', 'восемь', 'девять']
+_UNITS_FEMININE = ['', 'одна', 'две'] + _UNITS[3:]
+_TEENS = [
+    'десять', 'одиннадцать', 'двенадцать', 'тринадцать', 'четырнадцать',
+    'пятнадцать', 'шестнадцать', 'семнадцать', 'восемнадцать', 'девятнадцать'
+]
+_TENS = ['', '', 'двадцать', 'тридцать', 'сорок', 'пятьдесят', 'шестьдесят', 'семьдесят', 'восемьдесят', 'девяносто']
+_HUNDREDS = ['', 'сто', 'двести', 'триста', 'четыреста', 'пятьсот', 'шестьсот', 'семьсот', 'восемьсот', 'девятьсот']
+# Разряды: формы для 1, 2-4, 5+ и женский ли род
+_SCALES = [
+    (('тысяча', 'тысячи', 'тысяч'), True),
+    (('миллион', 'миллиона', 'миллионов'), False),
+    (('миллиард', 'миллиарда', 'миллиардов'), False),
+]
+
+# Основы порядковых числительных: единицы, 10-19, десятки, сотни, круглые тысячи
+_ORDINAL_UNITS = ['', 'перв', 'втор', 'трет', 'четверт', 'пят', 'шест', 'седьм', 'восьм', 'девят']
+_ORDINAL_TEENS = [
+    'десят', 'одиннадцат', 'двенадцат', 'тринадцат', 'четырнадцат',
+    'пятнадцат', 'шестнадцат', 'семнадцат', 'восемнадцат', 'девятнадцат'
+]
+_ORDINAL_TENS = ['', '', 'двадцат', 'тридцат', 'сороков', 'пятидесят', 'шестидесят', 'семидесят', 'восьмидесят', 'девяност']
+_ORDINAL_HUNDREDS = ['', 'сот', 'двухсот', 'трехсот', 'четырехсот', 'пятисот', 'шестисот', 'семисот', 'восьмисот', 'девятисот']
+_ORDINAL_THOUSANDS = ['', 'тысячн', 'двухтысячн', 'трехтысячн']
+_MONTHS_GENITIVE = [
+    'января', 'февраля', 'марта', 'апреля', 'мая', 'июня',
+    'июля', 'августа', 'сентября', 'октября', 'ноября', 'декабря'
+]
+
+_TIME_RE = re.compile(r'\b([01]?\d|2[0-3]):([0-5]\d)\b')
+# 17.10.2026 и 17.10; без года день и месяц - по две цифры, чтобы не путать с дробями
+_DATE_RE = re.compile(r'(?<![\w.,])(?:(\d{1,2})\.(\d{1,2})\.(\d{4})|(\d{2})\.(\d{2}))(?![\w]|[.,]\d)')
+# Номера версий и разделов: 3.11.2
+_DOTTED_RE = re.compile(r'(?<![\w.,])\d+(?:\.\d+){2,}(?![\w]|[.,]\d)')
+# Разряды через пробел, в том числе неразрывный и узкий: 1 500, 2 000 000
+_GROUPED_RE = re.compile(r'(?<![\w.,])\d{1,3}(?:[ \u00a0\u2009\u202f]\d{3})+(?!\w)')
+_NUMBER_RE = re.compile(r'(?<![\w.,])(-?)(\d+)(?:[.,](\d+))?(\s*%)?(?![\w])')
+_MARKUP_RE = re.compile(r'[*_`#>~|]+')
+_URL_RE = re.compile(r'https?://\S+')
+_SPACES_RE = re.compile(r'\s+')
+_SENTENCE_RE = re.compile(r'(?<=[.!?…])\s+')
+
+
+def plural_form(number: int, forms) -> str:
+    """
+    Выбирает форму слова для числа: (1, 2-4, 5+), например ('тысяча', 'тысячи', 'тысяч').
+    """
+    number = abs(number) % 100
+    if 11 <= number <= 19:
+        return forms[2]
+    if number % 10 == 1:
+        return forms[0]
+    if 2 <= number % 10 <= 4:
+        return forms[1]
+    return forms[2]
+
+
+def _triplet_to_words(number: int, feminine: bool = False) -> List[str]:
+    words = [_HUNDREDS[number // 100]]
+    rest = number % 100
+    if 10 <= rest <= 19:
+        words.append(_TEENS[rest - 10])
+    else:
+        words.append(_TENS[rest // 10])
+        words.append((_UNITS_FEMININE if feminine else _UNITS)[rest % 10])
+    return [word for word in words if word]
+
+
+def number_to_words(number: int, feminine: bool = False) -> str:
+    """
+    Записывает целое число словами (количественное, именительный падеж).
+
+    :param number: Число
+    :type number: int
+    :param feminine: Женский род последнего разряда ("одна", "две")
+    :type feminine: bool
+    :return: Число словами, например "двадцать одна тысяча сто пять"
+    :rtype: str
+    """
+    if number == 0:
+        return 'ноль'
+    if number < 0:
+        return 'минус ' + number_to_words(-number, feminine)
+    if number >= 10 ** 12:
+        # Триллион и больше (номера, коды) - по одной цифре
+        return ' '.join(_UNITS[int(digit)] or 'ноль' for digit in str(number))
+
+    words = _triplet_to_words(number % 1000, feminine)
+    number //= 1000
+    for forms, scale_feminine in _SCALES:
+        if number == 0:
+            break
+        triplet = number % 1000
+        if triplet:
+            words = _triplet_to_words(triplet, scale_feminine) + [plural_form(triplet, forms)] + words
+        number //= 1000
+    return ' '.join(words)
+
+
+def ordinal_to_words(number: int, genitive: bool = False) -> str:
+    """
+    Записывает порядковое числительное среднего рода словами.
+
+    :param number: Число от 1 до 3999
+    :type number: int
+    :param genitive: Родительный падеж ("шестого") вместо именительного ("шестое")
+    :type genitive: bool
+    :return: Числительное словами, например "две тысячи двадцать шестого"
+    :rtype: str
+    """
+    rest = number % 100
+    if number % 1000 == 0:
+        stem, prefix = _ORDINAL_THOUSANDS[number // 1000], 0
+    elif rest == 0:
+        stem, prefix = _ORDINAL_HUNDREDS[number % 1000 // 100], number - number % 1000
+    elif 10 <= rest <= 19:
+        stem, prefix = _ORDINAL_TEENS[rest - 10], number - rest
+    elif rest % 10 == 0:
+        stem, prefix = _ORDINAL_TENS[rest // 10], number - rest
+    else:
+        stem, prefix = _ORDINAL_UNITS[rest % 10], number - rest % 10
+    if stem == 'трет':
+        ending = 'ьего' if genitive else 'ье'
+    else:
+        ending = 'ого' if genitive else 'ое'
+    words = stem + ending
+    return f'{number_to_words(prefix)} {words}' if prefix else words
+
+
+def _date_match_to_words(match: re.Match) -> str:
+    day, month, year = match.group(1, 2, 3) if match.group(1) else (match.group(4), match.group(5), None)
+    day, month = int(day), int(month)
+    if not (1 <= day <= 31 and 1 <= month <= 12) or (year and not 1000 <= int(year) <= 3999):
+        # Не дата: дальше читается как дробь или номер
+        return match.group()
+    words = f'{ordinal_to_words(day)} {_MONTHS_GENITIVE[month - 1]}'
+    if year:
+        words += f' {ordinal_to_words(int(year), genitive=True)} года'
+    return words
+
+
+def _dotted_match_to_words(match: re.Match) -> str:
+    return ' точка '.join(number_to_words(int(part)) for part in match.group().split('.'))
+
+
+def _number_match_to_words(match: re.Match) -> str:
+    sign, integer, fraction, percent = match.groups()
+    words = number_to_words(int(integer))
+    if fraction:
+        # Дробная часть читается после "запятая" с ведущими нулями: 3,05 -> "три запятая ноль пять"
+        significant = fraction.lstrip('0')
+        fraction_words = ['ноль'] * (len(fraction) - len(significant))
+        if significant:
+            fraction_words.append(number_to_words(int(significant)))
+        words += ' запятая ' + ' '.join(fraction_words)
+    if sign:
+        words = 'минус ' + words
+    if percent:
+        words += ' ' + ('процента' if fraction else plural_form(int(integer), ('процент', 'процента', 'процентов')))
+    return words
+
+
+def normalize_for_speech(text: str) -> str:
+    """
+    Готовит текст к синтезу речи: убирает разметку и ссылки,
+    записывает время, даты и числа словами.
+
+    :param text: Текст ответа
+    :type text: str
+    :return: Текст для синтезатора
+    :rtype: str
+    """
+    text = _URL_RE.sub('ссылка', text)
+    text = _MARKUP_RE.sub(' ', text)
+    text = _TIME_RE.sub(lambda match: f"{number_to_words(int(match.group(1)))} {_minutes_to_words(match.group(2))}", text)
+    text = _DATE_RE.sub(_date_match_to_words, text)
+    text = _DOTTED_RE.sub(_dotted_match_to_words, text)
+    text = _GROUPED_RE.sub(lambda match: re.sub(r'\D', '', match.group()), text)
+    text = _NUMBER_RE.sub(_number_match_to_words, text)
+    return _SPACES_RE.sub(' ', text).strip()
+
+
+def _minutes_to_words(minutes: str) -> str:
+    if minutes == '00':
+        return 'ноль ноль'
+    if minutes.startswith('0'):
+        return 'ноль ' + number_to_words(int(minutes))
+    return number_to_words(int(minutes))
+
+
+def split_sentences(text: str, max_chars: int = 400) -> List[str]:
+    """
+    Делит текст на фрагменты из целых предложений не длиннее max_chars.
+    Предложение длиннее max_chars делится по словам.
+
+    :param text: Текст
+    :type text: str
+    :param max_chars: Максимальная длина фрагмента
+    :type max_chars: int
+    :return: Фрагменты по порядку
+    :rtype: List[str]
+    """
+    chunks: List[str] = []
+    current = ''
+    for sentence in _SENTENCE_RE.split(text.strip()):
+        for piece in _split_long(sentence, max_chars):
+            if current and len(current) + 1 + len(piece) > max_chars:
+                chunks.append(current)
+                current = piece
+            else:
+                current = f'{current} {piece}' if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _split_long(sentence: str, max_chars: int) -> List[str]:
+    if len(sentence) <= max_chars:
+        return [sentence] if sentence else []
+    pieces: List[str] = []
+    current = ''
+    for word in sentence.split():
+        if current and len(current) + 1 + len(word) > max_chars:
+            pieces.append(current)
+            current = word
+        else:
+            current = f'{current} {word}' if current else word
+    if current:
+        pieces.append(current)
+    return pieces
@@ -0,0 +1,34 @@
+import re
+from typing import List
+
+_NON_WORD_RE = re.compile(r'[^\w\s]+')
+_SPACES_RE = re.compile(r'\s+')
+
+
+def normalize_text(text: str) -> str:
+    """
+    Приводит текст к нормализованному виду для правил и классификаторов:
+    нижний регистр, "ё" -> "е", без пунктуации и лишних пробелов.
+
+    :param text: Исходный текст
+    :type text: str
+    :return: Нормализованный текст
+    :rtype: str
+    """
+    if not text:
+        return ''
+    text = text.lower().replace('ё', 'е')
+    text = _NON_WORD_RE.sub(' ', text)
+    return _SPACES_RE.sub(' ', text).strip()
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Разбивает текст на нормализованные токены.
+
+    :param text: Исходный текст
+    :type text: str
+    :return: Список токенов
+    :rtype: List[str]
+    """
+    return normalize_text(text).split()
@@ -1,49 +1,64 @@
-import json
 import os
 
+from src.storage import JsonStorage, Storage, get_storage
+
+# Настройки, загруженные из хранилищ; общие для всех экземпляров UserPreferences,
+# чтобы сети разных чатов не перезаписывали изменения друг друга
+_PREFERENCES_CACHE = {}
+
+
 class UserPreferences:
     """
     Управляет пользовательскими настройками.
-    Сохраняет и загружает предпочтения пользователей из JSON файла.
+    Сохраняет и загружает предпочтения пользователей через хранилище состояния.
     """
 
-    def __init__(self, preferences_file='user_preferences.json'):
+    def __init__(self, preferences_file: str | None = None, storage: Storage | None = None):
         """
-        :param preferences_file: Путь к файлу с настройками пользователей
+        :param preferences_file: Путь к JSON файлу с настройками (если не задано хранилище)
+        :param storage: Хранилище состояния (по умолчанию - общее из настроек)
         """
-        self.preferences_file = preferences_file
-        self.preferences = self._load_preferences()
+        if storage is None:
+            if preferences_file is not None:
+                storage = JsonStorage(os.path.dirname(preferences_file) or '.', preferences_file)
+            else:
+                storage = get_storage()
+        self.storage = storage
+
+        cache_key = preferences_file or id(storage)
+        if cache_key not in _PREFERENCES_CACHE:
+            _PREFERENCES_CACHE[cache_key] = self._load_preferences()
+        self.preferences = _PREFERENCES_CACHE[cache_key]
 
     def _load_preferences(self):
         """
-        Загружает настройки пользователей из файла.
+        Загружает настройки пользователей из хранилища.
 
         :return: Словарь с настройками пользователей
         """
-        if os.path.exists(self.preferences_file):
-            try:
-                with open(self.preferences_file, 'r') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError):
-                return {}
-        return {}
+        try:
+            return self.storage.load_preferences()
+        except Exception:
+            return {}
 
-    def _save_preferences(self):
+    def _save_preferences(self, chat_id: int):
         """
-        Сохраняет текущие настройки пользователей в файл.
+        Сохраняет текущие настройки чата в хранилище.
+
+        :param chat_id: ID чата
         """
+        chat_id_str = str(chat_id)
         try:
-            with open(self.preferences_file, 'w') as f:
-                json.dump(self.preferences, f, indent=4)
-        except IOError:
-            print(f"Не удалось сохранить настройки в {self.preferences_file}")
+            self.storage.save_chat_preferences(chat_id_str, self.preferences.get(chat_id_str, {}), self.preferences)
+        except Exception:
+            print(f"Не удалось сохранить настройки чата {chat_id_str}")
 
-    def set_llm_model(self, chat_id: int, model: str):
+    def _chat_preferences(self, chat_id: int) -> dict:
         """
-        Устанавливает предпочитаемую модель для пользователя.
+        Возвращает словарь настроек чата, создавая его при необходимости.
 
         :param chat_id: ID чата
-        :param model: Название модели
+        :return: Словарь настроек чата
         """
         chat_id_str = str(chat_id)
         if chat_id_str not in self.preferences:
@@ -52,9 +67,18 @@ class UserPreferences:
         # Гарантируем, что значение - словарь
         if not isinstance(self.preferences[chat_id_str], dict):
             self.preferences[chat_id_str] = {}
-        
-        self.preferences[chat_id_str]['model'] = model
-        self._save_preferences()
+
+        return self.preferences[chat_id_str]
+
+    def set_llm_model(self, chat_id: int, model: str):
+        """
+        Устанавливает предпочитаемую модель для пользователя.
+
+        :param chat_id: ID чата
+        :param model: Название модели
+        """
+        self._chat_preferences(chat_id)['model'] = model
+        self._save_preferences(chat_id)
 
         
     def get_llm_model(self, chat_id: int, default: str = 'deepseek'):
@@ -74,3 +98,32 @@ class UserPreferences:
         
         return user_prefs.get('model', default)
 
+    def set_output_type(self, chat_id: int, output_type: str | None):
+        """
+        Устанавливает постоянный формат ответа для чата.
+
+        :param chat_id: ID чата
+        :param output_type: Имя типа вывода ('TEXT', 'AUDIO', 'MULTI') или None для сброса
+        """
+        chat_preferences = self._chat_preferences(chat_id)
+        if output_type is None:
+            if chat_preferences.pop('output_type', None) is None:
+                return
+        elif chat_preferences.get('output_type') == output_type:
+            return
+        else:
+            chat_preferences['output_type'] = output_type
+        self._save_preferences(chat_id)
+
+    def get_output_type(self, chat_id: int, default: str | None = None):
+        """
+        Возвращает постоянный формат ответа для чата.
+
+        :param chat_id: ID чата
+        :param default: Значение, если формат не задан
+        :return: Имя типа вывода или default
+        """
+        user_prefs = self.preferences.get(str(chat_id), {})
+        if not isinstance(user_prefs, dict):
+            return default
+        return user_prefs.get('output_type', default)
@@ -0,0 +1,47 @@
+import numpy as np
+import soundfile as sf
+
+from benchmark_asr import load_clips, word_edit_distance, word_error_rate
+
+
+def test_word_edit_distance():
+    assert word_edit_distance(['купи', 'хлеб'], ['купи', 'хлеб']) == 0
+    assert word_edit_distance(['купи', 'хлеб', 'завтра'], ['купи', 'хлеба']) == 2
+    assert word_edit_distance([], ['лишнее']) == 1
+
+
+def test_word_error_rate_ignores_case_and_punctuation():
+    references = ["Напомни мне купить хлеб.", "Какая погода в Москве?"]
+    hypotheses = ["напомни мне купить хлеб", "какая погода в москве завтра"]
+    assert word_error_rate(references, hypotheses) == 1 / 8
+
+
+def test_load_clips_pairs_audio_with_references(tmp_path):
+    sf.write(str(tmp_path / 'clip01.wav'), np.zeros(16000), 16000)
+    (tmp_path / 'clip01.txt').write_text("привет", encoding='utf-8')
+    sf.write(str(tmp_path / 'orphan.wav'), np.zeros(16000), 16000)
+
+    clips = load_clips(str(tmp_path))
+    assert [(name, reference) for name, _, reference in clips] == [('clip01.wav', "привет")]
+
+
+def test_benchmark_batching_reports_each_batch_size(monkeypatch):
+    import benchmark_asr
+    from src.audio_processing.base.asr_model import ASRModel
+
+    batches = []
+
+    class FakeASR(ASRModel):
+        def transcribe(self, audio):
+            return ''
+
+        def transcribe_batch(self, audios):
+            batches.append(len(audios))
+            return [''] * len(audios)
+
+    monkeypatch.setattr(benchmark_asr, '_create_model', lambda spec, language: FakeASR(language))
+    clips = [('clip.wav', np.zeros(16000, dtype=np.float32), 'текст')] * 3
+
+    throughput = benchmark_asr.benchmark_batching('fake:base', clips, [1, 4])
+    assert sorted(throughput) == [1, 4]
+    assert batches == [1, 1, 1, 1, 4]
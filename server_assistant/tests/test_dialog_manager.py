@@ -0,0 +1,82 @@
+from src.neural_networks.dialog_manager import DialogManager
+
+
+def make_manager(tmp_path, **kwargs):
+    return DialogManager(context_file=str(tmp_path / 'dialogue_context.json'), **kwargs)
+
+
+def test_context_keeps_newest_messages_within_budget(tmp_path):
+    manager = make_manager(tmp_path)
+    for index in range(10):
+        manager.add_message(f"сообщение номер {index} " * 20, role='user')
+
+    full = manager.get_context(max_tokens=10 ** 6)
+    per_message = manager.context['messages'][0]['tokens']
+    limited = manager.get_context(max_tokens=per_message * 3)
+
+    assert len(full) == 10
+    assert [msg['content'] for msg in limited] == [msg['content'] for msg in full[-3:]]
+    assert all('tokens' not in msg for msg in limited)
+
+
+def test_token_counts_are_persisted(tmp_path):
+    manager = make_manager(tmp_path)
+    manager.add_message("привет", role='user')
+
+    reloaded = make_manager(tmp_path)
+    assert reloaded.context['messages'][0]['tokens'] > 0
+
+
+def test_default_budget_is_enforced(tmp_path):
+    manager = make_manager(tmp_path, max_tokens=1)
+    manager.add_message("привет", role='user')
+
+    assert manager.get_context() == []
+
+
+def test_messages_are_appended_to_journal(tmp_path):
+    manager = make_manager(tmp_path)
+    manager.add_message("первое", role='user', task_type='SMALL_TALK')
+    manager.add_message("второе", role='assistant')
+
+    assert not (tmp_path / 'dialogue_context.json').exists()
+    assert len((tmp_path / 'dialogue_context.jsonl').read_text(encoding='utf-8').splitlines()) == 2
+
+    reloaded = make_manager(tmp_path)
+    assert [msg['content'] for msg in reloaded.context['messages']] == ["первое", "второе"]
+    assert [msg['content'] for msg in reloaded.context['task_types']['SMALL_TALK']] == ["первое"]
+
+
+def test_journal_is_compacted_into_snapshot(tmp_path):
+    manager = make_manager(tmp_path, compact_every=3)
+    for index in range(4):
+        manager.add_message(f"сообщение {index}", role='user')
+
+    assert (tmp_path / 'dialogue_context.json').exists()
+    assert len((tmp_path / 'dialogue_context.jsonl').read_text(encoding='utf-8').splitlines()) == 1
+    assert len(make_manager(tmp_path).context['messages']) == 4
+
+
+def test_records_already_in_snapshot_are_skipped(tmp_path):
+    manager = make_manager(tmp_path)
+    manager.add_message("первое", role='user')
+    journal = (tmp_path / 'dialogue_context.jsonl').read_text(encoding='utf-8')
+    manager.save_context()
+
+    # Сбой между записью снимка и очисткой журнала
+    (tmp_path / 'dialogue_context.jsonl').write_text(journal + '{"op": "add", "mess', encoding='utf-8')
+
+    assert len(make_manager(tmp_path).context['messages']) == 1
+
+
+def test_legacy_context_file_is_loaded(tmp_path):
+    import json
+
+    message = {'role': 'user', 'content': "старое", 'task_type': None, 'timestamp': 1.0}
+    legacy = {'messages': [message], 'task_types': {}}
+    (tmp_path / 'dialogue_context.json').write_text(json.dumps(legacy), encoding='utf-8')
+
+    manager = make_manager(tmp_path)
+    manager.add_message("новое", role='user')
+
+    assert [msg['content'] for msg in make_manager(tmp_path).context['messages']] == ["старое", "новое"]
@@ -0,0 +1,39 @@
+from src.neural_networks.dialog_manager import DialogManager
+from src.neural_networks.dialog_store import DialogStore
+
+
+def test_store_serves_context_from_memory(tmp_path):
+    store = DialogStore(context_dir=str(tmp_path))
+    manager = store.get(1)
+    manager.add_message("привет", role='user')
+
+    assert store.get(1) is manager
+    assert manager.dirty
+    assert not (tmp_path / 'dialogue_context_1.jsonl').exists()
+    assert [msg['content'] for msg in manager.get_context()] == ["привет"]
+
+
+def test_store_flushes_pending_messages_in_one_batch(tmp_path):
+    store = DialogStore(context_dir=str(tmp_path))
+    manager = store.get(1)
+    for index in range(3):
+        manager.add_message(f"сообщение {index}", role='user')
+
+    store.flush_all()
+
+    assert not manager.dirty
+    assert len((tmp_path / 'dialogue_context_1.jsonl').read_text(encoding='utf-8').splitlines()) == 3
+    reloaded = DialogManager(context_file=str(tmp_path / 'dialogue_context_1.json'))
+    assert len(reloaded.context['messages']) == 3
+
+
+def test_store_flushes_evicted_chats(tmp_path):
+    store = DialogStore(max_chats=1, context_dir=str(tmp_path))
+    first = store.get(1)
+    first.add_message("привет", role='user')
+
+    store.get(2)
+
+    assert 1 not in store
+    assert not first.dirty
+    assert (tmp_path / 'dialogue_context_1.jsonl').exists()
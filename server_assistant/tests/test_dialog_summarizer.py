@@ -0,0 +1,91 @@
+import asyncio
+
+from src.neural_networks import dialog_summarizer
+from src.neural_networks.dialog_manager import DialogManager
+from src.neural_networks.dialog_summarizer import DialogSummarizer
+
+
+class FakeProcessor:
+    def __init__(self):
+        self.prompts = []
+        self.system_messages = []
+
+    async def process_with_retry(self, prompt, system_message='', **kwargs):
+        self.prompts.append(prompt)
+        self.system_messages.append(system_message)
+        return "Пользователь обсуждал погоду."
+
+
+def test_old_history_is_replaced_by_summary(tmp_path):
+    manager = DialogManager(context_file=str(tmp_path / 'dialogue_context.json'), max_tokens=10 ** 6)
+    for index in range(10):
+        manager.add_message(f"сообщение {index} " * 10, role='user')
+    per_message = manager.context['messages'][0]['tokens']
+
+    processor = FakeProcessor()
+    summarizer = DialogSummarizer(processor, keep_tokens=per_message * 2, min_batch_tokens=per_message)
+
+    async def run():
+        summarizer.schedule(manager)
+        await asyncio.gather(*dialog_summarizer._background_tasks)
+
+    asyncio.run(run())
+
+    assert len(processor.prompts) == 1
+    assert "сообщение 0" in processor.prompts[0]
+    assert len(manager.context['messages']) == 2
+
+    context = DialogManager(context_file=manager.context_file, max_tokens=10 ** 6).get_context()
+    assert context[0]['role'] == 'system'
+    assert "Пользователь обсуждал погоду." in context[0]['content']
+    assert len(context) == 3
+
+
+def test_long_history_is_folded_in_capped_batches(tmp_path):
+    manager = DialogManager(context_file=str(tmp_path / 'dialogue_context.json'), max_tokens=10 ** 6)
+    for index in range(10):
+        manager.add_message(f"сообщение {index} " * 10, role='user')
+    per_message = manager.context['messages'][0]['tokens']
+
+    processor = FakeProcessor()
+    summarizer = DialogSummarizer(
+        processor, keep_tokens=per_message * 2, min_batch_tokens=per_message, max_batch_tokens=per_message * 3
+    )
+
+    async def run():
+        summarizer.schedule(manager)
+        await asyncio.gather(*dialog_summarizer._background_tasks)
+
+    asyncio.run(run())
+
+    # Восемь старых сообщений сжимаются тремя запросами: 3 + 3 + 2
+    assert [prompt.count('user: ') for prompt in processor.prompts] == [3, 3, 2]
+    assert "сообщение 0" in processor.prompts[0] and "сообщение 7" in processor.prompts[2]
+    # Каждая следующая порция объединяется с уже готовой сводкой
+    assert 'отсутствует' in processor.system_messages[0]
+    assert "Пользователь обсуждал погоду." in processor.system_messages[1]
+    assert len(manager.context['messages']) == 2
+
+
+def test_small_history_is_not_summarized(tmp_path):
+    manager = DialogManager(context_file=str(tmp_path / 'dialogue_context.json'))
+    manager.add_message("привет", role='user')
+
+    processor = FakeProcessor()
+    DialogSummarizer(processor).schedule(manager)
+
+    assert processor.prompts == []
+
+
+def test_summary_covers_history_beyond_smallest_budget(monkeypatch):
+    from config import _summary_keep_tokens, get_config
+
+    budgets = {'ROUTER': 1500, 'SMALL_TALK': 3000}
+    assert _summary_keep_tokens(None, 8000, budgets) == 1500
+    # Окно больше самого маленького бюджета оставило бы разрыв между сводкой и историей
+    assert _summary_keep_tokens('8000', 8000, budgets) == 1500
+    assert _summary_keep_tokens('1000', 8000, budgets) == 1000
+
+    monkeypatch.setenv('DIALOG_CONTEXT_BUDGETS', 'ROUTER=1200')
+    monkeypatch.setenv('DIALOG_SUMMARY_KEEP_TOKENS', '')
+    assert DialogSummarizer(FakeProcessor()).keep_tokens == get_config().dialog_context.summary_keep_tokens == 1200
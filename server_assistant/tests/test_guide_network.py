@@ -0,0 +1,56 @@
+import asyncio
+import logging
+
+from src.neural_networks.guide_network import GuideNetwork
+from src.neural_networks.router_network import OutputType, TaskType
+
+
+class FakeRouter:
+    def __init__(self, events):
+        self.events = events
+
+    async def classify(self, text):
+        self.events.append(('classify', text))
+        return TaskType.SMALL_TALK, OutputType.TEXT
+
+
+def make_network(events):
+    network = GuideNetwork.__new__(GuideNetwork)
+    network.logger = logging.getLogger(__name__)
+    network.router_network = FakeRouter(events)
+
+    async def route(task_type, message, transcribe=None):
+        events.append(('route', transcribe))
+        return f'ответ на: {transcribe}'
+
+    network._route_to_network = route
+    return network
+
+
+def test_classification_starts_with_first_chunk():
+    events = []
+
+    async def chunks():
+        for text in ['напомни завтра', 'купить хлеб']:
+            events.append(('chunk', text))
+            yield text
+            await asyncio.sleep(0.01)
+
+    network = make_network(events)
+    response, output_type, transcribe = asyncio.run(network.process_voice_stream(None, chunks()))
+
+    assert transcribe == 'напомни завтра купить хлеб'
+    assert response == 'ответ на: напомни завтра купить хлеб'
+    assert output_type == OutputType.TEXT
+    assert events.index(('classify', 'напомни завтра')) < events.index(('chunk', 'купить хлеб'))
+    assert events[-1] == ('route', 'напомни завтра купить хлеб')
+
+
+def test_empty_stream_returns_no_response():
+    async def chunks():
+        return
+        yield
+
+    response, _, transcribe = asyncio.run(make_network([]).process_voice_stream(None, chunks()))
+    assert response is None
+    assert transcribe == ''
@@ -0,0 +1,48 @@
+import pytest
+from src.neural_networks.guide_network_pool import GuideNetworkPool
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_pool_reuses_network_for_chat(clock):
+    created = []
+    pool = GuideNetworkPool(factory=lambda chat_id: created.append(chat_id) or object(), clock=clock)
+
+    first = pool.get(1)
+    assert pool.get(1) is first
+    assert created == [1]
+
+
+def test_pool_evicts_least_recently_used(clock):
+    pool = GuideNetworkPool(factory=lambda chat_id: object(), max_size=2, clock=clock)
+
+    pool.get(1)
+    pool.get(2)
+    pool.get(1)
+    pool.get(3)
+
+    assert 1 in pool
+    assert 2 not in pool
+    assert len(pool) == 2
+
+
+def test_pool_evicts_idle_networks(clock):
+    pool = GuideNetworkPool(factory=lambda chat_id: object(), idle_ttl=10, clock=clock)
+
+    old = pool.get(1)
+    clock.now = 11
+    pool.get(2)
+
+    assert 1 not in pool
+    assert pool.get(1) is not old
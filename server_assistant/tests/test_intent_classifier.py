@@ -0,0 +1,66 @@
+import pytest
+from src.neural_networks.intent_classifier import (
+    IntentClassifier, load_decisions, log_decision, log_decision_in_background, match_rules
+)
+
+
+@pytest.mark.parametrize("message, expected", [
+    ("Напомни сегодня в 16 часов встретить жену с салона", 'REMINDER'),
+    ("Бот, напомни завтра позвонить маме", 'REMINDER'),
+    ("Запомни, мне нравится шоколад Alpen Gold", 'ADD_MEMORY'),
+    ("Напомни мне, какой шоколад мне понравился?", 'RECALL_MEMORY'),
+    ("Покажи все заметки", 'VIEW_MEMORIES'),
+    ("Удали все заметки", 'DELETE_ALL_MEMORIES'),
+    ("Очисти память", 'DELETE_ALL_MEMORIES'),
+    ("Удали заметку о шоколаде", 'DELETE_MEMORY'),
+    ("Расскажи о философии искусственного интеллекта", None),
+    ("Напомни через 15 минут проверить духовку", 'REMINDER'),
+    ("Напомни в 10:30 про созвон", 'REMINDER'),
+    # "часть" и "часы" - не выражения времени
+    ("Напомни, какая часть отчета на мне", 'RECALL_MEMORY'),
+    ("Напомни, какие часы я хотел купить", 'RECALL_MEMORY'),
+    # Тема или несколько действий - решение за LLM с контекстом диалога
+    ("Покажи заметки про отпуск", None),
+    ("Удали все заметки про работу", None),
+    ("Удали из заметки про отпуск лишнее и добавь Рим", None),
+    ("Удали заметку о шоколаде и добавь новую про кофе", None),
+])
+def test_keyword_rules(message, expected):
+    assert match_rules(message) == expected
+
+
+def test_classifier_falls_back_without_model():
+    classifier = IntentClassifier()
+    assert classifier.predict("Как дела?") == (None, 0.0)
+
+
+def test_classifier_trains_from_logged_decisions(tmp_path):
+    log_path = str(tmp_path / 'decisions.jsonl')
+    phrases = {
+        'SMALL_TALK': ["привет", "как дела", "чем занимаешься", "добрый вечер", "как настроение"],
+        'INFORMATION': ["что такое квантовая физика", "сколько планет в солнечной системе",
+                        "что такое фотосинтез", "сколько лет земле", "что такое черная дыра"],
+    }
+    for label, texts in phrases.items():
+        for text in texts:
+            log_decision(log_path, text, label, source='llm')
+    log_decision(log_path, "привет", 'SMALL_TALK', source='local')
+
+    samples = load_decisions(log_path)
+    assert len(samples) == 10
+
+    classifier = IntentClassifier(threshold=0.0).fit(samples)
+    assert classifier.predict("что такое гравитация")[0] == 'INFORMATION'
+
+    report = classifier.evaluate(samples)
+    assert report['samples'] == 10
+    assert report['coverage'] == 1.0
+    assert report['latency_mean_ms'] >= 0
+
+
+def test_background_log_keeps_order(tmp_path):
+    log_path = str(tmp_path / 'decisions.jsonl')
+    futures = [log_decision_in_background(log_path, f"сообщение {index}", 'SMALL_TALK', 'llm') for index in range(20)]
+    for future in futures:
+        future.result(timeout=5)
+    assert [text for text, _ in load_decisions(log_path)] == [f"сообщение {index}" for index in range(20)]
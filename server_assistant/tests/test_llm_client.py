@@ -0,0 +1,21 @@
+import asyncio
+
+from src.neural_networks import llm_client
+
+
+def test_clients_share_connection_pool():
+    first = llm_client.get_async_client('key-a')
+    second = llm_client.get_async_client('key-b', base_url='https://api.deepseek.com')
+
+    assert llm_client.get_async_client('key-a') is first
+    assert first._client is second._client is llm_client.get_http_client()
+
+    asyncio.run(llm_client.close_clients())
+
+
+def test_close_clients_recreates_pool():
+    client = llm_client.get_async_client('key-a')
+    asyncio.run(llm_client.close_clients())
+
+    assert llm_client.get_async_client('key-a') is not client
+    asyncio.run(llm_client.close_clients())
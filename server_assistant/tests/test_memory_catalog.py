@@ -0,0 +1,50 @@
+from src.neural_networks.memory_catalog import NoteCatalog, content_hash
+
+
+def test_load_assigns_stable_ids():
+    memories = [{'chat_id': 1, 'text': "Купить хлеб"}, {'id': 'keep', 'chat_id': 1, 'text': "Позвонить маме"}]
+    catalog = NoteCatalog()
+
+    assert catalog.load(memories)
+    assert memories[1]['id'] == 'keep'
+    assert memories[0]['id'] in catalog
+    assert not NoteCatalog().load(memories)
+
+
+def test_duplicates_are_detected_by_hash():
+    catalog = NoteCatalog()
+    note = catalog.add(1, "Купить хлеб")
+
+    assert content_hash("купить  хлеб!") == content_hash("Купить хлеб")
+    assert catalog.contains_text("купить хлеб")
+    assert catalog.find_id("Купить хлеб.") == note['id']
+    assert not catalog.contains_text("Купить молоко")
+
+
+def test_keyword_search_matches_word_forms():
+    catalog = NoteCatalog()
+    chocolate = catalog.add(1, "Понравился шоколад Alpen Gold")
+    catalog.add(1, "Вино Кагор понравилось на дне рождения")
+    catalog.add(1, "Пароль от wifi на даче")
+
+    results = catalog.search("какого шоколада мне хотелось")
+
+    assert results[0][0] is chocolate
+    assert len(results) == 1
+    assert catalog.search("бот вспомни") == []
+
+
+def test_update_and_remove_by_id():
+    catalog = NoteCatalog()
+    first = catalog.add(1, "Купить хлеб")
+    second = catalog.add(1, "Позвонить маме")
+
+    catalog.update(first['id'], "Купить молоко")
+    assert [note['text'] for note in catalog.to_list()] == ["Купить молоко", "Позвонить маме"]
+    assert not catalog.contains_text("Купить хлеб")
+    assert catalog.search("молоко")[0][0] is first
+
+    assert catalog.remove(second['id']) is second
+    assert catalog.remove(second['id']) is None
+    assert catalog.search("маме") == []
+    assert len(catalog) == 1
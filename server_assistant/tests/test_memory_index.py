@@ -0,0 +1,90 @@
+import os
+
+from src.neural_networks.memory_index import MemoryIndex, query_text
+
+NOTES = [
+    "Понравился шоколад Alpen Gold",
+    "Пароль от wifi на даче: sunflower",
+    "Вино Кагор понравилось на дне рождения",
+]
+ITEMS = [(str(position), text) for position, text in enumerate(NOTES)]
+
+
+def test_query_text_drops_command_words():
+    assert query_text("Бот, вспомни, какой шоколад мне понравился?") == "шоколад понравился"
+    assert query_text("что где") == "что где"
+
+
+def test_search_ranks_matching_note_first():
+    index = MemoryIndex()
+    index.build(ITEMS)
+
+    results = index.search(query_text("Вспомни, какой шоколад мне понравился"), top_k=2)
+
+    assert len(results) == 2
+    assert results[0][0] == '0'
+    assert results[0][1] > results[1][1]
+
+
+def test_incremental_updates_keep_rows_aligned():
+    index = MemoryIndex()
+    index.build(ITEMS[:1])
+    index.add('1', NOTES[1])
+    index.update('0', "Понравился шоколад Ritter Sport")
+    assert index.remove('1')
+    assert not index.remove('нет такой заметки')
+
+    assert index.keys == ['0']
+    assert index.texts == ["Понравился шоколад Ritter Sport"]
+    assert index.vectors.shape[0] == 1
+    assert index.search("ritter sport")[0][0] == '0'
+
+
+def test_saved_vectors_are_reused(tmp_path):
+    index_file = str(tmp_path / 'memory_index_1.npz')
+    MemoryIndex(index_file=index_file).build(ITEMS)
+
+    reloaded = MemoryIndex(index_file=index_file)
+    assert reloaded._load_saved(['0', '1', '2'], NOTES)
+    assert not MemoryIndex(index_file=index_file)._load_saved(['0', '1'], NOTES[:2])
+    assert reloaded.search("кагор")[0][0] == '2'
+
+
+def test_empty_index_returns_no_candidates():
+    index = MemoryIndex()
+    index.build([])
+    assert index.search("шоколад") == []
+
+
+def test_changes_are_journaled_and_replayed(tmp_path):
+    index_file = str(tmp_path / 'memory_index_1.npz')
+    index = MemoryIndex(index_file=index_file)
+    index.build(ITEMS)
+    snapshot_mtime = os.path.getmtime(index_file)
+
+    index.add('3', "Любимый сыр - пармезан")
+    index.update('0', "Понравился шоколад Ritter Sport")
+    assert index.remove('1')
+
+    # Снимок не перезаписывается, изменения лежат в журнале
+    assert os.path.getmtime(index_file) == snapshot_mtime
+    assert os.path.exists(index.journal_file)
+    # Удаленная строка осталась надгробием и не попадает в поиск
+    assert all(key != '1' for key, _ in index.search("пароль wifi", top_k=10))
+
+    reloaded = MemoryIndex(index_file=index_file)
+    expected = list(zip(index.keys, index.texts))
+    assert expected == [('0', "Понравился шоколад Ritter Sport"), ('2', NOTES[2]), ('3', "Любимый сыр - пармезан")]
+    assert reloaded._load_saved([key for key, _ in expected], [text for _, text in expected])
+    assert reloaded.search("пармезан")[0][0] == '3'
+
+
+def test_journal_is_compacted_into_snapshot(tmp_path):
+    index = MemoryIndex(index_file=str(tmp_path / 'memory_index_1.npz'), compact_every=3)
+    index.build(ITEMS[:1])
+    for position in range(1, 4):
+        index.add(str(position), f"заметка номер {position}")
+
+    assert not os.path.exists(index.journal_file)
+    assert index.keys == ['0', '1', '2', '3']
+    assert MemoryIndex(index_file=index.index_file)._load_saved(index.keys, index.texts)
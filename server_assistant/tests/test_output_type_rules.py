@@ -0,0 +1,67 @@
+import pytest
+from src.neural_networks.output_type_rules import (
+    RESET, match_explicit_output_type, match_implicit_output_type, match_sticky_output_type
+)
+from src.utils.user_preferences import UserPreferences
+
+
+@pytest.mark.parametrize("message, expected", [
+    ("Напиши текстом, пожалуйста", 'TEXT'),
+    ("Ответь текстовым сообщением", 'TEXT'),
+    ("Ответь голосовым", 'AUDIO'),
+    ("Расскажи в голосовом, что было вчера", 'AUDIO'),
+    ("Прочитай вслух стихотворение", 'AUDIO'),
+    ("Ответь и текстом, и голосом", 'MULTI'),
+    ("Как дела?", None),
+    ("Я вчера отправил голосовое", None),
+    ("Пришли голосовое", 'AUDIO'),
+    ("Ответь в текстовом виде", 'TEXT'),
+    # Слова о голосовании, озвучке и тексте - не просьба о формате
+    ("Расскажи, как голосовать на выборах", None),
+    ("Скажи, кто озвучивал Шрека", None),
+    ("Напиши текст поздравления", None),
+])
+def test_explicit_output_type(message, expected):
+    assert match_explicit_output_type(message) == expected
+
+
+def test_implicit_output_type():
+    assert match_implicit_output_type("Напомни завтра в 9 позвонить маме") == 'MULTI'
+    assert match_implicit_output_type("Составь план на сегодня") == 'MULTI'
+    assert match_implicit_output_type("Привет") is None
+
+
+def test_sticky_output_type():
+    assert match_sticky_output_type("Теперь всегда отвечай голосовыми") == 'AUDIO'
+    assert match_sticky_output_type("Отвечай как обычно") == RESET
+    assert match_sticky_output_type("Верни формат как раньше") == RESET
+    assert match_sticky_output_type("Как обычно пиши мне") == RESET
+    # "как обычно" в обычной просьбе формат не сбрасывает
+    assert match_sticky_output_type("Расскажи, как обычно проходит день космонавта") is None
+    assert match_sticky_output_type("Как обычно, напомни купить хлеб") is None
+    assert match_sticky_output_type("Сделай все как раньше") is None
+    assert match_sticky_output_type("Ответь голосовым") is None
+    assert match_sticky_output_type("С этого момента пиши текстом") == 'TEXT'
+
+
+@pytest.mark.parametrize("message", [
+    "Теперь расскажи про голосование в Госдуме",
+    "Дальше напиши текст письма начальнику",
+    "Теперь ответь голосом",
+    "Расскажи, как голосовать на выборах",
+])
+def test_one_off_requests_are_not_sticky(message):
+    assert match_sticky_output_type(message) is None
+
+
+def test_output_type_preference_is_shared(tmp_path):
+    preferences_file = str(tmp_path / 'preferences.json')
+    first = UserPreferences(preferences_file)
+    second = UserPreferences(preferences_file)
+
+    first.set_output_type(1, 'AUDIO')
+    second.set_llm_model(2, 'openai')
+
+    assert UserPreferences(preferences_file).get_output_type(1) == 'AUDIO'
+    first.set_output_type(1, None)
+    assert second.get_output_type(1) is None
@@ -0,0 +1,113 @@
+import logging
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from src.neural_networks.reminder_network import ReminderNetwork
+from src.telegram_bot.reminder_store import advance_recurring
+from src.utils.recurrence import next_occurrence, parse_recurrence
+
+START = datetime(2026, 1, 1, 9, 0)  # четверг
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, None),
+    ("daily", {'freq': 'DAILY', 'interval': 1}),
+    ("weekdays", {'freq': 'WEEKLY', 'interval': 1, 'byweekday': [0, 1, 2, 3, 4]}),
+    ("RRULE:FREQ=WEEKLY;INTERVAL=2;BYDAY=FR,MO", {'freq': 'WEEKLY', 'interval': 2, 'byweekday': [0, 4]}),
+    ("FREQ=MONTHLY;BYMONTHDAY=-1;COUNT=3", {'freq': 'MONTHLY', 'interval': 1, 'bymonthday': -1, 'count': 3}),
+    ("FREQ=DAILY;UNTIL=20260110T000000Z", {'freq': 'DAILY', 'interval': 1, 'until': '2026-01-10T00:00:00'}),
+])
+def test_parse_recurrence(value, expected):
+    assert parse_recurrence(value) == expected
+
+
+def test_parse_recurrence_rejects_unknown_rules():
+    with pytest.raises(ValueError):
+        parse_recurrence("FREQ=HOURLY")
+    with pytest.raises(ValueError):
+        parse_recurrence("каждый вторник")
+    # Номер дня недели имеет смысл только внутри месяца
+    with pytest.raises(ValueError):
+        parse_recurrence("FREQ=WEEKLY;BYDAY=1MO")
+
+
+def test_parse_recurrence_skips_unsupported_parts():
+    assert parse_recurrence("FREQ=WEEKLY;BYDAY=MO;BYHOUR=9;BYMINUTE=0;WKST=MO") == {
+        'freq': 'WEEKLY', 'interval': 1, 'byweekday': [0]
+    }
+
+
+@pytest.mark.parametrize("rule, start, after, expected", [
+    # Первый понедельник месяца
+    ("FREQ=MONTHLY;BYDAY=1MO", datetime(2026, 11, 2, 9, 0), datetime(2026, 11, 2, 9, 0), datetime(2026, 12, 7, 9, 0)),
+    ("FREQ=MONTHLY;BYDAY=1MO", datetime(2026, 11, 2, 9, 0), datetime(2026, 12, 7, 9, 0), datetime(2027, 1, 4, 9, 0)),
+    # Последняя пятница месяца
+    ("FREQ=MONTHLY;BYDAY=-1FR", datetime(2026, 10, 30, 18, 0), datetime(2026, 10, 30, 18, 0), datetime(2026, 11, 27, 18, 0)),
+    ("FREQ=MONTHLY;BYDAY=-1FR", datetime(2026, 10, 30, 18, 0), datetime(2026, 11, 27, 18, 0), datetime(2026, 12, 25, 18, 0)),
+    # Пятница 13-е
+    ("FREQ=MONTHLY;BYDAY=FR;BYMONTHDAY=13", datetime(2026, 2, 13, 9, 0), datetime(2026, 2, 13, 9, 0), datetime(2026, 3, 13, 9, 0)),
+])
+def test_monthly_weekday_rules(rule, start, after, expected):
+    parsed = parse_recurrence(rule)
+    assert next_occurrence(parsed, start, after) == expected
+    assert next_occurrence(parsed, start, after).weekday() == expected.weekday()
+
+
+@pytest.mark.parametrize("rule, after, expected", [
+    ("daily", datetime(2026, 1, 1, 9, 0), datetime(2026, 1, 2, 9, 0)),
+    ("FREQ=DAILY;INTERVAL=3", datetime(2026, 3, 1), datetime(2026, 3, 2, 9, 0)),
+    ("weekdays", datetime(2026, 1, 2, 9, 0), datetime(2026, 1, 5, 9, 0)),
+    ("FREQ=WEEKLY;INTERVAL=2;BYDAY=MO", datetime(2026, 1, 1, 9, 0), datetime(2026, 1, 12, 9, 0)),
+    ("FREQ=WEEKLY;INTERVAL=2;BYDAY=MO", datetime(2026, 1, 12, 9, 0), datetime(2026, 1, 26, 9, 0)),
+    ("FREQ=MONTHLY;BYMONTHDAY=31", datetime(2026, 2, 1), datetime(2026, 2, 28, 9, 0)),
+    ("FREQ=MONTHLY;BYMONTHDAY=-1", datetime(2026, 4, 1), datetime(2026, 4, 30, 9, 0)),
+    ("yearly", datetime(2026, 1, 1, 9, 0), datetime(2027, 1, 1, 9, 0)),
+])
+def test_next_occurrence(rule, after, expected):
+    assert next_occurrence(parse_recurrence(rule), START, after) == expected
+
+
+def test_series_ends_by_count_and_until():
+    assert next_occurrence(parse_recurrence("FREQ=DAILY;COUNT=2"), START, START, occurrences=2) is None
+    rule = parse_recurrence("FREQ=DAILY;UNTIL=20260102T090000")
+    assert next_occurrence(rule, START, START) == datetime(2026, 1, 2, 9, 0)
+    assert next_occurrence(rule, START, datetime(2026, 1, 2, 9, 0)) is None
+
+
+def test_advance_recurring_keeps_one_record():
+    reminder = {
+        'id': 'r1', 'text': "Планерка", 'time': '2026-01-02T09:00:00', 'type': 'constant', 'chat_id': 1,
+        'recurrence': parse_recurrence("weekdays"), 'start': START.isoformat(),
+    }
+
+    advanced = advance_recurring(reminder, datetime(2026, 1, 2, 9, 0, 1))
+
+    assert advanced['id'] == 'r1'
+    assert advanced['time'] == '2026-01-05T09:00:00'
+    assert advanced['occurrences'] == 1
+    assert advance_recurring(dict(reminder, type='one-time', recurrence=None), datetime(2026, 1, 2)) is None
+    # Старые постоянные напоминания без правила повторяются ежедневно
+    legacy = {'id': 2, 'text': "Зарядка", 'time': '2026-01-02T07:00:00', 'type': 'constant', 'chat_id': 1}
+    assert advance_recurring(legacy, datetime(2026, 1, 2, 7, 0))['time'] == '2026-01-03T07:00:00'
+
+
+def test_reminder_network_emits_recurrence():
+    network = SimpleNamespace(logger=logging.getLogger(__name__))
+    response = ('{"text": "Отчет", "time": "2026-01-05T10:00:00", "type": "one-time", '
+                '"recurrence": "FREQ=WEEKLY;BYDAY=MO"}')
+
+    text, time, reminder_type, recurrence = ReminderNetwork.parse_reminder_json(network, response)
+
+    assert (text, time, reminder_type) == ("Отчет", datetime(2026, 1, 5, 10, 0), 'constant')
+    assert recurrence == {'freq': 'WEEKLY', 'interval': 1, 'byweekday': [0]}
+    legacy = ReminderNetwork.parse_reminder_json(
+        network, '{"text": "Зарядка", "time": "2026-01-05T07:00:00", "type": "constant"}'
+    )
+    assert legacy[3] == {'freq': 'DAILY', 'interval': 1}
+    # Нераспознанное правило не теряет напоминание: оно становится разовым
+    unsupported = ReminderNetwork.parse_reminder_json(
+        network, '{"text": "Созвон", "time": "2026-01-05T10:00:00", "type": "constant", "recurrence": "FREQ=HOURLY"}'
+    )
+    assert unsupported == ("Созвон", datetime(2026, 1, 5, 10, 0), 'one-time', None)
@@ -0,0 +1,64 @@
+import asyncio
+import time
+
+from src.telegram_bot.reminder_scheduler import ReminderScheduler
+
+
+def test_pop_due_returns_reminders_in_fire_order():
+    scheduler = ReminderScheduler(deliver=None)
+    scheduler.schedule({'id': 'b'}, 20.0)
+    scheduler.schedule({'id': 'a'}, 10.0)
+    scheduler.schedule({'id': 'c'}, 30.0)
+
+    assert [reminder['id'] for reminder in scheduler.pop_due(25.0)] == ['a', 'b']
+    assert scheduler.pop_due(25.0) == []
+    assert scheduler.next_fire_time() == 30.0
+    assert len(scheduler) == 1
+
+
+def test_cancel_and_reschedule_skip_stale_entries():
+    scheduler = ReminderScheduler(deliver=None)
+    scheduler.schedule({'id': 1}, 10.0)
+    scheduler.schedule({'id': 2}, 20.0)
+    scheduler.schedule({'id': 1, 'moved': True}, 40.0)
+
+    assert scheduler.cancel(2)
+    assert not scheduler.cancel(2)
+    assert scheduler.pop_due(30.0) == []
+    assert scheduler.pop_due(40.0) == [{'id': 1, 'moved': True}]
+
+
+def test_stale_entries_are_compacted():
+    scheduler = ReminderScheduler(deliver=None)
+    for index in range(1000):
+        scheduler.schedule({'id': 1}, float(index))
+
+    assert len(scheduler) == 1
+    assert len(scheduler._heap) <= 2 * len(scheduler) + 64
+
+
+def test_run_delivers_each_reminder_once():
+    delivered = []
+
+    async def deliver(reminder):
+        delivered.append(reminder['id'])
+
+    async def scenario():
+        scheduler = ReminderScheduler(deliver)
+        runner = asyncio.create_task(scheduler.run())
+        now = time.time()
+        scheduler.schedule({'id': 'late'}, now + 0.1)
+        scheduler.schedule({'id': 'overdue'}, now - 10)
+        await asyncio.sleep(0.02)
+        # Добавление более раннего напоминания будит спящий планировщик
+        scheduler.schedule({'id': 'soon'}, time.time() + 0.02)
+        scheduler.schedule({'id': 'cancelled'}, time.time() + 0.05)
+        scheduler.cancel('cancelled')
+        await asyncio.sleep(0.2)
+        runner.cancel()
+        return scheduler
+
+    scheduler = asyncio.run(scenario())
+
+    assert delivered == ['overdue', 'soon', 'late']
+    assert len(scheduler) == 0
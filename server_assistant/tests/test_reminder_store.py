@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from src.storage import JsonStorage, SQLiteStorage
+from src.telegram_bot.reminder_store import ReminderStore
+
+
+@pytest.fixture(params=['json', 'sqlite'])
+def storage(request, tmp_path):
+    if request.param == 'json':
+        return JsonStorage(str(tmp_path))
+    return SQLiteStorage(str(tmp_path / 'assistant.db'))
+
+
+def make_reminder(text, time='2026-01-01T10:00:00'):
+    return {'text': text, 'time': time, 'type': 'one-time', 'chat_id': 1}
+
+
+def test_add_update_remove_survive_reload(storage):
+    store = ReminderStore(storage)
+    store.load()
+    first = store.add(make_reminder("позвонить"))
+    second = store.add(make_reminder("купить хлеб"))
+    assert first['id'] != second['id']
+
+    store.update(dict(second, time='2026-01-02T10:00:00'))
+    assert store.remove(first['id']) is not None
+    assert store.remove(first['id']) is None
+
+    reloaded = ReminderStore(storage)
+    assert reloaded.load() == [dict(second, time='2026-01-02T10:00:00')]
+
+
+def test_json_changes_are_appended_not_rewritten(tmp_path):
+    storage = JsonStorage(str(tmp_path))
+    store = ReminderStore(storage)
+    store.load()
+    for index in range(3):
+        store.add(make_reminder(f"напоминание {index}"))
+
+    assert not (tmp_path / 'reminders.json').exists()
+    assert len((tmp_path / 'reminders.jsonl').read_text(encoding='utf-8').splitlines()) == 3
+
+
+def test_legacy_duplicate_ids_are_replaced(tmp_path):
+    legacy = [dict(make_reminder("первое"), id=1), dict(make_reminder("второе"), id=1)]
+    (tmp_path / 'reminders.json').write_text(json.dumps(legacy, ensure_ascii=False), encoding='utf-8')
+
+    store = ReminderStore(JsonStorage(str(tmp_path)))
+    reminders = store.load()
+
+    assert [reminder['text'] for reminder in reminders] == ["первое", "второе"]
+    assert len(store) == 2
+    assert len(ReminderStore(JsonStorage(str(tmp_path))).load()) == 2
@@ -14,4 +14,26 @@ def router_network():
 def test_router_network_task_detection(router_network):
     # Тесты определения типа задачи
     assert router_network.detect_task_type("Привет") == TaskType.SMALL_TALK
-    assert router_network.detect_task_type("Расскажи мне историю") == TaskType.COMPLEX_DIALOG
\ No newline at end of file
+    assert router_network.detect_task_type("Расскажи мне историю") == TaskType.COMPLEX_DIALOG
+
+def test_router_network_classifies_concurrently(monkeypatch):
+    import asyncio
+    from src.neural_networks.router_network import OutputType
+
+    monkeypatch.setenv('OPENAI_API_KEY', 'test_key')
+    router = RouterNetwork(chat_id=1)
+
+    async def fake_task_type(message):
+        await asyncio.sleep(0.1)
+        return TaskType.SMALL_TALK
+
+    async def fake_output_type(message):
+        await asyncio.sleep(0.1)
+        return OutputType.TEXT
+
+    router.detect_task_type = fake_task_type
+    router.detect_output_type = fake_output_type
+
+    assert asyncio.run(router.classify("Привет")) == (TaskType.SMALL_TALK, OutputType.TEXT)
+    assert router.last_timings['total'] < 0.19
+    assert router.last_timings['task_type'] >= 0.1
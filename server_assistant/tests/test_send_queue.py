@@ -0,0 +1,205 @@
+import asyncio
+import logging
+import time
+
+import pytest
+from aiogram.exceptions import TelegramNetworkError, TelegramRetryAfter
+from aiogram.methods import SendMessage
+
+from src.telegram_bot.send_queue import BULK, INTERACTIVE, SendQueue, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_refills_over_time():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=2, clock=clock)
+    bucket.consume()
+    bucket.consume()
+    assert bucket.wait_time() == pytest.approx(0.5)
+
+    clock.now = 0.5
+    assert bucket.wait_time() == 0
+
+
+def test_token_bucket_pause_blocks_until_delay_passes():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=30, capacity=30, clock=clock)
+    bucket.pause(2)
+    assert bucket.wait_time() == pytest.approx(2)
+
+    clock.now = 2
+    assert bucket.wait_time() == 0
+
+
+def run_queue(scenario, **kwargs):
+    async def main():
+        queue = SendQueue(metrics_interval=0, **kwargs)
+        runner = asyncio.create_task(queue.run())
+        try:
+            return await scenario(queue)
+        finally:
+            runner.cancel()
+
+    return asyncio.run(main())
+
+
+def test_interactive_replies_overtake_bulk_reminders():
+    sent = []
+
+    def sender(label):
+        async def call():
+            sent.append(label)
+            return label
+        return lambda: call()
+
+    async def main():
+        queue = SendQueue(metrics_interval=0)
+        jobs = [asyncio.create_task(queue.send(sender(f'reminder {chat}'), chat, priority=BULK)) for chat in range(3)]
+        jobs.append(asyncio.create_task(queue.send(sender('reply'), 10, priority=INTERACTIVE)))
+        # Очередь запускается, когда все отправки уже ждут в ней
+        await asyncio.sleep(0)
+        runner = asyncio.create_task(queue.run())
+        try:
+            return await asyncio.gather(*jobs)
+        finally:
+            runner.cancel()
+
+    results = asyncio.run(main())
+    assert sent[0] == 'reply'
+    assert sorted(results) == ['reminder 0', 'reminder 1', 'reminder 2', 'reply']
+
+
+def test_messages_in_one_chat_keep_order_under_rate_limit():
+    sent = []
+
+    async def scenario(queue):
+        async def call(index):
+            sent.append(index)
+        await asyncio.gather(*(queue.send(lambda index=index: call(index), 1) for index in range(4)))
+        return queue.metrics()
+
+    metrics = run_queue(scenario, chat_rate=50, chat_burst=1)
+    assert sent == [0, 1, 2, 3]
+    assert metrics['sent'] == 4
+    assert metrics['queue_depth'] == 0
+
+
+def test_retry_after_and_network_errors_are_retried():
+    attempts = []
+
+    async def flaky():
+        attempts.append(len(attempts))
+        if len(attempts) == 1:
+            raise TelegramRetryAfter(SendMessage(chat_id=1, text='x'), 'Flood control', retry_after=0)
+        if len(attempts) == 2:
+            raise TelegramNetworkError(SendMessage(chat_id=1, text='x'), 'timeout')
+        return 'ok'
+
+    async def scenario(queue):
+        return await queue.send(flaky, 1), queue.metrics()
+
+    result, metrics = run_queue(scenario, backoff_base=0.01)
+    assert result == 'ok'
+    assert len(attempts) == 3
+    assert metrics['retries'] == 2
+
+
+def test_error_is_raised_after_max_retries():
+    async def failing():
+        raise TelegramNetworkError(SendMessage(chat_id=1, text='x'), 'timeout')
+
+    async def scenario(queue):
+        with pytest.raises(TelegramNetworkError):
+            await queue.send(failing, 1)
+        return queue.metrics()
+
+    metrics = run_queue(scenario, max_retries=1, backoff_base=0.01)
+    assert metrics['failed'] == 1
+
+
+def test_retry_after_in_several_chats_pauses_all_sends():
+    sent_at = {}
+    flooded = set()
+
+    def sender(chat):
+        async def call():
+            if chat in (1, 2) and chat not in flooded:
+                flooded.add(chat)
+                raise TelegramRetryAfter(SendMessage(chat_id=chat, text='x'), 'Flood control', retry_after=0.3)
+            sent_at[chat] = time.monotonic()
+        return call
+
+    async def scenario(queue):
+        started = time.monotonic()
+        floods = [asyncio.create_task(queue.send(sender(chat), chat)) for chat in (1, 2)]
+        await asyncio.sleep(0.05)
+        # Чат 3 ограничения не получал, но бот под общим ограничением
+        await queue.send(sender(3), 3)
+        await asyncio.gather(*floods)
+        return {chat: moment - started for chat, moment in sent_at.items()}
+
+    delays = run_queue(scenario)
+    assert delays[3] >= 0.25
+    assert min(delays[1], delays[2]) >= 0.25
+
+
+def test_single_chat_retry_after_does_not_pause_others():
+    flooded = []
+
+    async def scenario(queue):
+        async def flood():
+            if not flooded:
+                flooded.append(True)
+                raise TelegramRetryAfter(SendMessage(chat_id=1, text='x'), 'Flood control', retry_after=0.5)
+
+        async def ok():
+            return 'ok'
+
+        first = asyncio.create_task(queue.send(flood, 1))
+        await asyncio.sleep(0.05)
+        started = time.monotonic()
+        assert await queue.send(ok, 2) == 'ok'
+        elapsed = time.monotonic() - started
+        await first
+        return elapsed
+
+    assert run_queue(scenario) < 0.2
+
+
+def test_metrics_are_logged_while_queue_is_idle(caplog):
+    async def main():
+        queue = SendQueue(metrics_interval=0.05)
+        runner = asyncio.create_task(queue.run())
+        await asyncio.sleep(0.2)
+        runner.cancel()
+
+    with caplog.at_level(logging.INFO, logger='src.telegram_bot.send_queue'):
+        asyncio.run(main())
+    assert sum('Очередь отправки' in record.getMessage() for record in caplog.records) >= 2
+
+
+def test_idle_chat_buckets_are_dropped_once_refilled():
+    clock = FakeClock()
+
+    async def scenario(queue):
+        async def ok():
+            return 'ok'
+
+        for chat_id in range(5):
+            await queue.send(ok, chat_id)
+        # Корзины еще не наполнились: удалять их рано, иначе чат получит лишнюю серию
+        kept = len(queue._chat_buckets)
+        clock.now = 1.0
+        await queue.send(ok, 5)
+        return kept, set(queue._chat_buckets)
+
+    kept, remaining = run_queue(scenario, chat_rate=1, chat_burst=3, clock=clock)
+    assert kept == 5
+    assert remaining == {5}
@@ -7,4 +7,83 @@ def audio_transcriber():
 
 def test_audio_transcriber_initialization(audio_transcriber):
     assert audio_transcriber.language == 'ru-RU'
-    assert audio_transcriber.recognizer is not None
\ No newline at end of file
+    assert audio_transcriber.recognizer is not None
+
+def _encode(signal, samplerate, format, subtype):
+    import io
+    import soundfile as sf
+    buffer = io.BytesIO()
+    sf.write(buffer, signal, samplerate, format=format, subtype=subtype)
+    return buffer.getvalue()
+
+
+def test_decode_ogg_opus_from_memory():
+    import numpy as np
+    from src.audio_processing.speech_recognition import WHISPER_SAMPLE_RATE, decode_audio
+
+    samplerate = 48000
+    time_axis = np.arange(samplerate) / samplerate
+    stereo = np.stack([np.sin(2 * np.pi * 440 * time_axis)] * 2, axis=1) * 0.5
+    audio = decode_audio(_encode(stereo, samplerate, 'OGG', 'OPUS'))
+
+    assert audio.dtype == np.float32
+    assert audio.ndim == 1
+    assert abs(len(audio) - WHISPER_SAMPLE_RATE) < WHISPER_SAMPLE_RATE * 0.05
+
+
+def test_decode_wav_path(tmp_path):
+    import numpy as np
+    from src.audio_processing.speech_recognition import decode_audio
+
+    path = tmp_path / 'voice.wav'
+    path.write_bytes(_encode(np.zeros(16000), 16000, 'WAV', 'PCM_16'))
+    assert len(decode_audio(str(path))) == 16000
+
+
+def test_transcriber_uses_configured_backend(monkeypatch):
+    import numpy as np
+    from src.audio_processing import speech_recognition
+    from src.audio_processing.base.asr_model import ASRModel
+
+    class FakeASR(ASRModel):
+        def __init__(self, language, model_name):
+            super().__init__(language)
+            self.model_name = model_name
+
+        def transcribe(self, audio):
+            return f'{self.model_name}: {len(audio)}'
+
+    monkeypatch.setitem(speech_recognition.ASR_BACKENDS, 'fake', FakeASR)
+    transcriber = speech_recognition.AudioTranscriber(model_name='small', backend='fake')
+    voice = _encode(np.full(8000, 0.1), 8000, 'WAV', 'PCM_16')
+
+    assert transcriber.transcribe_audio(voice) == 'small: 16000'
+    with pytest.raises(ValueError):
+        speech_recognition.create_asr_model('unknown')
+
+
+def test_silent_voice_note_skips_model(monkeypatch):
+    import numpy as np
+    from src.audio_processing import speech_recognition
+    from src.audio_processing.base.asr_model import ASRModel
+
+    calls = []
+
+    class RecordingASR(ASRModel):
+        def __init__(self, language, model_name):
+            super().__init__(language)
+
+        def transcribe(self, audio):
+            calls.append(len(audio))
+            return 'текст'
+
+    monkeypatch.setitem(speech_recognition.ASR_BACKENDS, 'recording', RecordingASR)
+    transcriber = speech_recognition.AudioTranscriber(backend='recording', max_chunk_seconds=1)
+
+    assert transcriber.transcribe_audio(_encode(np.zeros(16000), 16000, 'WAV', 'PCM_16')) == ""
+    assert calls == []
+
+    time_axis = np.arange(40000) / 16000
+    speech = np.concatenate([np.zeros(16000), 0.3 * np.sin(2 * np.pi * 220 * time_axis), np.zeros(16000)])
+    assert transcriber.transcribe_audio(_encode(speech, 16000, 'WAV', 'PCM_16')) == 'текст текст текст'
+    assert max(calls) <= 16000
@@ -0,0 +1,44 @@
+from src.utils.speech_text import normalize_for_speech, number_to_words, ordinal_to_words, split_sentences
+
+
+def test_number_to_words():
+    assert number_to_words(0) == 'ноль'
+    assert number_to_words(21) == 'двадцать один'
+    assert number_to_words(2, feminine=True) == 'две'
+    assert number_to_words(2001) == 'две тысячи один'
+    assert number_to_words(21105) == 'двадцать одна тысяча сто пять'
+    assert number_to_words(3000000) == 'три миллиона'
+    assert number_to_words(-15) == 'минус пятнадцать'
+
+
+def test_normalize_for_speech():
+    assert normalize_for_speech('Встреча в 9:00, **важно**') == 'Встреча в девять ноль ноль, важно'
+    assert normalize_for_speech('Скидка 12% до 3,05 кг') == 'Скидка двенадцать процентов до три запятая ноль пять кг'
+    assert normalize_for_speech('Подробнее: https://example.com/a?b=1') == 'Подробнее: ссылка'
+
+
+def test_ordinal_to_words():
+    assert ordinal_to_words(3) == 'третье'
+    assert ordinal_to_words(21) == 'двадцать первое'
+    assert ordinal_to_words(2026, genitive=True) == 'две тысячи двадцать шестого'
+    assert ordinal_to_words(2000, genitive=True) == 'двухтысячного'
+    assert ordinal_to_words(1900, genitive=True) == 'одна тысяча девятисотого'
+
+
+def test_normalize_dates_and_digit_groups():
+    assert normalize_for_speech('Срок 17.10.2026.') == 'Срок семнадцатое октября две тысячи двадцать шестого года.'
+    assert normalize_for_speech('Встреча 01.03') == 'Встреча первое марта'
+    assert normalize_for_speech('Цена 1 500 руб.') == 'Цена одна тысяча пятьсот руб.'
+    assert normalize_for_speech('Итого 2\u202f000\u00a0000') == 'Итого два миллиона'
+    assert normalize_for_speech('Python 3.11.2') == 'Python три точка одиннадцать точка два'
+    # Не дата: читается как дробь или номер
+    assert normalize_for_speech('Вес 3.5 кг') == 'Вес три запятая пять кг'
+    assert normalize_for_speech('45.13.2026') == 'сорок пять точка тринадцать точка две тысячи двадцать шесть'
+
+
+def test_split_sentences_groups_whole_sentences():
+    text = 'Первое предложение. Второе! Третье предложение подлиннее?'
+    assert split_sentences(text, max_chars=30) == ['Первое предложение. Второе!', 'Третье предложение подлиннее?']
+    assert split_sentences(text, max_chars=1000) == [text]
+    assert split_sentences('одно два три четыре', max_chars=8) == ['одно два', 'три', 'четыре']
+    assert split_sentences('   ') == []
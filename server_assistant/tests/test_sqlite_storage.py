@@ -0,0 +1,119 @@
+import json
+
+import pytest
+
+from src.neural_networks.dialog_manager import DialogManager
+from src.neural_networks.dialog_store import DialogStore
+from src.storage import JsonStorage, SQLiteStorage
+from src.utils.user_preferences import UserPreferences
+
+from migrate_json_to_sqlite import migrate_dialogs, migrate_memories
+
+
+def test_dialog_context_survives_reopen(tmp_path):
+    database = str(tmp_path / 'assistant.db')
+    storage = SQLiteStorage(database)
+    manager = DialogManager(journal=storage.dialog_journal(1))
+    manager.add_message("привет", role='user')
+    manager.add_message("здравствуйте", role='assistant')
+    storage.close()
+
+    reopened = SQLiteStorage(database)
+    reloaded = DialogManager(journal=reopened.dialog_journal(1))
+    assert [msg['content'] for msg in reloaded.get_context()] == ["привет", "здравствуйте"]
+    assert DialogManager(journal=reopened.dialog_journal(2)).context['messages'] == []
+
+
+def test_summary_replaces_old_messages(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / 'assistant.db'))
+    manager = DialogManager(journal=storage.dialog_journal(1))
+    manager.add_message("старое", role='user')
+    until = manager.context['messages'][-1]['timestamp']
+    manager.apply_summary("сводка", until)
+
+    reloaded = DialogManager(journal=storage.dialog_journal(1))
+    assert reloaded.context['messages'] == []
+    assert reloaded.get_summary() == "сводка"
+
+
+def test_dialog_store_flushes_to_sqlite(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / 'assistant.db'))
+    store = DialogStore(context_dir=str(tmp_path), storage=storage)
+    for index in range(3):
+        store.get(1).add_message(f"сообщение {index}", role='user')
+
+    store.flush_all()
+
+    assert len(DialogManager(journal=storage.dialog_journal(1)).context['messages']) == 3
+    assert not list(tmp_path.glob('dialogue_context_*'))
+
+
+def test_memories_reminders_and_preferences(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / 'assistant.db'))
+    storage.save_memories(1, [{'chat_id': 1, 'text': 'купить хлеб'}])
+    storage.save_reminders([
+        {'id': 1, 'text': 'б', 'time': '2026-01-02T10:00:00', 'type': 'one-time', 'chat_id': 1},
+        {'id': 2, 'text': 'а', 'time': '2026-01-01T10:00:00', 'type': 'one-time', 'chat_id': 2},
+    ])
+    UserPreferences(storage=storage).set_output_type(1, 'AUDIO')
+
+    assert storage.load_memories(1) == [{'chat_id': 1, 'text': 'купить хлеб'}]
+    assert storage.delete_memories(1)
+    assert not storage.delete_memories(1)
+    assert [reminder['text'] for reminder in storage.load_reminders()] == ['а', 'б']
+    assert storage.load_preferences() == {'1': {'output_type': 'AUDIO'}}
+
+
+def test_migration_copies_json_state(tmp_path):
+    source_dir = tmp_path / 'json'
+    source = JsonStorage(str(source_dir), str(source_dir / 'preferences.json'))
+    manager = DialogManager(context_file=source.dialog_context_file(5))
+    manager.add_message("из журнала", role='user')
+    (source_dir / 'memories_5.json').write_text(
+        json.dumps([{'chat_id': 5, 'text': 'заметка'}], ensure_ascii=False), encoding='utf-8'
+    )
+    target = SQLiteStorage(str(tmp_path / 'assistant.db'))
+
+    assert migrate_dialogs(source, target) == 1
+    assert migrate_memories(source, target) == 1
+    migrated = DialogManager(journal=target.dialog_journal(5))
+    assert [msg['content'] for msg in migrated.context['messages']] == ["из журнала"]
+    assert target.load_memories(5) == [{'chat_id': 5, 'text': 'заметка'}]
+
+
+@pytest.mark.parametrize("backend", ['json', 'sqlite'])
+def test_memories_are_written_by_id(tmp_path, backend):
+    def open_storage():
+        if backend == 'json':
+            return JsonStorage(str(tmp_path), str(tmp_path / 'preferences.json'))
+        return SQLiteStorage(str(tmp_path / 'assistant.db'))
+
+    storage = open_storage()
+    storage.save_memories(1, [{'id': 'a', 'chat_id': 1, 'text': 'купить хлеб'}])
+    storage.upsert_memory(1, {'id': 'b', 'chat_id': 1, 'text': 'позвонить маме'})
+    storage.upsert_memory(1, {'id': 'a', 'chat_id': 1, 'text': 'купить хлеб и молоко'})
+    assert storage.delete_memory(1, 'b')
+    assert not storage.delete_memory(1, 'нет такой')
+    storage.upsert_memory(2, {'id': 'c', 'chat_id': 2, 'text': 'чужая заметка'})
+
+    reopened = open_storage()
+    assert reopened.load_memories(1) == [{'id': 'a', 'chat_id': 1, 'text': 'купить хлеб и молоко'}]
+    assert [memory['id'] for memory in reopened.load_memories(2)] == ['c']
+    if backend == 'json':
+        # Изменения дописаны в журнал, снимок с полным списком не перезаписывался
+        assert json.loads((tmp_path / 'memories_1.json').read_text(encoding='utf-8'))['state'][0]['text'] == 'купить хлеб'
+
+
+def test_old_memories_table_gets_note_ids(tmp_path):
+    import sqlite3
+
+    database = str(tmp_path / 'assistant.db')
+    connection = sqlite3.connect(database)
+    connection.execute("CREATE TABLE memories (id INTEGER PRIMARY KEY AUTOINCREMENT, chat_id INTEGER NOT NULL, data TEXT NOT NULL)")
+    connection.execute("INSERT INTO memories (chat_id, data) VALUES (1, ?)", (json.dumps({'id': 'a', 'text': 'старая'}),))
+    connection.commit()
+    connection.close()
+
+    storage = SQLiteStorage(database)
+    storage.upsert_memory(1, {'id': 'a', 'text': 'новая'})
+    assert storage.load_memories(1) == [{'id': 'a', 'text': 'новая'}]
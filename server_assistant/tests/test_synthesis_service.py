@@ -0,0 +1,95 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from src.audio_processing.synthesis_service import SynthesisQueueFull, SynthesisService
+
+
+class FakeSynthesizer:
+    def __init__(self, language='ru', threads=1):
+        self.threads = threads
+
+    def synthesize_voice(self, text):
+        time.sleep(0.2)
+        return f'{text}|{self.threads}|{os.getpid()}'.encode()
+
+
+def fake_factory(**options):
+    return FakeSynthesizer(**options)
+
+
+def test_parallel_jobs_run_in_workers_with_pinned_threads():
+    async def main():
+        service = SynthesisService(workers=2, threads=3, factory=fake_factory)
+        try:
+            return await asyncio.gather(*(service.synthesize(f'ответ {index}') for index in range(3)))
+        finally:
+            service.close()
+
+    results = [result.decode().split('|') for result in asyncio.run(main())]
+    assert [text for text, _, _ in results] == ['ответ ноль', 'ответ один', 'ответ два']
+    assert {threads for _, threads, _ in results} == {'3'}
+    assert str(os.getpid()) not in {pid for _, _, pid in results}
+
+
+def test_full_queue_rejects_new_jobs():
+    async def main():
+        service = SynthesisService(workers=1, queue_size=0, factory=fake_factory)
+        try:
+            first = asyncio.create_task(service.synthesize('первый'))
+            await asyncio.sleep(0)
+            with pytest.raises(SynthesisQueueFull):
+                await service.synthesize('второй')
+            await first
+        finally:
+            service.close()
+
+    asyncio.run(main())
+
+
+def test_stream_normalizes_and_keeps_sentence_order():
+    async def main():
+        service = SynthesisService(workers=2, max_chunk_chars=30, factory=fake_factory)
+        try:
+            started = time.perf_counter()
+            chunks = [chunk async for chunk in service.synthesize_stream(
+                'Встреча в 10:05. Будет 21 человек. **Не опаздывайте!**'
+            )]
+            return chunks, time.perf_counter() - started, service.pending
+        finally:
+            service.close()
+
+    chunks, elapsed, pending = asyncio.run(main())
+    assert [chunk.decode().split('|')[0] for chunk in chunks] == [
+        'Встреча в десять ноль пять.',
+        'Будет двадцать один человек.',
+        'Не опаздывайте!'
+    ]
+    # Фрагменты синтезируются двумя процессами одновременно
+    assert elapsed < 3 * 0.2 + 1.0
+    assert pending == 0
+
+
+def test_long_stream_leaves_room_for_other_chats():
+    async def main():
+        service = SynthesisService(workers=1, queue_size=4, max_chunk_chars=5, stream_in_flight=2, factory=fake_factory)
+        try:
+            stream = service.synthesize_stream('Раз. Два. Три. Четыре. Пять. Шесть.')
+            first = asyncio.ensure_future(stream.__anext__())
+            await asyncio.sleep(0.05)
+            # Длинный ответ занимает только свое окно, ответ другого чата принимается
+            in_flight = service.pending
+            other = await service.synthesize('другой чат')
+            first = await first
+            rest = [chunk async for chunk in stream]
+            return in_flight, other, [chunk.decode().split('|')[0] for chunk in [first] + rest], service.pending
+        finally:
+            service.close()
+
+    in_flight, other, texts, pending = asyncio.run(main())
+    assert in_flight == 2
+    assert other.decode().startswith('другой чат')
+    assert texts == ['Раз.', 'Два.', 'Три.', 'Четыре.', 'Пять.', 'Шесть.']
+    assert pending == 0
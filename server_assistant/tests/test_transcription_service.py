@@ -0,0 +1,165 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from src.audio_processing.transcription_service import MicroBatcher, TranscriptionQueueFull, TranscriptionService
+
+
+class FakeTranscriber:
+    def __init__(self, language, model_name, backend):
+        self.prefix = f'{backend}:{language}/{model_name}'
+
+    def transcribe_chunks(self, chunks):
+        return [f'{len(chunk)}' for chunk in chunks]
+
+    def transcribe_audio(self, audio_path):
+        started = time.time()
+        time.sleep(0.5)
+        # Окно выполнения задания - для проверки параллельности между процессами
+        return f'{self.prefix}:{os.path.basename(audio_path)}:{os.getpid()}|{started}|{time.time()}'
+
+
+def fake_factory(language='ru', model_name='base', backend='whisper', **options):
+    return FakeTranscriber(language, model_name, backend)
+
+
+def test_workers_load_model_once_and_run_in_parallel():
+    async def main():
+        service = TranscriptionService(workers=2, queue_size=4, model_name='tiny', factory=fake_factory)
+        try:
+            return await asyncio.gather(*(service.transcribe(f'voice_{index}.oga') for index in range(4)))
+        finally:
+            service.close()
+
+    results = [result.split('|') for result in asyncio.run(main())]
+    texts = [text for text, _, _ in results]
+    assert [text.rsplit(':', 1)[0] for text in texts] == [f'whisper:ru/tiny:voice_{index}.oga' for index in range(4)]
+    worker_pids = {text.rsplit(':', 1)[1] for text in texts}
+    assert str(os.getpid()) not in worker_pids
+    assert len(worker_pids) == 2
+
+    # Задания разных процессов выполнялись одновременно: окна пересекаются
+    windows = sorted((float(started), float(finished), text.rsplit(':', 1)[1]) for text, started, finished in results)
+    assert any(
+        first_pid != second_pid and second_start < first_end
+        for index, (_, first_end, first_pid) in enumerate(windows)
+        for second_start, _, second_pid in windows[index + 1:]
+    )
+
+
+def test_full_queue_rejects_new_jobs():
+    async def main():
+        service = TranscriptionService(workers=1, queue_size=0, factory=fake_factory)
+        try:
+            first = asyncio.create_task(service.transcribe('first.oga'))
+            await asyncio.sleep(0)
+            with pytest.raises(TranscriptionQueueFull):
+                await service.transcribe('second.oga')
+            await first
+            return service.pending
+        finally:
+            service.close()
+
+    assert asyncio.run(main()) == 0
+
+
+def _voice_note(seconds):
+    import io
+    import numpy as np
+    import soundfile as sf
+
+    time_axis = np.arange(int(seconds * 16000)) / 16000
+    signal = np.concatenate([np.zeros(16000), 0.3 * np.sin(2 * np.pi * 220 * time_axis), np.zeros(16000)])
+    buffer = io.BytesIO()
+    sf.write(buffer, signal, 16000, format='WAV')
+    return buffer.getvalue()
+
+
+def test_stream_yields_text_per_window():
+    async def main():
+        service = TranscriptionService(workers=2, max_chunk_seconds=1, factory=fake_factory)
+        try:
+            return [text async for text in service.transcribe_stream(_voice_note(2.5))], service.pending
+        finally:
+            service.close()
+
+    texts, pending = asyncio.run(main())
+    # 2.5 с речи с запасом по краям: два полных окна и остаток
+    assert len(texts) == 3
+    assert texts[:2] == ['16000', '16000']
+    assert pending == 0
+
+
+def test_stream_limits_chunks_in_flight_per_message():
+    batches = []
+
+    async def process(chunks):
+        batches.append(len(chunks))
+        await asyncio.sleep(0.01)
+        return [f'{len(chunk)}' for chunk in chunks]
+
+    async def main():
+        service = TranscriptionService(workers=1, max_chunk_seconds=1, stream_in_flight=2, factory=fake_factory)
+        service._batcher.process = process
+        try:
+            return [text async for text in service.transcribe_stream(_voice_note(4.5))]
+        finally:
+            service.close()
+
+    texts = asyncio.run(main())
+    # Пять фрагментов отдаются по порядку, но в пачки попадает не больше двух за раз
+    assert len(texts) == 5
+    assert texts[:4] == ['16000'] * 4
+    assert sum(batches) == 5
+    assert max(batches) <= 2
+
+
+def test_stream_skips_silence_and_can_be_disabled():
+    async def main():
+        streaming = TranscriptionService(workers=1, factory=fake_factory)
+        whole = TranscriptionService(workers=1, streaming=False, factory=fake_factory)
+        try:
+            silent = [text async for text in streaming.transcribe_stream(_voice_note(0))]
+            single = [text async for text in whole.transcribe_stream('voice.oga')]
+            return silent, single
+        finally:
+            streaming.close()
+            whole.close()
+
+    silent, single = asyncio.run(main())
+    assert silent == []
+    assert len(single) == 1 and single[0].startswith('whisper:ru/base:voice.oga')
+
+
+def test_micro_batcher_groups_concurrent_jobs():
+    batches = []
+
+    async def process(items):
+        batches.append(list(items))
+        return [item * 10 for item in items]
+
+    async def main():
+        batcher = MicroBatcher(process, max_batch_size=3, max_wait=0.01)
+        first = await asyncio.gather(*(batcher.submit(item) for item in range(5)))
+        # Одиночное задание уходит по истечении ожидания
+        second = await batcher.submit(7)
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert first == [0, 10, 20, 30, 40]
+    assert second == 70
+    assert batches == [[0, 1, 2], [3, 4], [7]]
+
+
+def test_micro_batcher_propagates_errors():
+    async def process(items):
+        raise RuntimeError("модель недоступна")
+
+    async def main():
+        batcher = MicroBatcher(process, max_batch_size=2, max_wait=0.01)
+        with pytest.raises(RuntimeError):
+            await batcher.submit(1)
+
+    asyncio.run(main())
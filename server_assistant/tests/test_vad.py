@@ -0,0 +1,49 @@
+import numpy as np
+
+from src.audio_processing.vad import EnergyVAD, NoVAD, group_segments
+
+RATE = 16000
+
+
+def tone(seconds, amplitude=0.3):
+    time_axis = np.arange(int(seconds * RATE)) / RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * time_axis)).astype(np.float32)
+
+
+def silence(seconds, noise=0.0):
+    return (np.random.default_rng(0).normal(0, noise, int(seconds * RATE)) if noise else np.zeros(int(seconds * RATE))).astype(np.float32)
+
+
+def test_silent_clip_has_no_speech():
+    result = EnergyVAD().detect(silence(3))
+    assert result.is_silent
+    assert result.dropped_seconds == 3
+
+
+def test_leading_and_trailing_silence_is_trimmed():
+    audio = np.concatenate([silence(2, noise=0.001), tone(1), silence(2, noise=0.001)])
+    result = EnergyVAD(padding_ms=100).detect(audio)
+
+    assert len(result.segments) == 1
+    start, end = result.segments[0]
+    assert abs(start - 1.9 * RATE) < 0.05 * RATE
+    assert abs(end - 3.1 * RATE) < 0.05 * RATE
+    assert 3.6 < result.dropped_seconds < 3.9
+
+
+def test_long_pause_splits_speech_and_short_pause_does_not():
+    audio = np.concatenate([tone(1), silence(0.2), tone(1), silence(2), tone(1)])
+    result = EnergyVAD(padding_ms=0).detect(audio)
+    assert len(result.segments) == 2
+
+
+def test_group_segments_respects_window():
+    segments = [(0, 10), (20, 25), (30, 60)]
+    chunks = group_segments(segments, max_samples=20)
+
+    assert chunks == [[(0, 10), (20, 25), (30, 35)], [(35, 55)], [(55, 60)]]
+    assert all(sum(end - start for start, end in chunk) <= 20 for chunk in chunks)
+
+
+def test_no_vad_keeps_whole_clip():
+    assert NoVAD().detect(silence(1)).segments == [(0, RATE)]
@@ -0,0 +1,33 @@
+import io
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from src.audio_processing.voice_encoding import encode_ogg_opus
+
+
+def _speech_like(seconds, sample_rate=24000):
+    time_axis = np.arange(int(seconds * sample_rate)) / sample_rate
+    rng = np.random.default_rng(0)
+    return (0.3 * np.sin(2 * np.pi * 220 * time_axis) + 0.02 * rng.standard_normal(len(time_axis))).astype(np.float32)
+
+
+def test_encodes_ogg_opus_at_voice_bitrate():
+    audio = _speech_like(5)
+    voice = encode_ogg_opus(audio, 24000, bitrate=32000)
+
+    assert voice[:4] == b'OggS'
+    assert b'OpusHead' in voice[:64]
+    # 32 кбит/с против 384 кбит/с у WAV float32 24 кГц
+    assert len(voice) * 8 / 5 < 40000
+    decoded, sample_rate = sf.read(io.BytesIO(voice))
+    assert sample_rate == 24000
+    assert abs(len(decoded) - len(audio)) < 24000 * 0.1
+
+
+def test_bitrate_controls_size_and_rate_is_checked():
+    audio = _speech_like(5)
+    assert len(encode_ogg_opus(audio, 24000, bitrate=16000)) < len(encode_ogg_opus(audio, 24000, bitrate=64000))
+    with pytest.raises(ValueError):
+        encode_ogg_opus(audio, 22050)
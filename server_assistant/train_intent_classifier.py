@@ -0,0 +1,51 @@
+"""
+Обучение локального классификатора типа задачи по журналу решений роутера.
+
+Пример запуска:
+    python train_intent_classifier.py --log temp/router_decisions.jsonl --out models/intent_classifier.joblib
+"""
+import argparse
+import json
+import random
+
+from config import get_config
+from src.neural_networks.intent_classifier import IntentClassifier, load_decisions
+
+
+def main():
+    router_config = get_config().router
+
+    parser = argparse.ArgumentParser(description="Обучение локального классификатора типа задачи")
+    parser.add_argument('--log', default=router_config.decisions_log, help="Журнал решений роутера (JSONL)")
+    parser.add_argument('--out', default=router_config.intent_model_path, help="Путь для сохранения модели")
+    parser.add_argument('--threshold', type=float, default=router_config.intent_threshold, help="Порог уверенности")
+    parser.add_argument('--test-size', type=float, default=0.2, help="Доля отложенной выборки")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--report', help="Путь для сохранения отчета (JSON)")
+    args = parser.parse_args()
+
+    samples = load_decisions(args.log)
+    if len(samples) < 10:
+        raise SystemExit(f"Недостаточно решений LLM для обучения: {len(samples)}")
+
+    random.Random(args.seed).shuffle(samples)
+    split = max(1, int(len(samples) * args.test_size))
+    test_samples, train_samples = samples[:split], samples[split:]
+
+    classifier = IntentClassifier(threshold=args.threshold).fit(train_samples)
+    report = classifier.evaluate(test_samples)
+    report['train_samples'] = len(train_samples)
+    report['threshold'] = args.threshold
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    # Итоговая модель обучается на всех решениях
+    IntentClassifier(threshold=args.threshold).fit(samples).save(args.out)
+    print(f"Модель сохранена: {args.out}")
+
+
+if __name__ == '__main__':
+    main()